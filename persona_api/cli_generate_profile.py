@@ -5,6 +5,8 @@ import json
 import sys
 
 from persona_api.services import DomainTextResolver, ProfileGenerator, RandomFacetGenerator
+from persona_api.services.ollama_transport import create_transport
+from persona_api.services.profile_cache import ProfileCache
 
 DEFAULT_TRAIT_COUNT = 5
 DEFAULT_DOMAIN_SCORE = 3  # Neutral score for unspecified domains
@@ -188,6 +190,18 @@ EXAMPLES
         metavar="HOST",
         help="SSH host running Ollama (default: sparx)",
     )
+    parser.add_argument(
+        "--base-url",
+        type=str,
+        metavar="URL",
+        help="Call Ollama directly over HTTP (e.g. http://sparx:11434), falling back to SSH via --host",
+    )
+    parser.add_argument(
+        "--cache-db",
+        type=str,
+        metavar="PATH",
+        help="SQLite profile cache; reuse profiles for identical prompts and model",
+    )
     parser.add_argument(
         "--length", "-l",
         type=int,
@@ -247,33 +261,7 @@ EXAMPLES
         result = facet_gen.generate(coherence=args.random)
         seed = result.seed
 
-        facet_scores = {
-            "extraversion": (
-                result.extraversion.facets.sociability,
-                result.extraversion.facets.assertiveness,
-                result.extraversion.facets.energy_level,
-            ),
-            "agreeableness": (
-                result.agreeableness.facets.compassion,
-                result.agreeableness.facets.respectfulness,
-                result.agreeableness.facets.trust,
-            ),
-            "conscientiousness": (
-                result.conscientiousness.facets.organization,
-                result.conscientiousness.facets.productiveness,
-                result.conscientiousness.facets.responsibility,
-            ),
-            "negative_emotionality": (
-                result.negative_emotionality.facets.anxiety,
-                result.negative_emotionality.facets.depression,
-                result.negative_emotionality.facets.emotional_volatility,
-            ),
-            "open_mindedness": (
-                result.open_mindedness.facets.intellectual_curiosity,
-                result.open_mindedness.facets.aesthetic_sensitivity,
-                result.open_mindedness.facets.creative_imagination,
-            ),
-        }
+        facet_scores = result.to_facet_scores()
         mode_desc = f"Random: {args.random} - {RANDOM_DESC[args.random]}"
     else:
         # Explicit mode: use provided scores, default others to 3
@@ -293,7 +281,9 @@ EXAMPLES
     behaviors = resolver.resolve_all(facet_scores)
 
     # Slice traits (always 5, distributed across domains with behaviors)
-    profile_gen = ProfileGenerator(seed=seed)
+    transport = create_transport(args.host, base_url=args.base_url) if args.base_url else None
+    cache = ProfileCache(path=args.cache_db) if args.cache_db else None
+    profile_gen = ProfileGenerator(seed=seed, transport=transport, cache=cache)
     traits = profile_gen.slice_instructions(behaviors, count=DEFAULT_TRAIT_COUNT)
 
     def get_domain_score(domain: str) -> int:
@@ -65,33 +65,7 @@ def main():
         behaviors = None
         if args.behaviors:
             resolver = DomainTextResolver(seed=result.seed)
-            raw_behaviors = resolver.resolve_all({
-                "extraversion": (
-                    result.extraversion.facets.sociability,
-                    result.extraversion.facets.assertiveness,
-                    result.extraversion.facets.energy_level,
-                ),
-                "agreeableness": (
-                    result.agreeableness.facets.compassion,
-                    result.agreeableness.facets.respectfulness,
-                    result.agreeableness.facets.trust,
-                ),
-                "conscientiousness": (
-                    result.conscientiousness.facets.organization,
-                    result.conscientiousness.facets.productiveness,
-                    result.conscientiousness.facets.responsibility,
-                ),
-                "negative_emotionality": (
-                    result.negative_emotionality.facets.anxiety,
-                    result.negative_emotionality.facets.depression,
-                    result.negative_emotionality.facets.emotional_volatility,
-                ),
-                "open_mindedness": (
-                    result.open_mindedness.facets.intellectual_curiosity,
-                    result.open_mindedness.facets.aesthetic_sensitivity,
-                    result.open_mindedness.facets.creative_imagination,
-                ),
-            })
+            raw_behaviors = resolver.resolve_all(result.to_facet_scores())
 
             # Sample instructions for each domain
             behaviors = {}
@@ -106,49 +80,7 @@ def main():
                     behaviors[domain] = None
 
         if args.json:
-            output = {
-                "seed": result.seed,
-                "extraversion": {
-                    "score": result.extraversion.score,
-                    "facets": {
-                        "sociability": result.extraversion.facets.sociability,
-                        "assertiveness": result.extraversion.facets.assertiveness,
-                        "energy_level": result.extraversion.facets.energy_level,
-                    },
-                },
-                "agreeableness": {
-                    "score": result.agreeableness.score,
-                    "facets": {
-                        "compassion": result.agreeableness.facets.compassion,
-                        "respectfulness": result.agreeableness.facets.respectfulness,
-                        "trust": result.agreeableness.facets.trust,
-                    },
-                },
-                "conscientiousness": {
-                    "score": result.conscientiousness.score,
-                    "facets": {
-                        "organization": result.conscientiousness.facets.organization,
-                        "productiveness": result.conscientiousness.facets.productiveness,
-                        "responsibility": result.conscientiousness.facets.responsibility,
-                    },
-                },
-                "negative_emotionality": {
-                    "score": result.negative_emotionality.score,
-                    "facets": {
-                        "anxiety": result.negative_emotionality.facets.anxiety,
-                        "depression": result.negative_emotionality.facets.depression,
-                        "emotional_volatility": result.negative_emotionality.facets.emotional_volatility,
-                    },
-                },
-                "open_mindedness": {
-                    "score": result.open_mindedness.score,
-                    "facets": {
-                        "intellectual_curiosity": result.open_mindedness.facets.intellectual_curiosity,
-                        "aesthetic_sensitivity": result.open_mindedness.facets.aesthetic_sensitivity,
-                        "creative_imagination": result.open_mindedness.facets.creative_imagination,
-                    },
-                },
-            }
+            output = result.to_dict()
             if behaviors:
                 for domain, behavior in behaviors.items():
                     if behavior:
@@ -1,11 +1,45 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from persona_api.routers import personality_router
+from persona_api.routers.personality import configured_max_batch_size, configured_max_stream_size
+from persona_api.services import PersonaPipeline
+from persona_api.services.ollama_transport import create_default_async_transport
+from persona_api.services.persona_pipeline import open_text_source
+from persona_api.services.profile_cache import configured_profile_cache
+from persona_api.services.single_flight import AsyncCoalescingTransport
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load text data once per worker; requests share it via app.state
+    pipeline = PersonaPipeline(source=open_text_source())
+    pipeline.warm()
+    app.state.pipeline = pipeline
+    app.state.max_batch_size = configured_max_batch_size()
+    app.state.max_stream_size = configured_max_stream_size()
+    # One pooled Ollama client per worker for the streaming profile endpoint
+    ollama = create_default_async_transport()
+    start_health_checks = getattr(ollama, "start_health_checks", None)
+    if start_health_checks is not None:
+        start_health_checks()
+    # Concurrent requests for the same persona share one LLM call
+    app.state.ollama = AsyncCoalescingTransport(ollama)
+    app.state.profile_cache = configured_profile_cache()
+    yield
+    await app.state.ollama.aclose()
+    app.state.profile_cache.close()
+    close = getattr(pipeline.source, "close", None)
+    if close is not None:
+        close()
+
 
 app = FastAPI(
     title="Persona API",
     description="Generate bot/agent personalities based on the Big Five personality model",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.include_router(personality_router)
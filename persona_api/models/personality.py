@@ -75,7 +75,35 @@ class PersonalityScores(BaseModel):
     neuroticism: NeuroticismScore
 
 
+class Trait(BaseModel):
+    trait: str
+    domain: str
+
+
 class PersonalityResponse(BaseModel):
     scores: PersonalityScores
+    traits: list[Trait]
     prompt: str
     seed: str
+
+
+class DomainScoreConstraints(BaseModel):
+    openness: int | None = Field(default=None, ge=1, le=5)
+    conscientiousness: int | None = Field(default=None, ge=1, le=5)
+    extraversion: int | None = Field(default=None, ge=1, le=5)
+    agreeableness: int | None = Field(default=None, ge=1, le=5)
+    neuroticism: int | None = Field(default=None, ge=1, le=5)
+
+
+class PersonalityBatchRequest(BaseModel):
+    count: int = Field(ge=1, description="Number of personas to generate")
+    coherence: int | None = Field(default=None, ge=1, le=3, description="Facet coherence: 1=coherent, 2=mixed, 3=chaotic")
+    seed: str | None = Field(default=None, description="Base seed; the same request always returns the same batch")
+    length: int | None = Field(default=None, ge=1, description="Target profile length in characters (±10%)")
+    domain_scores: DomainScoreConstraints | None = Field(default=None, description="Pin domains to explicit scores (all facets set to the score)")
+
+
+class PersonalityBatchResponse(BaseModel):
+    seed: str
+    count: int
+    personas: list[PersonalityResponse]
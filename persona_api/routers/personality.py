@@ -1,78 +1,284 @@
-from fastapi import APIRouter, Query
+import json
+import os
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
 from persona_api.models import (
     AgreeablenessFacets,
     AgreeablenessScore,
     ConscientiousnessFacets,
     ConscientiousnessScore,
+    DomainScoreConstraints,
     ExtraversionFacets,
     ExtraversionScore,
     NeuroticismFacets,
     NeuroticismScore,
     OpennessFacets,
     OpennessScore,
+    PersonalityBatchRequest,
+    PersonalityBatchResponse,
     PersonalityResponse,
     PersonalityScores,
     PromptUse,
+    Trait,
 )
+from persona_api.services import PersonaPipeline, PersonaResult, ProfileGenerator, RandomFacetGenerator
+from persona_api.services.profile_generator import DEFAULT_INSTRUCTION_COUNT, DEFAULT_MODEL
 
 router = APIRouter(prefix="/personality", tags=["personality"])
 
+DEFAULT_MAX_BATCH_SIZE = 1000
+MAX_BATCH_SIZE_ENV = "PERSONA_MAX_BATCH_SIZE"
 
-@router.get("/random", response_model=PersonalityResponse)
-def get_random_personality(
-    model: str | None = Query(default=None, description="Target LLM model (e.g., claude_opus, gpt4)"),
-    use: PromptUse = Query(default=PromptUse.system_prompt, description="Where the prompt will be used"),
-) -> PersonalityResponse:
-    """
-    Generate a random personality profile with Big Five traits and facets.
+# Streaming holds one persona at a time, so it allows much larger batches
+DEFAULT_MAX_STREAM_SIZE = 100000
+MAX_STREAM_SIZE_ENV = "PERSONA_MAX_STREAM_SIZE"
 
-    Returns quantitative scores and a generated prompt suitable for the specified use case.
-    """
-    # Stubbed response with hardcoded values
+# API domain names -> generator domain names
+API_TO_DOMAIN = {
+    "openness": "open_mindedness",
+    "conscientiousness": "conscientiousness",
+    "extraversion": "extraversion",
+    "agreeableness": "agreeableness",
+    "neuroticism": "negative_emotionality",
+}
+
+
+def _int_from_env(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}") from None
+
+
+def configured_max_batch_size() -> int:
+    """Max personas per batch request, from PERSONA_MAX_BATCH_SIZE."""
+    return _int_from_env(MAX_BATCH_SIZE_ENV, DEFAULT_MAX_BATCH_SIZE)
+
+
+def configured_max_stream_size() -> int:
+    """Max personas per streamed batch request, from PERSONA_MAX_STREAM_SIZE."""
+    return _int_from_env(MAX_STREAM_SIZE_ENV, DEFAULT_MAX_STREAM_SIZE)
+
+
+def get_pipeline(request: Request) -> PersonaPipeline:
+    """Pipeline loaded at startup (see main.lifespan)."""
+    return request.app.state.pipeline
+
+
+def get_ollama_transport(request: Request):
+    """Async Ollama transport opened at startup (see main.lifespan)."""
+    return request.app.state.ollama
+
+
+def get_profile_cache(request: Request):
+    """Profile cache opened at startup, or None (see main.lifespan)."""
+    return getattr(request.app.state, "profile_cache", None)
+
+
+def get_max_batch_size(request: Request) -> int:
+    return getattr(request.app.state, "max_batch_size", DEFAULT_MAX_BATCH_SIZE)
+
+
+def get_max_stream_size(request: Request) -> int:
+    return getattr(request.app.state, "max_stream_size", DEFAULT_MAX_STREAM_SIZE)
+
+
+def to_domain_scores(constraints: DomainScoreConstraints | None) -> dict[str, int]:
+    """Convert API domain constraints to {generator domain: score}."""
+    if constraints is None:
+        return {}
+    return {
+        API_TO_DOMAIN[name]: score
+        for name, score in constraints.model_dump().items()
+        if score is not None
+    }
+
+
+def sse_event(event: str, data: str) -> str:
+    """Format one server-sent event (``data`` must be a single line)."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+def to_response(persona: PersonaResult) -> PersonalityResponse:
+    """Convert a pipeline result to the API response model."""
+    p = persona.personality
     return PersonalityResponse(
         scores=PersonalityScores(
             openness=OpennessScore(
-                score=4,
+                score=p.open_mindedness.score,
                 facets=OpennessFacets(
-                    aesthetic_sensitivity=5,
-                    creative_imagination=4,
-                    intellectual_curiosity=3,
+                    aesthetic_sensitivity=p.open_mindedness.facets.aesthetic_sensitivity,
+                    creative_imagination=p.open_mindedness.facets.creative_imagination,
+                    intellectual_curiosity=p.open_mindedness.facets.intellectual_curiosity,
                 ),
             ),
             conscientiousness=ConscientiousnessScore(
-                score=2,
+                score=p.conscientiousness.score,
                 facets=ConscientiousnessFacets(
-                    organization=2,
-                    productiveness=3,
-                    responsibility=1,
+                    organization=p.conscientiousness.facets.organization,
+                    productiveness=p.conscientiousness.facets.productiveness,
+                    responsibility=p.conscientiousness.facets.responsibility,
                 ),
             ),
             extraversion=ExtraversionScore(
-                score=5,
+                score=p.extraversion.score,
                 facets=ExtraversionFacets(
-                    assertiveness=5,
-                    energy_level=4,
-                    sociability=5,
+                    assertiveness=p.extraversion.facets.assertiveness,
+                    energy_level=p.extraversion.facets.energy_level,
+                    sociability=p.extraversion.facets.sociability,
                 ),
             ),
             agreeableness=AgreeablenessScore(
-                score=3,
+                score=p.agreeableness.score,
                 facets=AgreeablenessFacets(
-                    compassion=4,
-                    respectfulness=3,
-                    trust=2,
+                    compassion=p.agreeableness.facets.compassion,
+                    respectfulness=p.agreeableness.facets.respectfulness,
+                    trust=p.agreeableness.facets.trust,
                 ),
             ),
             neuroticism=NeuroticismScore(
-                score=1,
+                score=p.negative_emotionality.score,
                 facets=NeuroticismFacets(
-                    anxiety=1,
-                    depression=1,
-                    emotional_volatility=2,
+                    anxiety=p.negative_emotionality.facets.anxiety,
+                    depression=p.negative_emotionality.facets.depression,
+                    emotional_volatility=p.negative_emotionality.facets.emotional_volatility,
                 ),
             ),
         ),
-        prompt=f"[STUB: {use.value} prompt for model={model}] You are a highly creative and outgoing assistant who thrives on social interaction. You approach tasks with flexibility rather than rigid structure, and maintain emotional stability under pressure.",
-        seed="stub_seed_abc123",
+        traits=[Trait(**t) for t in persona.traits],
+        prompt=persona.prompt,
+        seed=persona.seed,
     )
+
+
+@router.get("/random", response_model=PersonalityResponse)
+def get_random_personality(
+    request: Request,
+    seed: str | None = Query(default=None, description="Seed for reproducible generation (any string)"),
+    coherence: int | None = Query(default=None, ge=1, le=3, description="Facet coherence: 1=coherent, 2=mixed, 3=chaotic"),
+    length: int | None = Query(default=None, ge=1, description="Target profile length in characters (±10%)"),
+    model: str | None = Query(default=None, description="Target LLM model (e.g., claude_opus, gpt4)"),
+    use: PromptUse = Query(default=PromptUse.system_prompt, description="Where the prompt will be used"),
+) -> PersonalityResponse:
+    """
+    Generate a random personality profile with Big Five traits and facets.
+
+    Runs RandomFacetGenerator -> DomainTextResolver -> ProfileGenerator and
+    returns the quantitative scores, the sliced behavioral traits and the
+    profile-writing prompt built from them. ``model`` and ``use`` are
+    accepted for compatibility and do not change the prompt yet.
+    """
+    pipeline = get_pipeline(request)
+    persona = pipeline.generate(seed=seed, coherence=coherence, trait_count=DEFAULT_INSTRUCTION_COUNT, length=length)
+    return to_response(persona)
+
+
+@router.get("/random/stream", response_class=StreamingResponse)
+def stream_random_profile(
+    request: Request,
+    seed: str | None = Query(default=None, description="Seed for reproducible generation (any string)"),
+    coherence: int | None = Query(default=None, ge=1, le=3, description="Facet coherence: 1=coherent, 2=mixed, 3=chaotic"),
+    length: int | None = Query(default=None, ge=1, description="Target profile length in characters (±10%)"),
+    ollama_model: str = Query(default=DEFAULT_MODEL, description="Ollama model that writes the profile"),
+) -> StreamingResponse:
+    """
+    Generate a random personality and stream its LLM-written profile.
+
+    Responds with server-sent events:
+
+    - ``persona``: the ``GET /personality/random`` body, sent immediately
+    - ``token``: ``{"text": ...}`` for each piece of profile text from Ollama
+      (a single token with the whole profile when it is cached)
+    - ``done``: ``{"profile": ...}`` with the full profile
+    - ``error``: ``{"detail": ...}`` if the LLM call fails; the stream ends
+    """
+    pipeline = get_pipeline(request)
+    persona = pipeline.generate(seed=seed, coherence=coherence, trait_count=DEFAULT_INSTRUCTION_COUNT, length=length)
+    profile_gen = ProfileGenerator(seed=persona.seed, async_transport=get_ollama_transport(request), cache=get_profile_cache(request))
+
+    async def events():
+        yield sse_event("persona", to_response(persona).model_dump_json())
+
+        pieces = []
+        try:
+            async for text in profile_gen.astream_profile(persona.traits, model=ollama_model, length=length):
+                pieces.append(text)
+                yield sse_event("token", json.dumps({"text": text}))
+        except (RuntimeError, TimeoutError) as e:
+            yield sse_event("error", json.dumps({"detail": str(e) or type(e).__name__}))
+            return
+
+        yield sse_event("done", json.dumps({"profile": "".join(pieces).strip()}))
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Persona-Seed": persona.seed}
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers)
+
+
+@router.post("/batch", response_model=PersonalityBatchResponse)
+def generate_personality_batch(request: Request, body: PersonalityBatchRequest) -> PersonalityBatchResponse:
+    """
+    Generate many personalities in one request.
+
+    Persona i is generated from the item seed ``<seed>:<i>`` reported in its
+    ``seed`` field, so ``GET /personality/random?seed=<seed>:<i>`` with the
+    same coherence returns it again. ``domain_scores`` pins the given
+    domains and leaves the rest random. The same ``seed`` and parameters
+    always return the same batch. ``count`` is capped by
+    PERSONA_MAX_BATCH_SIZE (default 1000).
+    """
+    max_batch_size = get_max_batch_size(request)
+    if body.count > max_batch_size:
+        raise HTTPException(status_code=422, detail=f"count must be <= {max_batch_size}, got {body.count}")
+
+    pipeline = get_pipeline(request)
+    seed, personas = pipeline.generate_many(
+        body.count,
+        seed=body.seed,
+        coherence=body.coherence,
+        domain_scores=to_domain_scores(body.domain_scores),
+        trait_count=DEFAULT_INSTRUCTION_COUNT,
+        length=body.length,
+    )
+    return PersonalityBatchResponse(
+        seed=seed,
+        count=len(personas),
+        personas=[to_response(persona) for persona in personas],
+    )
+
+
+@router.post("/batch/stream", response_class=StreamingResponse)
+def stream_personality_batch(request: Request, body: PersonalityBatchRequest) -> StreamingResponse:
+    """
+    Generate many personalities as newline-delimited JSON.
+
+    Same parameters and personas as ``POST /personality/batch``, but each
+    persona is written as one JSON line as soon as it is generated, so the
+    batch is never held in memory. The base seed is returned in the
+    ``X-Persona-Seed`` header. ``count`` is capped by PERSONA_MAX_STREAM_SIZE
+    (default 100000).
+    """
+    max_stream_size = get_max_stream_size(request)
+    if body.count > max_stream_size:
+        raise HTTPException(status_code=422, detail=f"count must be <= {max_stream_size}, got {body.count}")
+
+    pipeline = get_pipeline(request)
+    seed = body.seed if body.seed is not None else RandomFacetGenerator().seed
+    personas = pipeline.iter_many(
+        body.count,
+        seed,
+        coherence=body.coherence,
+        domain_scores=to_domain_scores(body.domain_scores),
+        trait_count=DEFAULT_INSTRUCTION_COUNT,
+        length=body.length,
+    )
+
+    def lines():
+        for persona in personas:
+            yield to_response(persona).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"X-Persona-Seed": seed})
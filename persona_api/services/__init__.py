@@ -1,7 +1,14 @@
 from persona_api.services.behavior_resolver import BehaviorResolver
 from persona_api.services.domain_text_resolver import DomainTextResolver
 from persona_api.services.facet_text_resolver import FacetTextResolver
+from persona_api.services.host_pool import AsyncHostPool, HostPool
+from persona_api.services.ollama_transport import HttpTransport, SshTransport
+from persona_api.services.persona_pipeline import PersonaPipeline, PersonaResult
+from persona_api.services.profile_cache import ProfileCache
 from persona_api.services.profile_generator import ProfileGenerator
 from persona_api.services.random_facet_generator import RandomFacetGenerator
+from persona_api.services.text_cache import CachedTextSource, get_shared_text_source
+from persona_api.services.text_pack import TextPack
+from persona_api.services.text_source import JsonTextSource
 
-__all__ = ["BehaviorResolver", "DomainTextResolver", "FacetTextResolver", "ProfileGenerator", "RandomFacetGenerator"]
+__all__ = ["AsyncHostPool", "BehaviorResolver", "CachedTextSource", "DomainTextResolver", "FacetTextResolver", "HostPool", "HttpTransport", "JsonTextSource", "PersonaPipeline", "PersonaResult", "ProfileCache", "ProfileGenerator", "RandomFacetGenerator", "SshTransport", "TextPack", "get_shared_text_source"]
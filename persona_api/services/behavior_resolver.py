@@ -1,8 +1,12 @@
 """Resolve domain scores to behavioral instructions."""
 
-import json
 import random
+import threading
 from pathlib import Path
+from weakref import WeakKeyDictionary
+
+from persona_api.services.text_cache import get_shared_text_source
+from persona_api.services.text_source import DEFAULT_TEXT_DIR
 
 # Domain -> ordered list of facet names
 DOMAIN_FACETS = {
@@ -15,6 +19,42 @@ DOMAIN_FACETS = {
 
 DOMAINS = list(DOMAIN_FACETS.keys())
 
+COHERENCE_LEVELS = (1, 2, 3)
+SCORE_RANGE = range(1, 6)
+
+# Source -> domain -> match index, shared by every resolver using that source
+_match_indices: WeakKeyDictionary = WeakKeyDictionary()
+_match_index_lock = threading.Lock()
+
+
+def _build_match_index(coherence_index: dict) -> dict[tuple[int, int], tuple[tuple[int, int, int], ...]]:
+    """Map (domain score, max coherence) to candidate facet score triples.
+
+    A triple matches if the average of its three facet scores rounds to the
+    domain score. Candidates for coherence N include levels 1..N, in the
+    order they appear in coherence.json.
+    """
+    by_level: dict[int, list[tuple[int, int, int]]] = {}
+    for level in COHERENCE_LEVELS:
+        triples = []
+        for file_path in coherence_index.get(str(level), []):
+            # Parse scores from path like "3/2/4.json"
+            parts = file_path.replace(".json", "").split("/")
+            if len(parts) == 3:
+                triples.append((int(parts[0]), int(parts[1]), int(parts[2])))
+        by_level[level] = triples
+
+    index = {}
+    for score in SCORE_RANGE:
+        for coherence in COHERENCE_LEVELS:
+            index[(score, coherence)] = tuple(
+                triple
+                for level in range(1, coherence + 1)
+                for triple in by_level[level]
+                if round(sum(triple) / 3) == score
+            )
+    return index
+
 
 class BehaviorResolver:
     """Resolves domain scores to behavioral texts and instructions.
@@ -22,56 +62,42 @@ class BehaviorResolver:
     Given a domain name (e.g., "extraversion") and a score (1-5),
     finds matching score combinations filtered by coherence level
     and returns a random text with its behavioral instructions.
+
+    Entries are read from ``source`` (a JsonTextSource, TextPack or
+    CachedTextSource); by default the process-wide cached source for the
+    JSON tree under ``base_dir`` is used.
     """
 
-    def __init__(self, base_dir: Path | None = None, seed: str | None = None):
+    def __init__(self, base_dir: Path | None = None, seed: str | None = None, source=None):
         if base_dir is None:
-            base_dir = Path(__file__).parent.parent / "data" / "text"
+            base_dir = DEFAULT_TEXT_DIR
         self._base_dir = base_dir
+        self._source = source if source is not None else get_shared_text_source(base_dir)
         self._rng = random.Random(seed)
-        self._coherence_cache: dict[str, dict] = {}
-
-    def _load_coherence_index(self, domain: str) -> dict:
-        """Load and cache coherence index for a domain."""
-        if domain not in self._coherence_cache:
-            index_path = self._base_dir / domain / "coherence.json"
-            if index_path.exists():
-                self._coherence_cache[domain] = json.loads(index_path.read_text())
-            else:
-                self._coherence_cache[domain] = {"1": [], "2": [], "3": []}
-        return self._coherence_cache[domain]
-
-    def _get_matching_files(
+
+    def _get_match_index(self, domain: str) -> dict[tuple[int, int], tuple[tuple[int, int, int], ...]]:
+        """Get the shared (score, coherence) -> candidates index for a domain."""
+        with _match_index_lock:
+            indices = _match_indices.get(self._source)
+            if indices is None:
+                indices = {}
+                _match_indices[self._source] = indices
+            index = indices.get(domain)
+
+        if index is None:
+            index = _build_match_index(self._source.load_coherence_index(domain))
+            with _match_index_lock:
+                index = indices.setdefault(domain, index)
+        return index
+
+    def _get_matching_scores(
         self,
         domain: str,
         score: int,
         coherence: int = 1,
-    ) -> list[str]:
-        """Get files matching the domain score and coherence level.
-
-        A file matches if the average of its three facet scores rounds to
-        the requested score.
-        """
-        index = self._load_coherence_index(domain)
-
-        # Collect files at or below the coherence threshold
-        # coherence=1 -> only "1", coherence=2 -> "1" and "2", etc.
-        candidate_files = []
-        for level in range(1, coherence + 1):
-            candidate_files.extend(index.get(str(level), []))
-
-        # Filter by score (average of the three facet scores)
-        matching = []
-        for file_path in candidate_files:
-            # Parse scores from path like "3/2/4.json"
-            parts = file_path.replace(".json", "").split("/")
-            if len(parts) == 3:
-                s1, s2, s3 = int(parts[0]), int(parts[1]), int(parts[2])
-                avg = round((s1 + s2 + s3) / 3)
-                if avg == score:
-                    matching.append(file_path)
-
-        return matching
+    ) -> tuple[tuple[int, int, int], ...]:
+        """Get facet score triples matching the domain score and coherence level."""
+        return self._get_match_index(domain).get((score, coherence), ())
 
     def resolve(
         self,
@@ -106,38 +132,27 @@ class BehaviorResolver:
         if not 1 <= coherence <= 3:
             coherence = 1
 
-        matching_files = self._get_matching_files(domain, score, coherence)
-        if not matching_files:
-            return None
-
-        # Pick a random file
-        file_path = self._rng.choice(matching_files)
-        full_path = self._base_dir / domain / file_path
-
-        if not full_path.exists():
+        matching_scores = self._get_matching_scores(domain, score, coherence)
+        if not matching_scores:
             return None
 
-        content = json.loads(full_path.read_text())
-        texts = content.get("texts", {})
+        # Pick a random score combination
+        facet_scores = self._rng.choice(matching_scores)
 
-        if not texts:
+        entry = self._source.load(domain, facet_scores)
+        if entry is None or not entry.texts:
             return None
 
         # Pick a random text and its instructions
-        text = self._rng.choice(list(texts.keys()))
-        instructions = texts[text]
-
-        # Parse facet scores from file path
-        parts = file_path.replace(".json", "").split("/")
-        facet_scores = tuple(int(p) for p in parts)
+        idx = self._rng.randrange(len(entry.texts))
 
         return {
             "domain": domain,
             "score": score,
             "facet_scores": facet_scores,
-            "coherence": content.get("coherence"),
-            "text": text,
-            "instructions": instructions,
+            "coherence": entry.coherence,
+            "text": entry.texts[idx],
+            "instructions": list(entry.instructions[idx]),
         }
 
     def resolve_all(
@@ -1,15 +1,23 @@
-import json
 import random
 from pathlib import Path
 
+from persona_api.services.text_cache import get_shared_text_source
+from persona_api.services.text_source import DEFAULT_TEXT_DIR
+
 
 class DomainTextResolver:
-    """Resolves domain facet configurations to pre-computed text summaries."""
+    """Resolves domain facet configurations to pre-computed text summaries.
+
+    Entries are read from ``source`` (a JsonTextSource, TextPack or
+    CachedTextSource); by default the process-wide cached source for the
+    JSON tree under ``base_dir`` is used.
+    """
 
-    def __init__(self, base_dir: Path | None = None, seed: str | None = None):
+    def __init__(self, base_dir: Path | None = None, seed: str | None = None, source=None):
         if base_dir is None:
-            base_dir = Path(__file__).parent.parent / "data" / "text"
+            base_dir = DEFAULT_TEXT_DIR
         self._base_dir = base_dir
+        self._source = source if source is not None else get_shared_text_source(base_dir)
         self._rng = random.Random(seed)
 
     def get_file_path(self, domain: str, scores: tuple[int, int, int]) -> Path:
@@ -31,25 +39,18 @@ class DomainTextResolver:
             Dict with coherence rating, random text, and its instructions,
             or None if not found/empty.
         """
-        file_path = self.get_file_path(domain, scores)
-
-        if not file_path.exists():
-            return None
-
-        content = json.loads(file_path.read_text())
-        texts = content.get("texts", {})
+        entry = self._source.load(domain, scores)
 
-        if not texts:
+        if entry is None or not entry.texts:
             return None
 
-        # texts is now dict[str, list[str]] - pick a random key
-        text = self._rng.choice(list(texts.keys()))
-        instructions = texts[text]
+        # Pick a random text (same draw as rng.choice over the text keys)
+        idx = self._rng.randrange(len(entry.texts))
 
         return {
-            "coherence": content.get("coherence"),
-            "text": text,
-            "instructions": instructions,
+            "coherence": entry.coherence,
+            "text": entry.texts[idx],
+            "instructions": list(entry.instructions[idx]),
         }
 
     def resolve_all(
@@ -0,0 +1,440 @@
+"""Spread Ollama requests across several inference hosts.
+
+HostPool and AsyncHostPool wrap one transport per host and are transports
+themselves, so ProfileGenerator can use them unchanged. Each request goes
+to the host with the fewest outstanding requests relative to its
+concurrency cap; callers wait when every host is at its cap. A host that
+fails ``failure_threshold`` times in a row is taken out of rotation
+(circuit open) for ``cooldown`` seconds, then gets a single trial request
+(half open) that closes the circuit again on success. Failed requests are
+retried on the remaining hosts.
+
+Hosts are configured with OLLAMA_HOSTS, a comma-separated list of
+``target[=max_concurrency]`` where target is an Ollama URL (HTTP) or an
+SSH host name, e.g. ``http://sparx:11434=4,http://box2:11434=2,box3``.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable
+
+from persona_api.services.ollama_transport import AsyncHttpTransport, AsyncSshTransport, HttpTransport, SshTransport
+
+DEFAULT_HOST_CONCURRENCY = 4
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 30.0
+DEFAULT_HEALTH_INTERVAL = 15.0
+
+HOSTS_ENV = "OLLAMA_HOSTS"
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+# Seconds between re-checks while waiting for a host to free up or recover
+_WAIT_POLL = 0.5
+
+
+class NoHealthyHostError(RuntimeError):
+    """Every host is out of rotation (circuit open) or has already failed."""
+
+
+@dataclass(slots=True)
+class HostState:
+    name: str
+    transport: object
+    max_concurrency: int
+    outstanding: int = 0
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    circuit: str = CIRCUIT_CLOSED
+    opened_at: float = 0.0
+
+
+class _HostRouter:
+    """Routing and circuit-breaker bookkeeping shared by both pools.
+
+    Not thread-safe: HostPool calls it under a lock, AsyncHostPool from a
+    single event loop.
+    """
+
+    def __init__(self, hosts: Iterable[tuple[str, object, int]], failure_threshold: int, cooldown: float):
+        self.hosts = [HostState(name, transport, max_concurrency) for name, transport, max_concurrency in hosts]
+        if not self.hosts:
+            raise ValueError("HostPool needs at least one host")
+        for host in self.hosts:
+            if host.max_concurrency < 1:
+                raise ValueError(f"max_concurrency must be at least 1 for {host.name}, got {host.max_concurrency}")
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+    def pick(self, exclude: set[str]) -> HostState | None:
+        """Reserve the least-loaded available host, or None if all are busy.
+
+        Raises:
+            NoHealthyHostError: If no host outside ``exclude`` can take requests.
+        """
+        now = time.monotonic()
+        best = None
+        best_key = None
+        usable = False
+
+        for host in self.hosts:
+            if host.name in exclude:
+                continue
+            if host.circuit == CIRCUIT_OPEN:
+                if now - host.opened_at < self.cooldown:
+                    continue
+                host.circuit = CIRCUIT_HALF_OPEN
+            usable = True
+
+            # Half-open hosts get one trial request at a time
+            limit = 1 if host.circuit == CIRCUIT_HALF_OPEN else host.max_concurrency
+            if host.outstanding >= limit:
+                continue
+
+            key = (host.outstanding / host.max_concurrency, host.requests)
+            if best is None or key < best_key:
+                best, best_key = host, key
+
+        if not usable:
+            raise NoHealthyHostError("No healthy Ollama hosts available")
+
+        if best is not None:
+            best.outstanding += 1
+            best.requests += 1
+        return best
+
+    def release(self, host: HostState, ok: bool | None):
+        """Return a reservation. ``ok`` None means the caller gave up (no verdict)."""
+        host.outstanding -= 1
+        if ok is None:
+            return
+        if ok:
+            host.consecutive_failures = 0
+            host.circuit = CIRCUIT_CLOSED
+            return
+
+        host.failures += 1
+        host.consecutive_failures += 1
+        if host.circuit == CIRCUIT_HALF_OPEN or host.consecutive_failures >= self.failure_threshold:
+            self.open(host)
+
+    def open(self, host: HostState):
+        host.circuit = CIRCUIT_OPEN
+        host.opened_at = time.monotonic()
+
+    def mark_health(self, host: HostState, healthy: bool):
+        """Apply a health check result: close a tripped circuit or open a healthy one."""
+        if healthy:
+            if host.circuit != CIRCUIT_CLOSED:
+                host.circuit = CIRCUIT_CLOSED
+                host.consecutive_failures = 0
+        elif host.circuit != CIRCUIT_OPEN:
+            self.open(host)
+
+    def stats(self) -> dict:
+        return {
+            host.name: {
+                "outstanding": host.outstanding,
+                "max_concurrency": host.max_concurrency,
+                "requests": host.requests,
+                "failures": host.failures,
+                "circuit": host.circuit,
+            }
+            for host in self.hosts
+        }
+
+
+class HostPool:
+    """Thread-safe load balancer over sync transports (see module docstring).
+
+    Args:
+        hosts: (name, transport, max_concurrency) per host.
+        failure_threshold: Consecutive failures that open a host's circuit.
+        cooldown: Seconds a host stays out of rotation before a trial request.
+    """
+
+    def __init__(
+        self,
+        hosts: Iterable[tuple[str, object, int]],
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ):
+        self._router = _HostRouter(hosts, failure_threshold, cooldown)
+        self._cond = threading.Condition()
+        self._health_stop = threading.Event()
+        self._health_thread = None
+
+    @property
+    def hosts(self) -> list[str]:
+        return [host.name for host in self._router.hosts]
+
+    def _acquire(self, exclude: set[str]) -> HostState:
+        with self._cond:
+            while True:
+                host = self._router.pick(exclude)
+                if host is not None:
+                    return host
+                self._cond.wait(_WAIT_POLL)
+
+    def _release(self, host: HostState, ok: bool | None):
+        with self._cond:
+            self._router.release(host, ok)
+            self._cond.notify_all()
+
+    def generate(self, payload: dict) -> dict:
+        """Send a generate payload to the least-loaded host, failing over on errors."""
+        tried: set[str] = set()
+        last_error = None
+
+        while len(tried) < len(self._router.hosts):
+            try:
+                host = self._acquire(tried)
+            except NoHealthyHostError:
+                if last_error is None:
+                    raise
+                break
+
+            try:
+                result = host.transport.generate(payload)
+            except Exception as e:
+                self._release(host, ok=False)
+                tried.add(host.name)
+                last_error = e
+                continue
+            except BaseException:
+                self._release(host, ok=None)
+                raise
+
+            self._release(host, ok=True)
+            return result
+
+        raise NoHealthyHostError(f"All Ollama hosts failed: {last_error}") from last_error
+
+    def check_health(self) -> dict[str, bool]:
+        """Health-check every host and update its circuit. Returns {host: healthy}."""
+        results = {}
+        for host in self._router.hosts:
+            healthy = host.transport.health()
+            with self._cond:
+                self._router.mark_health(host, healthy)
+                self._cond.notify_all()
+            results[host.name] = healthy
+        return results
+
+    def start_health_checks(self, interval: float = DEFAULT_HEALTH_INTERVAL):
+        """Run check_health every ``interval`` seconds on a daemon thread."""
+        if self._health_thread is not None:
+            return
+
+        def loop():
+            while not self._health_stop.wait(interval):
+                self.check_health()
+
+        self._health_thread = threading.Thread(target=loop, name="ollama-health", daemon=True)
+        self._health_thread.start()
+
+    def stats(self) -> dict:
+        """Per-host outstanding requests, totals and circuit state."""
+        with self._cond:
+            return self._router.stats()
+
+    def health(self) -> bool:
+        return any(self.check_health().values())
+
+    def close(self):
+        self._health_stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
+        for host in self._router.hosts:
+            host.transport.close()
+
+
+class AsyncHostPool:
+    """Load balancer over async transports; use from a single event loop.
+
+    Takes the same arguments as HostPool.
+    """
+
+    def __init__(
+        self,
+        hosts: Iterable[tuple[str, object, int]],
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ):
+        self._router = _HostRouter(hosts, failure_threshold, cooldown)
+        # Replaced on every release so waiters wake up and re-pick
+        self._released = asyncio.Event()
+        self._health_task = None
+
+    @property
+    def hosts(self) -> list[str]:
+        return [host.name for host in self._router.hosts]
+
+    async def _acquire(self, exclude: set[str]) -> HostState:
+        while True:
+            host = self._router.pick(exclude)
+            if host is not None:
+                return host
+            try:
+                await asyncio.wait_for(self._released.wait(), _WAIT_POLL)
+            except TimeoutError:
+                pass
+
+    def _release(self, host: HostState, ok: bool | None):
+        self._router.release(host, ok)
+        self._wake()
+
+    def _wake(self):
+        self._released.set()
+        self._released = asyncio.Event()
+
+    async def generate(self, payload: dict) -> dict:
+        """Send a generate payload to the least-loaded host, failing over on errors."""
+        tried: set[str] = set()
+        last_error = None
+
+        while len(tried) < len(self._router.hosts):
+            try:
+                host = await self._acquire(tried)
+            except NoHealthyHostError:
+                if last_error is None:
+                    raise
+                break
+
+            try:
+                result = await host.transport.generate(payload)
+            except Exception as e:
+                self._release(host, ok=False)
+                tried.add(host.name)
+                last_error = e
+                continue
+            except BaseException:
+                # Cancelled (e.g. the caller's timeout): no verdict on the host
+                self._release(host, ok=None)
+                raise
+
+            self._release(host, ok=True)
+            return result
+
+        raise NoHealthyHostError(f"All Ollama hosts failed: {last_error}") from last_error
+
+    async def stream(self, payload: dict) -> AsyncIterator[dict]:
+        """Stream from the least-loaded host, failing over only before the first chunk."""
+        tried: set[str] = set()
+        last_error = None
+
+        while len(tried) < len(self._router.hosts):
+            try:
+                host = await self._acquire(tried)
+            except NoHealthyHostError:
+                if last_error is None:
+                    raise
+                break
+
+            started = False
+            ok = None
+            try:
+                async for chunk in host.transport.stream(payload):
+                    started = True
+                    yield chunk
+                ok = True
+            except Exception as e:
+                ok = False
+                if started:
+                    raise
+                tried.add(host.name)
+                last_error = e
+                continue
+            finally:
+                self._release(host, ok)
+            return
+
+        raise NoHealthyHostError(f"All Ollama hosts failed: {last_error}") from last_error
+
+    async def check_health(self) -> dict[str, bool]:
+        """Health-check every host concurrently and update circuits. Returns {host: healthy}."""
+        results = await asyncio.gather(*(host.transport.health() for host in self._router.hosts))
+        for host, healthy in zip(self._router.hosts, results):
+            self._router.mark_health(host, healthy)
+        self._wake()
+        return {host.name: healthy for host, healthy in zip(self._router.hosts, results)}
+
+    def start_health_checks(self, interval: float = DEFAULT_HEALTH_INTERVAL):
+        """Run check_health every ``interval`` seconds as a task on the running loop."""
+        if self._health_task is not None:
+            return
+
+        async def loop():
+            while True:
+                await asyncio.sleep(interval)
+                await self.check_health()
+
+        self._health_task = asyncio.get_running_loop().create_task(loop())
+
+    def stats(self) -> dict:
+        """Per-host outstanding requests, totals and circuit state."""
+        return self._router.stats()
+
+    async def health(self) -> bool:
+        return any((await self.check_health()).values())
+
+    async def aclose(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for host in self._router.hosts:
+            await host.transport.aclose()
+
+
+def parse_hosts(spec: str, default_concurrency: int = DEFAULT_HOST_CONCURRENCY) -> list[tuple[str, int]]:
+    """Parse ``target[=max_concurrency],...`` into [(target, max_concurrency)]."""
+    hosts = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        target, sep, cap = item.rpartition("=")
+        if not sep:
+            target, cap = item, ""
+        try:
+            max_concurrency = int(cap) if cap else default_concurrency
+        except ValueError:
+            raise ValueError(f"Invalid host concurrency in {item!r}") from None
+        hosts.append((target, max_concurrency))
+    if not hosts:
+        raise ValueError(f"No hosts in {spec!r}")
+    return hosts
+
+
+def _is_url(target: str) -> bool:
+    return target.startswith(("http://", "https://"))
+
+
+def create_host_pool(spec: str, default_concurrency: int = DEFAULT_HOST_CONCURRENCY, **kwargs) -> HostPool:
+    """HostPool from a host spec (see module docstring). kwargs go to HostPool."""
+    hosts = [
+        (target, HttpTransport(target, pool_size=cap) if _is_url(target) else SshTransport(target), cap)
+        for target, cap in parse_hosts(spec, default_concurrency)
+    ]
+    return HostPool(hosts, **kwargs)
+
+
+def create_async_host_pool(spec: str, default_concurrency: int = DEFAULT_HOST_CONCURRENCY, **kwargs) -> AsyncHostPool:
+    """AsyncHostPool from a host spec (see module docstring). kwargs go to AsyncHostPool."""
+    hosts = [
+        (target, AsyncHttpTransport(target, pool_size=cap) if _is_url(target) else AsyncSshTransport(target), cap)
+        for target, cap in parse_hosts(spec, default_concurrency)
+    ]
+    return AsyncHostPool(hosts, **kwargs)
+
+
+def configured_hosts() -> str | None:
+    """OLLAMA_HOSTS, or None if unset."""
+    return os.environ.get(HOSTS_ENV) or None
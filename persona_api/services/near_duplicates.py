@@ -0,0 +1,107 @@
+"""MinHash signatures and an LSH index for near-duplicate text.
+
+A text is reduced to its set of character shingles (``shingle_size``-grams
+of the lower-cased, whitespace-collapsed text). MinHasher maps that set to
+``num_perm`` minimum hash values; the fraction of positions where two
+signatures agree estimates the Jaccard similarity of the shingle sets.
+
+NearDuplicateIndex splits signatures into ``bands`` bands. Texts sharing
+any band land in the same bucket and become candidates, and a candidate
+counts as a duplicate only if its estimated similarity reaches
+``threshold``. With the defaults (64 permutations, 16 bands of 4 rows),
+pairs at similarity 0.8 become candidates with probability > 0.999.
+"""
+
+import zlib
+from collections.abc import Hashable
+
+import numpy as np
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16
+DEFAULT_SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.8
+
+
+class MinHasher:
+    """Computes MinHash signatures of texts.
+
+    Uses multiply-shift hashing over CRC32 shingle hashes, vectorized with
+    numpy; signatures are uint32 arrays of length ``num_perm``. Signatures
+    are only comparable between hashers with the same parameters and seed.
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, shingle_size: int = DEFAULT_SHINGLE_SIZE, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Odd multipliers keep the multiply-shift family universal
+        self._a = rng.integers(0, 2**63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> set[str]:
+        normalized = " ".join(text.lower().split())
+        if len(normalized) <= self.shingle_size:
+            return {normalized}
+        return {normalized[i:i + self.shingle_size] for i in range(len(normalized) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in self.shingles(text)), dtype=np.uint64)
+        # uint64 arithmetic wraps, which is what multiply-shift hashing wants
+        permuted = (hashes[:, None] * self._a + self._b) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def signature_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+class NearDuplicateIndex:
+    """LSH index that keeps the first of every group of near-duplicates.
+
+    Args:
+        threshold: Minimum estimated Jaccard similarity for a duplicate.
+        num_perm: Signature length (must match the MinHasher).
+        bands: LSH bands; ``num_perm`` must divide evenly into them.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM, bands: int = DEFAULT_BANDS):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: dict[tuple[int, bytes], list[Hashable]] = {}
+        self._signatures: dict[Hashable, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _band_keys(self, signature: np.ndarray) -> list[tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def query(self, signature: np.ndarray) -> tuple[Hashable, float] | None:
+        """Most similar indexed item at or above the threshold, with its similarity."""
+        best = None
+        seen = set()
+        for key in self._band_keys(signature):
+            for candidate in self._buckets.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                similarity = signature_similarity(signature, self._signatures[candidate])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (candidate, similarity)
+        return best
+
+    def add(self, item: Hashable, signature: np.ndarray) -> tuple[Hashable, float] | None:
+        """Index ``item`` unless it duplicates an indexed one; returns that match if so."""
+        match = self.query(signature)
+        if match is not None:
+            return match
+
+        self._signatures[item] = signature
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, []).append(item)
+        return None
@@ -0,0 +1,457 @@
+"""Transports for calling Ollama's /api/generate endpoint.
+
+HttpTransport talks to Ollama directly over a keep-alive connection pool.
+SshTransport is the original path (``ssh <host> curl ...`` per call) and is
+kept as a fallback for hosts whose Ollama port is not reachable.
+
+The Async* variants expose the same calls as coroutines (httpx and asyncio
+subprocesses), so many requests can be in flight without a thread each.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import threading
+from typing import AsyncIterator
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.retry import Retry
+
+DEFAULT_HOST = "sparx"
+DEFAULT_BASE_URL = "http://localhost:11434"
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 120.0
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+# Set to use HttpTransport (with SSH fallback) by default
+BASE_URL_ENV = "OLLAMA_BASE_URL"
+POOL_SIZE_ENV = "OLLAMA_POOL_SIZE"
+
+GENERATE_PATH = "/api/generate"
+HEALTH_PATH = "/api/tags"
+HEALTH_TIMEOUT = 5.0
+
+# Statuses worth retrying: overloaded or restarting server
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class OllamaUnreachableError(RuntimeError):
+    """Could not connect to the Ollama server, so the request never reached it.
+
+    The only HTTP failure the Fallback transports retry over SSH: after a
+    read timeout or an error response the generation may already have run
+    (or would fail the same way), so repeating it elsewhere only adds delay.
+    """
+
+
+def _connect_failed(e: requests.RequestException) -> bool:
+    """True if a requests error means no connection was made (refused, unresolvable, timed out)."""
+    if isinstance(e, requests.ConnectTimeout):
+        return True
+    # Exhausted urllib3 retries surface as ConnectionError for read errors too; check the cause
+    reason = getattr(e.args[0], "reason", None) if isinstance(e, requests.ConnectionError) and e.args else None
+    return isinstance(reason, ConnectTimeoutError)  # includes NewConnectionError
+
+
+def _parse_chunk(line: str | bytes) -> dict:
+    """Parse one line of Ollama's streamed response."""
+    chunk = json.loads(line)
+    if "error" in chunk:
+        raise RuntimeError(f"Ollama error: {chunk['error']}")
+    return chunk
+
+
+class SshTransport:
+    """Calls Ollama on a remote host via ``ssh <host> curl``.
+
+    Pays process spawn, SSH handshake and TCP setup on every call.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, timeout: float = DEFAULT_READ_TIMEOUT):
+        self.host = host
+        self.timeout = timeout
+
+    def generate(self, payload: dict) -> dict:
+        """POST a generate payload and return the parsed JSON response."""
+        # Pass payload via stdin to avoid shell quoting issues
+        cmd = ["ssh", self.host, f"curl -s http://localhost:11434{GENERATE_PATH} -d @-"]
+
+        result = subprocess.run(cmd, input=json.dumps(payload), capture_output=True, text=True, timeout=self.timeout)
+
+        if result.returncode != 0:
+            raise RuntimeError(f"SSH/Ollama error: {result.stderr}")
+
+        return json.loads(result.stdout)
+
+    def health(self) -> bool:
+        """True if Ollama answers on the host."""
+        cmd = ["ssh", self.host, f"curl -sf http://localhost:11434{HEALTH_PATH}"]
+        try:
+            result = subprocess.run(cmd, capture_output=True, timeout=HEALTH_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            return False
+        return result.returncode == 0
+
+    def close(self):
+        pass
+
+
+class HttpTransport:
+    """Calls Ollama directly over HTTP with a keep-alive connection pool.
+
+    Args:
+        base_url: Ollama server URL (e.g. "http://sparx:11434").
+        pool_size: Max pooled connections kept open to the server.
+        connect_timeout: Seconds to wait for a TCP connection.
+        read_timeout: Seconds to wait for the generation to finish.
+        retries: Retries on connection errors and 429/5xx responses.
+        backoff: Exponential backoff factor between retries (seconds).
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+
+        # No read retries: the POST may have reached Ollama, and re-running a
+        # generation that timed out would block for read_timeout again
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=retry)
+
+        self._session = requests.Session()
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def generate(self, payload: dict) -> dict:
+        """POST a generate payload and return the parsed JSON response."""
+        try:
+            response = self._session.post(self.base_url + GENERATE_PATH, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            if _connect_failed(e):
+                raise OllamaUnreachableError(f"HTTP/Ollama error (unreachable): {e}") from e
+            raise RuntimeError(f"HTTP/Ollama error: {e}") from e
+        except ValueError as e:
+            raise RuntimeError(f"HTTP/Ollama error: {e}") from e
+
+    def health(self) -> bool:
+        """True if the server answers /api/tags (no retries)."""
+        try:
+            return requests.get(self.base_url + HEALTH_PATH, timeout=HEALTH_TIMEOUT).ok
+        except requests.RequestException:
+            return False
+
+    def close(self):
+        self._session.close()
+
+
+class FallbackTransport:
+    """Uses ``primary`` and falls back to ``fallback`` when it raises OllamaUnreachableError."""
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+
+    def generate(self, payload: dict) -> dict:
+        try:
+            return self.primary.generate(payload)
+        except OllamaUnreachableError:
+            return self.fallback.generate(payload)
+
+    def health(self) -> bool:
+        return self.primary.health() or self.fallback.health()
+
+    def close(self):
+        self.primary.close()
+        self.fallback.close()
+
+
+class AsyncSshTransport:
+    """Async SshTransport: runs ``ssh <host> curl`` as an asyncio subprocess."""
+
+    def __init__(self, host: str = DEFAULT_HOST, timeout: float = DEFAULT_READ_TIMEOUT):
+        self.host = host
+        self.timeout = timeout
+
+    async def generate(self, payload: dict) -> dict:
+        """POST a generate payload and return the parsed JSON response."""
+        proc = await asyncio.create_subprocess_exec(
+            "ssh", self.host, f"curl -s http://localhost:11434{GENERATE_PATH} -d @-",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(json.dumps(payload).encode()), self.timeout)
+        except BaseException:
+            # Timed out or cancelled: don't leave the ssh process behind
+            if proc.returncode is None:
+                proc.kill()
+            raise
+
+        if proc.returncode != 0:
+            raise RuntimeError(f"SSH/Ollama error: {stderr.decode(errors='replace')}")
+
+        return json.loads(stdout)
+
+    async def stream(self, payload: dict) -> AsyncIterator[dict]:
+        """POST a generate payload with streaming on and yield each parsed JSON chunk."""
+        proc = await asyncio.create_subprocess_exec(
+            "ssh", self.host, f"curl -sN http://localhost:11434{GENERATE_PATH} -d @-",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            proc.stdin.write(json.dumps({**payload, "stream": True}).encode())
+            proc.stdin.close()
+
+            async for line in proc.stdout:
+                if line.strip():
+                    yield _parse_chunk(line)
+
+            await proc.wait()
+            if proc.returncode != 0:
+                stderr = await proc.stderr.read()
+                raise RuntimeError(f"SSH/Ollama error: {stderr.decode(errors='replace')}")
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+
+    async def health(self) -> bool:
+        """True if Ollama answers on the host."""
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                "ssh", self.host, f"curl -sf http://localhost:11434{HEALTH_PATH}",
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError:
+            return False
+        try:
+            return await asyncio.wait_for(proc.wait(), HEALTH_TIMEOUT) == 0
+        except TimeoutError:
+            proc.kill()
+            return False
+
+    async def aclose(self):
+        pass
+
+
+class AsyncHttpTransport:
+    """Async HttpTransport backed by an httpx.AsyncClient connection pool.
+
+    Takes the same arguments as HttpTransport. Connection errors are retried
+    by httpx; 429/5xx responses are retried here with exponential backoff.
+    The client is bound to the event loop it is first used on.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.retries = retries
+        self.backoff = backoff
+
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        # Waiting for a free pooled connection is bounded by the caller's timeout
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout, pool=None)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            transport=httpx.AsyncHTTPTransport(limits=limits, retries=retries),
+        )
+
+    async def generate(self, payload: dict) -> dict:
+        """POST a generate payload and return the parsed JSON response."""
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self._client.post(GENERATE_PATH, json=payload)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                raise OllamaUnreachableError(f"HTTP/Ollama error (unreachable): {e}") from e
+            except httpx.HTTPError as e:
+                raise RuntimeError(f"HTTP/Ollama error: {e}") from e
+
+            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                await asyncio.sleep(self.backoff * (2 ** attempt))
+                continue
+
+            try:
+                response.raise_for_status()
+                return response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                raise RuntimeError(f"HTTP/Ollama error: {e}") from e
+
+    async def stream(self, payload: dict) -> AsyncIterator[dict]:
+        """POST a generate payload with streaming on and yield each parsed JSON chunk.
+
+        Retried like generate() until the response starts; a stream that
+        fails partway raises RuntimeError.
+        """
+        payload = {**payload, "stream": True}
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._client.stream("POST", GENERATE_PATH, json=payload) as response:
+                    if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                        retry = True
+                    else:
+                        retry = False
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if line.strip():
+                                yield _parse_chunk(line)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                raise OllamaUnreachableError(f"HTTP/Ollama error (unreachable): {e}") from e
+            except (httpx.HTTPError, ValueError) as e:
+                raise RuntimeError(f"HTTP/Ollama error: {e}") from e
+
+            if not retry:
+                return
+            await asyncio.sleep(self.backoff * (2 ** attempt))
+
+    async def health(self) -> bool:
+        """True if the server answers /api/tags."""
+        try:
+            response = await self._client.get(HEALTH_PATH, timeout=HEALTH_TIMEOUT)
+        except httpx.HTTPError:
+            return False
+        return response.is_success
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class AsyncFallbackTransport:
+    """Async FallbackTransport: falls back only on OllamaUnreachableError."""
+
+    def __init__(self, primary, fallback):
+        self.primary = primary
+        self.fallback = fallback
+
+    async def generate(self, payload: dict) -> dict:
+        try:
+            return await self.primary.generate(payload)
+        except OllamaUnreachableError:
+            return await self.fallback.generate(payload)
+
+    async def stream(self, payload: dict) -> AsyncIterator[dict]:
+        """Stream from primary, falling back only if it cannot connect before the first chunk."""
+        started = False
+        try:
+            async for chunk in self.primary.stream(payload):
+                started = True
+                yield chunk
+        except OllamaUnreachableError:
+            if started:
+                raise
+            async for chunk in self.fallback.stream(payload):
+                yield chunk
+
+    async def health(self) -> bool:
+        return await self.primary.health() or await self.fallback.health()
+
+    async def aclose(self):
+        await self.primary.aclose()
+        await self.fallback.aclose()
+
+
+def configured_base_url() -> str | None:
+    """OLLAMA_BASE_URL, or None if unset."""
+    return os.environ.get(BASE_URL_ENV) or None
+
+
+def configured_pool_size() -> int:
+    """OLLAMA_POOL_SIZE, or DEFAULT_POOL_SIZE if unset."""
+    return int(os.environ.get(POOL_SIZE_ENV) or DEFAULT_POOL_SIZE)
+
+
+def create_transport(
+    host: str = DEFAULT_HOST,
+    base_url: str | None = None,
+    pool_size: int = DEFAULT_POOL_SIZE,
+):
+    """Build a transport: HTTP with SSH fallback if base_url is set, else SSH only."""
+    if base_url is None:
+        return SshTransport(host)
+    return FallbackTransport(HttpTransport(base_url, pool_size=pool_size), SshTransport(host))
+
+
+_default_transports: dict[str, object] = {}
+_default_lock = threading.Lock()
+
+
+def get_default_transport(host: str = DEFAULT_HOST):
+    """Process-wide transport for a host, so its connection pool is reused.
+
+    Uses a HostPool over every host when OLLAMA_HOSTS is set (``host`` is
+    then ignored), else HttpTransport (falling back to SSH) when
+    OLLAMA_BASE_URL is set, otherwise the SSH transport.
+    """
+    # Imported here: host_pool builds on the transports in this module
+    from persona_api.services.host_pool import configured_hosts, create_host_pool
+
+    hosts = configured_hosts()
+    key = hosts if hosts is not None else host
+    with _default_lock:
+        transport = _default_transports.get(key)
+        if transport is None:
+            if hosts is not None:
+                transport = create_host_pool(hosts)
+            else:
+                transport = create_transport(host, base_url=configured_base_url(), pool_size=configured_pool_size())
+            _default_transports[key] = transport
+        return transport
+
+
+def create_async_transport(
+    host: str = DEFAULT_HOST,
+    base_url: str | None = None,
+    pool_size: int = DEFAULT_POOL_SIZE,
+):
+    """Async create_transport: HTTP with SSH fallback if base_url is set, else SSH only."""
+    if base_url is None:
+        return AsyncSshTransport(host)
+    return AsyncFallbackTransport(AsyncHttpTransport(base_url, pool_size=pool_size), AsyncSshTransport(host))
+
+
+def create_default_async_transport(host: str = DEFAULT_HOST):
+    """Async transport configured like get_default_transport (OLLAMA_HOSTS, OLLAMA_BASE_URL).
+
+    Unlike get_default_transport this is not cached: async clients belong to
+    one event loop, so the caller owns the transport and must aclose() it.
+    """
+    from persona_api.services.host_pool import configured_hosts, create_async_host_pool
+
+    hosts = configured_hosts()
+    if hosts is not None:
+        return create_async_host_pool(hosts)
+    return create_async_transport(host, base_url=configured_base_url(), pool_size=configured_pool_size())
@@ -0,0 +1,164 @@
+"""Run the persona generation pipeline end to end."""
+
+import logging
+from dataclasses import dataclass
+from itertools import product
+from pathlib import Path
+from typing import Iterator
+
+from persona_api.services.domain_text_resolver import DomainTextResolver
+from persona_api.services.profile_generator import DEFAULT_INSTRUCTION_COUNT, ProfileGenerator
+from persona_api.services.random_facet_generator import RESULT_DOMAINS, PersonalityResult, RandomFacetGenerator
+from persona_api.services.text_cache import get_shared_text_source
+from persona_api.services.text_pack import DEFAULT_PACK_PATH, TextPack
+
+logger = logging.getLogger(__name__)
+
+
+def open_text_source(pack_path: Path | None = None, check_stale: bool = True):
+    """Open the text pack if it exists and is current, else the shared cached JSON source.
+
+    Args:
+        pack_path: Pack file to try (default: persona_api/data/text.pack).
+        check_stale: Compare the pack checksum against the JSON tree and
+            fall back to JSON if the pack is stale.
+    """
+    if pack_path is None:
+        pack_path = DEFAULT_PACK_PATH
+
+    if pack_path.exists():
+        pack = TextPack(pack_path)
+        if check_stale and pack.is_stale():
+            logger.warning("Text pack %s is stale; using JSON tree (rebuild with scripts/build_text_pack.py)", pack_path)
+            pack.close()
+        else:
+            return pack
+
+    return get_shared_text_source()
+
+
+@dataclass(slots=True)
+class PersonaResult:
+    personality: PersonalityResult
+    traits: list[dict]
+    prompt: str
+
+    @property
+    def seed(self) -> str:
+        return self.personality.seed
+
+
+class PersonaPipeline:
+    """Generates a personality, its behavioral traits and the profile prompt.
+
+    RandomFacetGenerator -> DomainTextResolver -> ProfileGenerator.slice_instructions
+    -> ProfileGenerator.generate_prompt. The text source is held for the
+    pipeline's lifetime, so entries are loaded once and shared by every call.
+    """
+
+    def __init__(self, source=None):
+        self._source = source if source is not None else get_shared_text_source()
+
+    @property
+    def source(self):
+        return self._source
+
+    def warm(self) -> int:
+        """Load every domain text entry into the source's cache. Returns entries loaded."""
+        loaded = 0
+        for domain in RESULT_DOMAINS:
+            for scores in product(range(1, 6), repeat=3):
+                if self._source.load(domain, scores) is not None:
+                    loaded += 1
+        return loaded
+
+    def generate(
+        self,
+        seed: str | None = None,
+        coherence: int | None = None,
+        trait_count: int = DEFAULT_INSTRUCTION_COUNT,
+        length: int | None = None,
+    ) -> PersonaResult:
+        """Generate one persona.
+
+        Args:
+            seed: Seed for reproducible generation (random if None).
+            coherence: Optional coherence level (1, 2, or 3).
+            trait_count: Number of behavioral traits to slice.
+            length: Optional target profile length for the prompt.
+        """
+        personality = RandomFacetGenerator(seed=seed).generate(coherence=coherence)
+        return self._build(personality, trait_count=trait_count, length=length)
+
+    def iter_many(
+        self,
+        count: int,
+        seed: str,
+        coherence: int | None = None,
+        domain_scores: dict[str, int] | None = None,
+        trait_count: int = DEFAULT_INSTRUCTION_COUNT,
+        length: int | None = None,
+    ) -> Iterator[PersonaResult]:
+        """Lazily generate personas with per-item seeds.
+
+        Persona i is generated entirely from derive_item_seed(seed, i) (see
+        RandomFacetGenerator.iter_generate), so its ``seed`` reproduces it on
+        its own: without domain_scores, ``generate(seed=persona.seed,
+        coherence=coherence)`` returns the same persona. Only one persona is
+        held at a time, and the same seed and arguments always yield the
+        same personas.
+
+        Args:
+            count: Number of personas.
+            seed: Base seed.
+            coherence: Optional coherence level (1, 2, or 3).
+            domain_scores: Optional {domain: score} pins; those domains get
+                all three facets set to the score, the rest stay random.
+            trait_count: Number of behavioral traits per persona.
+            length: Optional target profile length for the prompts.
+        """
+        personalities = RandomFacetGenerator(seed=seed).iter_generate(coherence=coherence, stop=count)
+        for personality in personalities:
+            if domain_scores:
+                personality.fix_domains(domain_scores)
+            yield self._build(personality, trait_count=trait_count, length=length)
+
+    def generate_many(
+        self,
+        count: int,
+        seed: str | None = None,
+        coherence: int | None = None,
+        domain_scores: dict[str, int] | None = None,
+        trait_count: int = DEFAULT_INSTRUCTION_COUNT,
+        length: int | None = None,
+    ) -> tuple[str, list[PersonaResult]]:
+        """Generate many personas at once (see iter_many).
+
+        Returns:
+            Tuple of (base seed, list of PersonaResult).
+        """
+        if seed is None:
+            seed = RandomFacetGenerator().seed
+        personas = list(self.iter_many(
+            count,
+            seed,
+            coherence=coherence,
+            domain_scores=domain_scores,
+            trait_count=trait_count,
+            length=length,
+        ))
+        return seed, personas
+
+    def _build(self, personality: PersonalityResult, trait_count: int, length: int | None) -> PersonaResult:
+        """Resolve behaviors for a personality and slice its traits."""
+        resolver = DomainTextResolver(seed=personality.seed, source=self._source)
+        behaviors = resolver.resolve_all(personality.to_facet_scores())
+
+        profile_gen = ProfileGenerator(seed=personality.seed)
+        traits = profile_gen.slice_instructions(behaviors, count=trait_count)
+
+        return PersonaResult(
+            personality=personality,
+            traits=traits,
+            prompt=profile_gen.generate_prompt(traits, length=length),
+        )
@@ -0,0 +1,217 @@
+"""Content-addressed cache of generated profiles.
+
+A profile is keyed by a hash of the Ollama payload that produced it (model,
+rendered prompt and generation options), so identical trait lists, model and
+length target are served from the cache instead of a new LLM call. Entries
+live in a bounded in-memory LRU and, optionally, an on-disk SQLite tier
+with a TTL shared by every process pointing at the same file.
+
+Async callers use aget/aset, which serve the memory tier inline and run
+SQLite reads and commits in a worker thread, off the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TTL = 7 * 24 * 60 * 60  # seconds
+
+MAX_ENTRIES_ENV = "PERSONA_PROFILE_CACHE_ENTRIES"
+PATH_ENV = "PERSONA_PROFILE_CACHE_PATH"
+TTL_ENV = "PERSONA_PROFILE_CACHE_TTL"
+
+# Payload fields that change the generated text (not "stream")
+KEY_FIELDS = ("model", "prompt", "options", "system", "template")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    key TEXT PRIMARY KEY,
+    profile TEXT NOT NULL,
+    created REAL NOT NULL
+)
+"""
+
+
+def profile_cache_key(payload: dict) -> str:
+    """Hash the parts of an Ollama generate payload that determine its output."""
+    material = {field: payload[field] for field in KEY_FIELDS if payload.get(field) is not None}
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class ProfileCache:
+    """Two-tier profile cache: in-memory LRU in front of optional SQLite.
+
+    Args:
+        max_entries: Profiles kept in memory; 0 disables the memory tier.
+        path: SQLite file for the disk tier (None for memory only).
+        ttl: Seconds a disk entry stays valid (None to never expire).
+            Memory entries are dropped at the same age.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, path: Path | str | None = None, ttl: float | None = DEFAULT_TTL):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._lock = threading.Lock()  # memory tier and counters
+        self._db_lock = threading.Lock()  # SQLite connection, so disk I/O never holds up memory hits
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+        self._db = None
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(_SCHEMA)
+            self._db.commit()
+
+    def _is_expired(self, created: float, now: float) -> bool:
+        return self._ttl is not None and now - created > self._ttl
+
+    def get(self, key: str) -> str | None:
+        """Return the cached profile for a key, or None."""
+        now = time.time()
+        profile = self._get_memory(key, now)
+        if profile is None:
+            profile = self._get_disk(key, now)
+        return profile
+
+    async def aget(self, key: str) -> str | None:
+        """get() for coroutines: a disk tier lookup runs in a worker thread."""
+        now = time.time()
+        profile = self._get_memory(key, now)
+        if profile is not None:
+            return profile
+        if self._db is None:
+            return self._get_disk(key, now)  # counts the miss
+        return await asyncio.to_thread(self._get_disk, key, now)
+
+    def set(self, key: str, profile: str):
+        """Store a profile in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, profile, now)
+        self._set_disk(key, profile, now)
+
+    async def aset(self, key: str, profile: str):
+        """set() for coroutines: the disk tier write runs in a worker thread."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, profile, now)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, profile, now)
+
+    def _get_memory(self, key: str, now: float) -> str | None:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                if not self._is_expired(cached[1], now):
+                    self._entries.move_to_end(key)
+                    self._memory_hits += 1
+                    return cached[0]
+                del self._entries[key]
+        return None
+
+    def _get_disk(self, key: str, now: float) -> str | None:
+        """Look a memory-tier miss up on disk; counts the disk hit or the miss."""
+        with self._db_lock:
+            row = None
+            if self._db is not None:
+                row = self._db.execute("SELECT profile, created FROM profiles WHERE key = ?", (key,)).fetchone()
+                if row is not None and self._is_expired(row[1], now):
+                    self._db.execute("DELETE FROM profiles WHERE key = ?", (key,))
+                    self._db.commit()
+                    row = None
+
+        with self._lock:
+            if row is None:
+                self._misses += 1
+                return None
+            profile, created = row
+            self._remember(key, profile, created)
+            self._disk_hits += 1
+            return profile
+
+    def _set_disk(self, key: str, profile: str, now: float):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO profiles (key, profile, created) VALUES (?, ?, ?)", (key, profile, now))
+                self._db.commit()
+
+    def _remember(self, key: str, profile: str, created: float):
+        """Add to the memory tier, evicting least-recently-used. Caller holds the lock."""
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = (profile, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def purge_expired(self) -> int:
+        """Delete expired disk entries. Returns the number removed."""
+        if self._db is None or self._ttl is None:
+            return 0
+        with self._db_lock:
+            cursor = self._db.execute("DELETE FROM profiles WHERE created < ?", (time.time() - self._ttl,))
+            self._db.commit()
+            return cursor.rowcount
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current usage."""
+        disk_entries = None
+        with self._db_lock:
+            if self._db is not None:
+                disk_entries = self._db.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+        with self._lock:
+            lookups = self._memory_hits + self._disk_hits + self._misses
+            hits = self._memory_hits + self._disk_hits
+            return {
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._entries),
+                "disk_entries": disk_entries,
+            }
+
+    def clear(self):
+        """Drop all entries from both tiers and reset counters."""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.execute("DELETE FROM profiles")
+                self._db.commit()
+        with self._lock:
+            self._entries.clear()
+            self._memory_hits = 0
+            self._disk_hits = 0
+            self._misses = 0
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def configured_profile_cache() -> ProfileCache:
+    """ProfileCache configured from PERSONA_PROFILE_CACHE_* environment variables.
+
+    Memory only unless PERSONA_PROFILE_CACHE_PATH names a SQLite file; a TTL
+    of 0 or less means entries never expire.
+    """
+    max_entries = int(os.environ.get(MAX_ENTRIES_ENV) or DEFAULT_MAX_ENTRIES)
+    ttl = float(os.environ.get(TTL_ENV) or DEFAULT_TTL)
+    return ProfileCache(
+        max_entries=max_entries,
+        path=os.environ.get(PATH_ENV) or None,
+        ttl=ttl if ttl > 0 else None,
+    )
@@ -1,13 +1,19 @@
 """Generate chatbot personality profiles from behavioral instructions."""
 
-import json
+import asyncio
 import random
-import subprocess
+from typing import AsyncIterator
+
+from persona_api.services.ollama_transport import DEFAULT_HOST, create_default_async_transport, get_default_transport
+from persona_api.services.profile_cache import profile_cache_key
 
 
 DEFAULT_INSTRUCTION_COUNT = 5
 DEFAULT_MODEL = "llama3.2"
-DEFAULT_HOST = "sparx"
+
+# Async generation: Ollama requests in flight at once, and seconds per request
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PROFILE_TIMEOUT = 180.0
 
 PROFILE_PROMPT_TEMPLATE = """You are a personality writer for chatbots. Given a set of behavioral traits, write a system prompt that will instruct an LLM to embody this personality in all responses.
 
@@ -44,11 +50,26 @@ MAX_LENGTH_CONSTRAINT = 600
 
 
 class ProfileGenerator:
-    """Generates chatbot personality profiles from BFI-2 behavioral instructions."""
-
-    def __init__(self, seed: str | None = None):
+    """Generates chatbot personality profiles from BFI-2 behavioral instructions.
+
+    Args:
+        seed: Seed for instruction sampling.
+        transport: Ollama transport (see ollama_transport). If None, the
+            process-wide default transport for the ``host`` passed to
+            generate_profile is used.
+        async_transport: Async Ollama transport for agenerate_profile /
+            agenerate_many. If None, one is created per call from
+            OLLAMA_BASE_URL for the ``host`` passed.
+        cache: Optional ProfileCache; profiles are looked up by a hash of
+            the Ollama payload before calling the LLM.
+    """
+
+    def __init__(self, seed: str | None = None, transport=None, async_transport=None, cache=None):
         self._seed = seed
         self._rng = random.Random(seed)
+        self._transport = transport
+        self._async_transport = async_transport
+        self._cache = cache
 
     def slice_instructions(
         self,
@@ -166,33 +187,200 @@ class ProfileGenerator:
         host: str = DEFAULT_HOST,
         length: int | None = None,
     ) -> str:
-        """Generate a personality profile using Ollama via SSH.
+        """Generate a personality profile using Ollama.
 
         Args:
             traits: List of trait dicts with "trait" and "domain" keys.
             model: Ollama model name.
-            host: SSH host running Ollama.
+            host: SSH host running Ollama (ignored if a transport was given).
             length: Optional target character length (±10%).
 
         Returns:
             Generated personality profile text.
         """
-        prompt = self.generate_prompt(traits, length=length)
+        payload = self._build_payload(traits, model, length)
+        key, cached = self._cache_lookup(payload)
+        if cached is not None:
+            return cached
 
-        payload = json.dumps({
-            "model": model,
-            "prompt": prompt,
-            "stream": False,
-        })
+        transport = self._transport if self._transport is not None else get_default_transport(host)
+        response = transport.generate(payload)
+        return self._cache_store(key, response.get("response", "").strip())
+
+    async def agenerate_profile(
+        self,
+        traits: list[dict],
+        model: str = DEFAULT_MODEL,
+        host: str = DEFAULT_HOST,
+        length: int | None = None,
+        timeout: float | None = DEFAULT_PROFILE_TIMEOUT,
+    ) -> str:
+        """Async generate_profile.
+
+        Args:
+            traits: List of trait dicts with "trait" and "domain" keys.
+            model: Ollama model name.
+            host: SSH host running Ollama (ignored if an async transport was given).
+            length: Optional target character length (±10%).
+            timeout: Seconds before the request is abandoned (None for no limit).
+
+        Returns:
+            Generated personality profile text.
+
+        Raises:
+            TimeoutError: If the request takes longer than ``timeout``.
+        """
+        if self._async_transport is not None:
+            return await self._agenerate(self._async_transport, traits, model, length, timeout)
+
+        transport = create_default_async_transport(host)
+        try:
+            return await self._agenerate(transport, traits, model, length, timeout)
+        finally:
+            await transport.aclose()
 
-        # Use SSH to call Ollama on remote host
-        # Pass payload via stdin to avoid shell quoting issues
-        cmd = ["ssh", host, "curl -s http://localhost:11434/api/generate -d @-"]
+    async def agenerate_many(
+        self,
+        trait_sets: list[list[dict]],
+        model: str = DEFAULT_MODEL,
+        host: str = DEFAULT_HOST,
+        length: int | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float | None = DEFAULT_PROFILE_TIMEOUT,
+        return_exceptions: bool = False,
+    ) -> list:
+        """Generate a profile for each trait list, at most ``concurrency`` at a time.
+
+        Args:
+            trait_sets: One list of trait dicts per profile.
+            model: Ollama model name.
+            host: SSH host running Ollama (ignored if an async transport was given).
+            length: Optional target character length (±10%) for every profile.
+            concurrency: Maximum requests in flight.
+            timeout: Per-request seconds, not counting time queued for a slot.
+            return_exceptions: Return failed or timed-out items as their
+                exception instead of raising the first failure.
+
+        Returns:
+            Profiles (or exceptions) in the order of ``trait_sets``.
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+
+        semaphore = asyncio.Semaphore(concurrency)
+        owned = self._async_transport is None
+        transport = create_default_async_transport(host) if owned else self._async_transport
+
+        async def run(traits):
+            async with semaphore:
+                return await self._agenerate(transport, traits, model, length, timeout)
+
+        tasks = [asyncio.ensure_future(run(traits)) for traits in trait_sets]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            if owned:
+                await transport.aclose()
+
+    async def astream_profile(
+        self,
+        traits: list[dict],
+        model: str = DEFAULT_MODEL,
+        host: str = DEFAULT_HOST,
+        length: int | None = None,
+        timeout: float | None = DEFAULT_PROFILE_TIMEOUT,
+    ) -> AsyncIterator[str]:
+        """Stream profile text from Ollama as it is generated.
 
-        result = subprocess.run(cmd, input=payload, capture_output=True, text=True, timeout=120)
+        Joined and stripped, the yielded pieces are the same text
+        generate_profile would return.
 
-        if result.returncode != 0:
-            raise RuntimeError(f"SSH/Ollama error: {result.stderr}")
+        Args:
+            traits: List of trait dicts with "trait" and "domain" keys.
+            model: Ollama model name.
+            host: SSH host running Ollama (ignored if an async transport was given).
+            length: Optional target character length (±10%).
+            timeout: Seconds to wait for each chunk, including the first.
+
+        Raises:
+            TimeoutError: If a chunk takes longer than ``timeout``.
+        """
+        payload = self._build_payload(traits, model, length, stream=True)
+        key, cached = await self._acache_lookup(payload)
+        if cached is not None:
+            yield cached
+            return
+
+        owned = self._async_transport is None
+        transport = create_default_async_transport(host) if owned else self._async_transport
+        chunks = transport.stream(payload)
+        pieces = []
+        done = False
+
+        try:
+            while not done:
+                try:
+                    async with asyncio.timeout(timeout):
+                        chunk = await anext(chunks)
+                except StopAsyncIteration:
+                    break
+
+                text = chunk.get("response", "")
+                if text:
+                    pieces.append(text)
+                    yield text
+                done = bool(chunk.get("done"))
+        finally:
+            await chunks.aclose()
+            if owned:
+                await transport.aclose()
+
+        # A stream that ended without its done chunk was cut short; don't cache it
+        if done:
+            await self._acache_store(key, "".join(pieces).strip())
+
+    async def _agenerate(self, transport, traits: list[dict], model: str, length: int | None, timeout: float | None) -> str:
+        payload = self._build_payload(traits, model, length)
+        key, cached = await self._acache_lookup(payload)
+        if cached is not None:
+            return cached
+
+        async with asyncio.timeout(timeout):
+            response = await transport.generate(payload)
+        return await self._acache_store(key, response.get("response", "").strip())
+
+    def _cache_lookup(self, payload: dict) -> tuple[str | None, str | None]:
+        """Return (cache key, cached profile or None); the key is None without a cache."""
+        if self._cache is None:
+            return None, None
+        key = profile_cache_key(payload)
+        return key, self._cache.get(key)
+
+    def _cache_store(self, key: str | None, profile: str) -> str:
+        if key is not None and profile:
+            self._cache.set(key, profile)
+        return profile
+
+    async def _acache_lookup(self, payload: dict) -> tuple[str | None, str | None]:
+        """_cache_lookup for coroutines; the disk tier is read off the event loop."""
+        if self._cache is None:
+            return None, None
+        key = profile_cache_key(payload)
+        return key, await self._cache.aget(key)
+
+    async def _acache_store(self, key: str | None, profile: str) -> str:
+        if key is not None and profile:
+            await self._cache.aset(key, profile)
+        return profile
+
+    def _build_payload(self, traits: list[dict], model: str, length: int | None, stream: bool = False) -> dict:
+        return {
+            "model": model,
+            "prompt": self.generate_prompt(traits, length=length),
+            "stream": stream,
+        }
 
-        response = json.loads(result.stdout)
-        return response.get("response", "").strip()
@@ -0,0 +1,92 @@
+"""Append-only journal of written training samples, for exact resume.
+
+generate_training_data.py records every sample it has written as one
+fixed-size record, (combo index, tier index, run index) packed as
+``<HBB`` (4 bytes), in ``progress.journal`` next to its output. On restart
+the journal is loaded and exactly the missing (combo, tier, run) samples
+are generated, including the rest of a combo that was interrupted midway.
+
+Records are appended only after their sample lines are on disk, so a crash
+in between regenerates a sample rather than losing it. A torn trailing
+record left by a crash is truncated on load. Without a journal, rebuild()
+recreates it once from the seeds in existing output lines.
+"""
+
+import os
+import re
+import struct
+from collections.abc import Iterable
+from pathlib import Path
+
+JOURNAL_NAME = "progress.journal"
+
+# Seeds are "<combo>_<tier>_<run>_<random>"
+SEED_PATTERN = re.compile(r'"seed": "(\d+)_(\d+)_(\d+)_')
+
+
+class ProgressJournal:
+    """Append-only record of written samples, one (combo, tier, run) per record.
+
+    Args:
+        path: Journal file (created on the first record).
+    """
+
+    RECORD = struct.Struct("<HBB")
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.done: set[tuple[int, int, int]] = set()
+        self._file = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> int:
+        """Read the journal into ``done``, truncating a torn trailing record. Returns the number of records."""
+        data = self.path.read_bytes() if self.path.exists() else b""
+        usable = len(data) - len(data) % self.RECORD.size
+        if usable != len(data):
+            with open(self.path, "r+b") as f:
+                f.truncate(usable)
+
+        self.done = set(self.RECORD.iter_unpack(data[:usable]))
+        return usable // self.RECORD.size
+
+    def rebuild(self, lines: Iterable[str]) -> int:
+        """Recreate the journal from the seeds of existing output lines. Returns samples found."""
+        self.done = set()
+        for line in lines:
+            match = SEED_PATTERN.search(line)
+            if match:
+                self.done.add((int(match.group(1)), int(match.group(2)), int(match.group(3))))
+
+        with open(self.path, "wb") as f:
+            f.write(b"".join(self.RECORD.pack(*key) for key in sorted(self.done)))
+        return len(self.done)
+
+    def is_done(self, combo_idx: int, tier_idx: int, run_idx: int) -> bool:
+        return (combo_idx, tier_idx, run_idx) in self.done
+
+    def missing(self, combo_idx: int, tiers: int, runs: int) -> list[tuple[int, int]]:
+        """(tier_idx, run_idx) pairs of a combo not yet recorded, in generation order."""
+        return [
+            (tier_idx, run_idx)
+            for tier_idx in range(tiers)
+            for run_idx in range(runs)
+            if not self.is_done(combo_idx, tier_idx, run_idx)
+        ]
+
+    def record(self, keys: list[tuple[int, int, int]], fsync: bool = False):
+        """Append records for samples whose lines are already on disk."""
+        if self._file is None:
+            self._file = open(self.path, "ab")
+        self._file.write(b"".join(self.RECORD.pack(*key) for key in keys))
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+        self.done.update(keys)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
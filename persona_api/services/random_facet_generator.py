@@ -1,6 +1,10 @@
+import hashlib
 import random
 from dataclasses import dataclass
-from itertools import product
+from itertools import count, product
+from typing import Iterator
+
+import numpy as np
 
 
 def _domain_score(f1: int, f2: int, f3: int) -> int:
@@ -61,73 +65,115 @@ def _precompute_coherence_sets() -> dict[int, list[tuple[int, int, int]]]:
 # Precomputed at module load for efficiency
 COHERENCE_SETS = _precompute_coherence_sets()
 
+# Same sets as (k, 3) arrays for batch generation
+COHERENCE_ARRAYS = {level: np.array(sets, dtype=np.int8) for level, sets in COHERENCE_SETS.items()}
 
-@dataclass
+# Domain and facet order of PersonalityResult (also axis 1 and axis 2 of batch arrays)
+RESULT_DOMAINS = ("extraversion", "agreeableness", "conscientiousness", "negative_emotionality", "open_mindedness")
+RESULT_FACETS = {
+    "extraversion": ("sociability", "assertiveness", "energy_level"),
+    "agreeableness": ("compassion", "respectfulness", "trust"),
+    "conscientiousness": ("organization", "productiveness", "responsibility"),
+    "negative_emotionality": ("anxiety", "depression", "emotional_volatility"),
+    "open_mindedness": ("intellectual_curiosity", "aesthetic_sensitivity", "creative_imagination"),
+}
+_E, _A, _C, _N, _O = range(5)
+
+
+def derive_item_seed(base_seed: str, index: int) -> str:
+    """Seed for item ``index`` of a stream started from ``base_seed``.
+
+    Each item gets its own seed, so item k can be regenerated with
+    ``RandomFacetGenerator(seed=derive_item_seed(base, k)).generate()``
+    without replaying items 0..k-1.
+    """
+    return f"{base_seed}:{index}"
+
+
+def _chunked(items: Iterator, chunk_size: int) -> Iterator[list]:
+    """Group an iterator into lists of up to chunk_size items."""
+    chunk: list = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _numpy_rng(seed: str) -> np.random.Generator:
+    """Build a NumPy generator deterministically from a string seed."""
+    digest = hashlib.sha256(seed.encode("utf-8")).digest()
+    return np.random.default_rng(int.from_bytes(digest[:16], "little"))
+
+
+@dataclass(slots=True)
 class ExtraversionFacets:
     sociability: int
     assertiveness: int
     energy_level: int
 
 
-@dataclass
+@dataclass(slots=True)
 class AgreeablenessFacets:
     compassion: int
     respectfulness: int
     trust: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ConscientiousnessFacets:
     organization: int
     productiveness: int
     responsibility: int
 
 
-@dataclass
+@dataclass(slots=True)
 class NegativeEmotionalityFacets:
     anxiety: int
     depression: int
     emotional_volatility: int
 
 
-@dataclass
+@dataclass(slots=True)
 class OpenMindednessFacets:
     intellectual_curiosity: int
     aesthetic_sensitivity: int
     creative_imagination: int
 
 
-@dataclass
+@dataclass(slots=True)
 class ExtraversionResult:
     score: int
     facets: ExtraversionFacets
 
 
-@dataclass
+@dataclass(slots=True)
 class AgreeablenessResult:
     score: int
     facets: AgreeablenessFacets
 
 
-@dataclass
+@dataclass(slots=True)
 class ConscientiousnessResult:
     score: int
     facets: ConscientiousnessFacets
 
 
-@dataclass
+@dataclass(slots=True)
 class NegativeEmotionalityResult:
     score: int
     facets: NegativeEmotionalityFacets
 
 
-@dataclass
+@dataclass(slots=True)
 class OpenMindednessResult:
     score: int
     facets: OpenMindednessFacets
 
 
-@dataclass
+@dataclass(slots=True)
 class PersonalityResult:
     extraversion: ExtraversionResult
     agreeableness: AgreeablenessResult
@@ -136,6 +182,84 @@ class PersonalityResult:
     open_mindedness: OpenMindednessResult
     seed: str
 
+    def to_facet_scores(self) -> dict[str, tuple[int, int, int]]:
+        """Facet scores as {domain: (f1, f2, f3)}, the shape the resolvers take."""
+        return {
+            domain: tuple(getattr(getattr(self, domain).facets, facet) for facet in RESULT_FACETS[domain])
+            for domain in RESULT_DOMAINS
+        }
+
+    def fix_domains(self, domain_scores: dict[str, int]):
+        """Pin domains to explicit scores in place (all three facets set to the score)."""
+        for domain, score in domain_scores.items():
+            if domain not in RESULT_DOMAINS:
+                raise ValueError(f"Unknown domain: {domain}")
+            if not 1 <= score <= 5:
+                raise ValueError(f"Score for {domain} must be 1-5, got {score}")
+        for domain, score in domain_scores.items():
+            domain_result = getattr(self, domain)
+            domain_result.score = score
+            for facet in RESULT_FACETS[domain]:
+                setattr(domain_result.facets, facet, score)
+
+    def to_dict(self) -> dict:
+        """Plain dict: {"seed": ..., domain: {"score": ..., "facets": {name: score}}}."""
+        output: dict = {"seed": self.seed}
+        for domain in RESULT_DOMAINS:
+            domain_result = getattr(self, domain)
+            output[domain] = {
+                "score": domain_result.score,
+                "facets": {facet: getattr(domain_result.facets, facet) for facet in RESULT_FACETS[domain]},
+            }
+        return output
+
+
+@dataclass
+class PersonalityBatch:
+    """A batch of generated personalities as NumPy arrays.
+
+    Attributes:
+        facets: (n, 5, 3) int8 facet scores; axis 1 follows RESULT_DOMAINS and
+            axis 2 follows RESULT_FACETS[domain].
+        scores: (n, 5) int8 domain scores (rounded facet average).
+        seed: Seed of the generator that produced the batch.
+    """
+
+    facets: np.ndarray
+    scores: np.ndarray
+    seed: str
+
+    def __len__(self) -> int:
+        return len(self.facets)
+
+    def to_result(self, idx: int) -> PersonalityResult:
+        """Convert one row of the batch to a PersonalityResult."""
+        e, a, c, n, o = self.facets[idx].tolist()
+        e_score, a_score, c_score, n_score, o_score = self.scores[idx].tolist()
+        return PersonalityResult(
+            extraversion=ExtraversionResult(
+                score=e_score,
+                facets=ExtraversionFacets(sociability=e[0], assertiveness=e[1], energy_level=e[2]),
+            ),
+            agreeableness=AgreeablenessResult(
+                score=a_score,
+                facets=AgreeablenessFacets(compassion=a[0], respectfulness=a[1], trust=a[2]),
+            ),
+            conscientiousness=ConscientiousnessResult(
+                score=c_score,
+                facets=ConscientiousnessFacets(organization=c[0], productiveness=c[1], responsibility=c[2]),
+            ),
+            negative_emotionality=NegativeEmotionalityResult(
+                score=n_score,
+                facets=NegativeEmotionalityFacets(anxiety=n[0], depression=n[1], emotional_volatility=n[2]),
+            ),
+            open_mindedness=OpenMindednessResult(
+                score=o_score,
+                facets=OpenMindednessFacets(intellectual_curiosity=o[0], aesthetic_sensitivity=o[1], creative_imagination=o[2]),
+            ),
+            seed=self.seed,
+        )
+
 
 class RandomFacetGenerator:
     """Generates random BFI-2 personality scores."""
@@ -143,6 +267,11 @@ class RandomFacetGenerator:
     def __init__(self, seed: str | None = None):
         self._seed = seed or self._generate_seed()
         self._rng = random.Random(self._seed)
+        self._np_rng: np.random.Generator | None = None
+
+    @property
+    def seed(self) -> str:
+        return self._seed
 
     def _generate_seed(self) -> str:
         return f"{random.randint(0, 999999):06d}"
@@ -281,3 +410,99 @@ class RandomFacetGenerator:
             ),
             seed=self._seed,
         )
+
+    def generate_item(self, index: int, coherence: int | None = None) -> PersonalityResult:
+        """Generate item ``index`` of this generator's stream (see iter_generate)."""
+        if index < 0:
+            raise ValueError(f"index must be non-negative, got {index}")
+        item_gen = RandomFacetGenerator(seed=derive_item_seed(self._seed, index))
+        return item_gen.generate(coherence=coherence)
+
+    def iter_generate(
+        self,
+        coherence: int | None = None,
+        start: int = 0,
+        stop: int | None = None,
+        step: int = 1,
+        chunk_size: int | None = None,
+    ) -> Iterator[PersonalityResult] | Iterator[list[PersonalityResult]]:
+        """Lazily generate personalities with per-item seeds.
+
+        Item k is seeded with derive_item_seed(seed, k), so the stream can be
+        resumed at any index or sharded across processes (e.g. process i of m
+        uses ``start=i, step=m``) and every item is identical to a sequential
+        run. Memory use is constant: only the current item or chunk is held.
+
+        Args:
+            coherence: Optional coherence level (1, 2, or 3), as in generate().
+            start: First item index.
+            stop: Item index to stop before; None streams forever.
+            step: Index increment between items.
+            chunk_size: If set, yield lists of up to chunk_size results.
+
+        Yields:
+            PersonalityResult per item, or lists of them when chunk_size is set.
+        """
+        if start < 0:
+            raise ValueError(f"start must be non-negative, got {start}")
+        if step < 1:
+            raise ValueError(f"step must be positive, got {step}")
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+        indices = count(start, step) if stop is None else iter(range(start, stop, step))
+        items = (self.generate_item(index, coherence=coherence) for index in indices)
+
+        if chunk_size is None:
+            return items
+        return _chunked(items, chunk_size)
+
+    def generate_batch(self, n: int, coherence: int | None = None) -> PersonalityBatch:
+        """Generate n personality profiles at once with NumPy.
+
+        Follows the same rules as generate(): with ``coherence`` each domain
+        draws from COHERENCE_SETS[coherence]; otherwise N is drawn first and
+        biases E, A, C, and a high E biases O upward.
+
+        Batches are reproducible from the generator seed (successive calls
+        continue the same stream), but draw from a NumPy stream, so they do
+        not match n calls to generate() with the same seed.
+
+        Args:
+            n: Number of personalities to generate.
+            coherence: Optional coherence level (1, 2, or 3).
+        """
+        if n < 0:
+            raise ValueError(f"n must be non-negative, got {n}")
+        if coherence is not None and coherence not in COHERENCE_ARRAYS:
+            raise ValueError(f"coherence must be 1, 2, or 3, got {coherence}")
+
+        if self._np_rng is None:
+            self._np_rng = _numpy_rng(self._seed)
+        rng = self._np_rng
+
+        if coherence is not None:
+            sets = COHERENCE_ARRAYS[coherence]
+            facets = sets[rng.integers(0, len(sets), size=(n, 5))]
+        else:
+            facets = np.empty((n, 5, 3), dtype=np.int8)
+
+            # Negative emotionality first (anchor for correlations)
+            facets[:, _N] = rng.integers(1, 6, size=(n, 3), dtype=np.int8)
+            n_sum = facets[:, _N].sum(axis=1, dtype=np.int16)
+            # avg >= 4 -> -1, avg <= 2 -> +1 (high N -> lower E, A, C)
+            n_bias = np.where(n_sum >= 12, -1, np.where(n_sum <= 6, 1, 0)).astype(np.int8)
+
+            raw = rng.integers(1, 6, size=(n, 3, 3), dtype=np.int8)
+            facets[:, [_E, _A, _C]] = np.clip(raw + n_bias[:, None, None], 1, 5)
+
+            # Open-mindedness has weak positive correlation with E
+            e_sum = facets[:, _E].sum(axis=1, dtype=np.int16)
+            o_bias = (e_sum >= 12).astype(np.int8)
+            raw_o = rng.integers(1, 6, size=(n, 3), dtype=np.int8)
+            facets[:, _O] = np.clip(raw_o + o_bias[:, None], 1, 5)
+
+        # round(sum / 3) never hits .5 for integer sums, so (sum + 1) // 3 matches
+        scores = ((facets.sum(axis=2, dtype=np.int16) + 1) // 3).astype(np.int8)
+
+        return PersonalityBatch(facets=facets, scores=scores, seed=self._seed)
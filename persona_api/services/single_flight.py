@@ -0,0 +1,209 @@
+"""Coalesce concurrent identical Ollama requests into one call.
+
+CoalescingTransport and AsyncCoalescingTransport wrap another transport.
+While a request is in flight, identical payloads (same profile_cache_key:
+model, prompt, options) wait for it instead of starting their own LLM
+call, and every waiter receives its result or error. Streams are shared
+the same way: a late joiner first gets the chunks produced so far, then
+follows along live. Once the call finishes the key is released, so later
+requests go to the LLM (or the ProfileCache) again.
+
+Coalescing trades sample diversity for throughput, so it is opt-in: the
+API server uses it, the training data scripts do not.
+"""
+
+import asyncio
+import threading
+from typing import AsyncIterator
+
+from persona_api.services.profile_cache import profile_cache_key
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CoalescingTransport:
+    """Thread-safe single-flight wrapper around a sync transport.
+
+    Waiters share the leader's response dict; treat it as read-only.
+    """
+
+    def __init__(self, transport):
+        self._transport = transport
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        self._coalesced = 0
+
+    @property
+    def transport(self):
+        return self._transport
+
+    @property
+    def coalesced(self) -> int:
+        """Requests that were served by another request's call."""
+        return self._coalesced
+
+    def generate(self, payload: dict) -> dict:
+        key = profile_cache_key(payload)
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._transport.generate(payload)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def health(self) -> bool:
+        return self._transport.health()
+
+    def close(self):
+        self._transport.close()
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _SharedStream:
+    __slots__ = ("chunks", "done", "error", "changed", "subscribers", "task")
+
+    def __init__(self):
+        self.chunks: list[dict] = []
+        self.done = False
+        self.error = None
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+        self.task = None
+
+    def notify(self):
+        # Wake everyone waiting on the current event; later waits use a fresh one
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class AsyncCoalescingTransport:
+    """Single-flight wrapper around an async transport; use from one event loop.
+
+    The shared call runs as its own task, so one waiter being cancelled does
+    not cancel it for the others; it is cancelled once no waiters remain.
+    """
+
+    def __init__(self, transport):
+        self._transport = transport
+        self._flights: dict[str, _Flight] = {}
+        self._streams: dict[str, _SharedStream] = {}
+        self._coalesced = 0
+
+    @property
+    def transport(self):
+        return self._transport
+
+    @property
+    def coalesced(self) -> int:
+        """Requests (or streams) that were served by another request's call."""
+        return self._coalesced
+
+    async def generate(self, payload: dict) -> dict:
+        key = profile_cache_key(payload)
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(self._transport.generate(payload)))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task: self._forget(self._flights, key, flight))
+        else:
+            self._coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Unregister first: a new identical request must start its own call,
+                # not join this one before its done-callback has run
+                self._forget(self._flights, key, flight)
+                flight.task.cancel()
+
+    async def stream(self, payload: dict) -> AsyncIterator[dict]:
+        key = profile_cache_key(payload)
+        shared = self._streams.get(key)
+        if shared is None:
+            shared = _SharedStream()
+            self._streams[key] = shared
+            shared.task = asyncio.ensure_future(self._pump(key, shared, payload))
+        else:
+            self._coalesced += 1
+
+        shared.subscribers += 1
+        try:
+            position = 0
+            while True:
+                while position < len(shared.chunks):
+                    yield shared.chunks[position]
+                    position += 1
+                if shared.done:
+                    if shared.error is not None:
+                        raise shared.error
+                    return
+                await shared.changed.wait()
+        finally:
+            shared.subscribers -= 1
+            if shared.subscribers == 0 and not shared.task.done():
+                self._forget(self._streams, key, shared)
+                shared.task.cancel()
+
+    async def _pump(self, key: str, shared: _SharedStream, payload: dict):
+        """Read the underlying stream once, publishing chunks to every subscriber."""
+        try:
+            async for chunk in self._transport.stream(payload):
+                shared.chunks.append(chunk)
+                shared.notify()
+        except Exception as e:
+            shared.error = e
+        except asyncio.CancelledError as e:
+            # Never let a subscriber mistake a cancelled stream for a complete one
+            shared.error = e
+            raise
+        finally:
+            shared.done = True
+            self._forget(self._streams, key, shared)
+            shared.notify()
+
+    @staticmethod
+    def _forget(registry: dict, key: str, entry):
+        if registry.get(key) is entry:
+            del registry[key]
+
+    async def health(self) -> bool:
+        return await self._transport.health()
+
+    async def aclose(self):
+        await self._transport.aclose()
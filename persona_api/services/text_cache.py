@@ -0,0 +1,175 @@
+"""Bounded, thread-safe LRU cache in front of a text source.
+
+The text files never change at runtime, so parsed entries can be kept
+in-process and shared by every DomainTextResolver and BehaviorResolver.
+The cache is bounded by an approximate byte budget (set per deployment
+with PERSONA_TEXT_CACHE_BYTES) and evicts least-recently-used entries.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from persona_api.services.text_source import DEFAULT_TEXT_DIR, JsonTextSource, TextEntry
+
+# Parsing the full corpus costs roughly 22 MB, so the default holds all of it
+DEFAULT_CACHE_BYTES = 32 * 1024 * 1024
+CACHE_BYTES_ENV = "PERSONA_TEXT_CACHE_BYTES"
+
+# Approximate cost of remembering that a file does not exist
+_MISSING_ENTRY_BYTES = 64
+
+
+def _entry_size(entry: TextEntry) -> int:
+    """Approximate in-memory size of a parsed entry."""
+    size = sys.getsizeof(entry) + sys.getsizeof(entry.texts) + sys.getsizeof(entry.instructions)
+    for text in entry.texts:
+        size += sys.getsizeof(text)
+    for instructions in entry.instructions:
+        size += sys.getsizeof(instructions)
+        for instruction in instructions:
+            size += sys.getsizeof(instruction)
+    return size
+
+
+class CachedTextSource:
+    """Caches ``load`` results of another source with LRU eviction.
+
+    Entries are stored with ``texts``/``instructions`` materialized as
+    lists, so repeated resolves reuse the pre-built key list instead of
+    re-parsing the file and rebuilding it.
+
+    Args:
+        source: Backend to read through (e.g. JsonTextSource).
+        max_bytes: Approximate byte budget; 0 disables caching.
+    """
+
+    def __init__(self, source, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self._source = source
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, tuple[TextEntry | None, int]] = OrderedDict()
+        self._coherence_indices: dict[str, dict] = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def source(self):
+        return self._source
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    def set_max_bytes(self, max_bytes: int):
+        """Change the byte budget, evicting entries if it shrank."""
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        """Drop least-recently-used entries until within budget. Caller holds the lock."""
+        while self._entries and self._bytes > self._max_bytes:
+            _key, (_entry, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self._evictions += 1
+
+    def load(self, domain: str, scores: tuple[int, int, int]) -> TextEntry | None:
+        """Load an entry, serving it from the cache when present."""
+        key = (domain, tuple(scores))
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return cached[0]
+            self._misses += 1
+
+        # Read outside the lock so slow I/O does not block other threads
+        entry = self._source.load(domain, scores)
+        if entry is not None:
+            entry = TextEntry(
+                coherence=entry.coherence,
+                texts=list(entry.texts),
+                instructions=list(entry.instructions),
+            )
+        size = _entry_size(entry) if entry is not None else _MISSING_ENTRY_BYTES
+
+        with self._lock:
+            if size <= self._max_bytes and key not in self._entries:
+                self._entries[key] = (entry, size)
+                self._bytes += size
+                self._evict()
+
+        return entry
+
+    def load_coherence_index(self, domain: str) -> dict:
+        """Coherence indices are tiny, so they are kept outside the byte budget."""
+        with self._lock:
+            index = self._coherence_indices.get(domain)
+        if index is None:
+            index = self._source.load_coherence_index(domain)
+            with self._lock:
+                self._coherence_indices[domain] = index
+        return index
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters and current usage."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+            }
+
+    def clear(self):
+        """Drop all cached entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._coherence_indices.clear()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+
+_shared_sources: dict[Path, CachedTextSource] = {}
+_shared_lock = threading.Lock()
+
+
+def _configured_cache_bytes() -> int:
+    value = os.environ.get(CACHE_BYTES_ENV)
+    if value is None or value.strip() == "":
+        return DEFAULT_CACHE_BYTES
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{CACHE_BYTES_ENV} must be an integer byte count, got {value!r}") from None
+
+
+def get_shared_text_source(base_dir: Path | None = None) -> CachedTextSource:
+    """Return the process-wide cached JSON source for a text tree.
+
+    One cache exists per ``base_dir``, so every resolver reading the same
+    tree shares parsed entries and counters.
+    """
+    if base_dir is None:
+        base_dir = DEFAULT_TEXT_DIR
+    key = Path(base_dir).resolve()
+
+    with _shared_lock:
+        source = _shared_sources.get(key)
+        if source is None:
+            source = CachedTextSource(JsonTextSource(base_dir), max_bytes=_configured_cache_bytes())
+            _shared_sources[key] = source
+        return source
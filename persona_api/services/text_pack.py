@@ -0,0 +1,365 @@
+"""Compiled single-file pack of the domain text corpus.
+
+The JSON tree under persona_api/data/text stays the source of truth;
+``build_text_pack`` compiles it into one binary file so resolvers can
+look entries up by (domain, score triple) without touching the filesystem
+per call.
+
+Layout (version 1, little-endian):
+
+    header       magic, version, source checksum, section counts/offsets
+    slots        5 domains x 125 score triples, direct-addressed
+    texts        per text: string id, first instruction ref, instruction count
+    inst refs    string ids of instructions, grouped per text
+    strings      (count + 1) offsets into a UTF-8 blob, then the blob
+    manifest     JSON: domain order and each domain's coherence.json
+
+Strings are de-duplicated, so repeated instructions are stored once.
+
+TextPack memory-maps the file by default, so every worker process shares
+one page-cache copy of the corpus. Entries are returned as lazy views that
+decode a text or instruction list only when it is indexed.
+"""
+
+import hashlib
+import json
+import mmap
+import struct
+from abc import abstractmethod
+from collections.abc import Sequence
+from itertools import product
+from pathlib import Path
+
+from persona_api.services.text_source import DEFAULT_TEXT_DIR, TextEntry
+
+DEFAULT_PACK_PATH = Path(__file__).parent.parent / "data" / "text.pack"
+
+PACK_MAGIC = b"PTXP"
+PACK_VERSION = 1
+
+# magic, version, reserved, checksum, domain count,
+# text count, inst ref count, string count,
+# texts off, inst refs off, string offsets off, blob off, manifest off, manifest len
+_HEADER = struct.Struct("<4sHH32sIIIIIIIIII")
+# present, coherence (-1 = None), text count, first text
+_SLOT = struct.Struct("<BbHI")
+# string id, first inst ref, inst count
+_TEXT = struct.Struct("<III")
+_U32 = struct.Struct("<I")
+
+SCORE_TRIPLES = list(product(range(1, 6), repeat=3))
+SLOTS_PER_DOMAIN = len(SCORE_TRIPLES)
+
+
+def _slot_index(domain_idx: int, scores: tuple[int, int, int]) -> int:
+    s1, s2, s3 = scores
+    return domain_idx * SLOTS_PER_DOMAIN + (s1 - 1) * 25 + (s2 - 1) * 5 + (s3 - 1)
+
+
+def compute_source_checksum(source_dir: Path | None = None) -> bytes:
+    """SHA-256 over every JSON file in the text tree (relative path + contents)."""
+    if source_dir is None:
+        source_dir = DEFAULT_TEXT_DIR
+
+    digest = hashlib.sha256()
+    for path in sorted(source_dir.rglob("*.json")):
+        digest.update(path.relative_to(source_dir).as_posix().encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.digest()
+
+
+def build_text_pack(source_dir: Path | None = None, output_path: Path | None = None) -> dict:
+    """Compile the JSON text tree into a single pack file.
+
+    Args:
+        source_dir: Root of the text tree (default: persona_api/data/text).
+        output_path: Destination file (default: persona_api/data/text.pack).
+
+    Returns:
+        Dict with build statistics (domains, entries, texts, strings, bytes, checksum).
+    """
+    if source_dir is None:
+        source_dir = DEFAULT_TEXT_DIR
+    if output_path is None:
+        output_path = DEFAULT_PACK_PATH
+
+    domains = sorted(p.name for p in source_dir.iterdir() if p.is_dir())
+
+    strings: list[str] = []
+    string_ids: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    slots = bytearray()
+    texts = bytearray()
+    inst_refs = bytearray()
+    text_count = 0
+    inst_count = 0
+    entry_count = 0
+    coherence_indices: dict[str, dict] = {}
+
+    for domain in domains:
+        index_path = source_dir / domain / "coherence.json"
+        if index_path.exists():
+            coherence_indices[domain] = json.loads(index_path.read_text())
+
+        for scores in SCORE_TRIPLES:
+            file_path = source_dir / domain / str(scores[0]) / str(scores[1]) / f"{scores[2]}.json"
+            if not file_path.exists():
+                slots += _SLOT.pack(0, -1, 0, 0)
+                continue
+
+            content = json.loads(file_path.read_text())
+            entry_texts = content.get("texts", {})
+            coherence = content.get("coherence")
+
+            slots += _SLOT.pack(1, -1 if coherence is None else coherence, len(entry_texts), text_count)
+            entry_count += 1
+
+            for text, instructions in entry_texts.items():
+                texts += _TEXT.pack(intern(text), inst_count, len(instructions))
+                for instruction in instructions:
+                    inst_refs += _U32.pack(intern(instruction))
+                text_count += 1
+                inst_count += len(instructions)
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = bytearray()
+    position = 0
+    for value in encoded:
+        offsets += _U32.pack(position)
+        position += len(value)
+    offsets += _U32.pack(position)
+    blob = b"".join(encoded)
+
+    manifest = json.dumps({"domains": domains, "coherence": coherence_indices}, ensure_ascii=False).encode("utf-8")
+
+    texts_off = _HEADER.size + len(slots)
+    inst_refs_off = texts_off + len(texts)
+    offsets_off = inst_refs_off + len(inst_refs)
+    blob_off = offsets_off + len(offsets)
+    manifest_off = blob_off + len(blob)
+
+    checksum = compute_source_checksum(source_dir)
+    header = _HEADER.pack(
+        PACK_MAGIC,
+        PACK_VERSION,
+        0,
+        checksum,
+        len(domains),
+        text_count,
+        inst_count,
+        len(strings),
+        texts_off,
+        inst_refs_off,
+        offsets_off,
+        blob_off,
+        manifest_off,
+        len(manifest),
+    )
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(slots)
+        f.write(texts)
+        f.write(inst_refs)
+        f.write(offsets)
+        f.write(blob)
+        f.write(manifest)
+    tmp_path.replace(output_path)
+
+    return {
+        "domains": len(domains),
+        "entries": entry_count,
+        "texts": text_count,
+        "strings": len(strings),
+        "bytes": manifest_off + len(manifest),
+        "checksum": checksum.hex(),
+    }
+
+
+class _PackView(Sequence):
+    """Lazy view over one entry's texts; decodes an item only when indexed.
+
+    Sequence is already an ABC, so subclasses must implement ``_decode``.
+    """
+
+    __slots__ = ("_pack", "_first", "_count")
+
+    def __init__(self, pack: "TextPack", first: int, count: int):
+        self._pack = pack
+        self._first = first
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self._count))]
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("text index out of range")
+        return self._decode(self._first + idx)
+
+    @abstractmethod
+    def _decode(self, text_idx: int):
+        """Decode text ``text_idx`` of the pack."""
+
+
+class _PackTexts(_PackView):
+    __slots__ = ()
+
+    def _decode(self, text_idx: int) -> str:
+        return self._pack._text(text_idx)
+
+
+class _PackInstructions(_PackView):
+    __slots__ = ()
+
+    def _decode(self, text_idx: int) -> list[str]:
+        return self._pack._instructions(text_idx)
+
+
+class TextPack:
+    """Reads text entries from a compiled pack file.
+
+    Drop-in replacement for JsonTextSource: exposes the same ``load`` and
+    ``load_coherence_index`` methods, so it can be passed as ``source`` to
+    DomainTextResolver and BehaviorResolver.
+
+    Args:
+        path: Pack file (default: persona_api/data/text.pack).
+        use_mmap: Memory-map the file read-only (default). If False the
+            whole file is read into process memory instead.
+    """
+
+    def __init__(self, path: Path | None = None, use_mmap: bool = True):
+        if path is None:
+            path = DEFAULT_PACK_PATH
+        self._path = path
+        self._mmap: mmap.mmap | None = None
+
+        if use_mmap:
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._data = self._mmap
+        else:
+            self._data = path.read_bytes()
+
+        if len(self._data) < _HEADER.size:
+            self.close()
+            raise ValueError(f"Not a text pack: {path}")
+
+        (
+            magic,
+            version,
+            _reserved,
+            self._checksum,
+            domain_count,
+            self._text_count,
+            self._inst_count,
+            self._string_count,
+            self._texts_off,
+            self._inst_refs_off,
+            self._offsets_off,
+            self._blob_off,
+            manifest_off,
+            manifest_len,
+        ) = _HEADER.unpack_from(self._data, 0)
+
+        if magic != PACK_MAGIC:
+            self.close()
+            raise ValueError(f"Not a text pack: {path}")
+        if version != PACK_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported text pack version {version} (expected {PACK_VERSION}): {path}")
+
+        manifest = json.loads(self._data[manifest_off:manifest_off + manifest_len].decode("utf-8"))
+        self._domains: list[str] = manifest["domains"]
+        self._domain_index = {domain: idx for idx, domain in enumerate(self._domains)}
+        self._coherence_indices: dict[str, dict] = manifest["coherence"]
+
+        if len(self._domains) != domain_count:
+            raise ValueError(f"Corrupt text pack (domain count mismatch): {path}")
+
+    def close(self):
+        """Release the memory map (no-op when the pack was read into memory)."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "TextPack":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def is_mmapped(self) -> bool:
+        return self._mmap is not None
+
+    @property
+    def checksum(self) -> bytes:
+        """Checksum of the source tree the pack was built from."""
+        return self._checksum
+
+    @property
+    def domains(self) -> list[str]:
+        return list(self._domains)
+
+    def is_stale(self, source_dir: Path | None = None) -> bool:
+        """Return True if the JSON tree has changed since the pack was built."""
+        return compute_source_checksum(source_dir) != self._checksum
+
+    def _string(self, string_id: int) -> str:
+        start, end = struct.unpack_from("<II", self._data, self._offsets_off + string_id * 4)
+        return self._data[self._blob_off + start:self._blob_off + end].decode("utf-8")
+
+    def _text(self, text_idx: int) -> str:
+        string_id, _inst_start, _inst_count = _TEXT.unpack_from(self._data, self._texts_off + text_idx * _TEXT.size)
+        return self._string(string_id)
+
+    def _instructions(self, text_idx: int) -> list[str]:
+        _string_id, inst_start, inst_count = _TEXT.unpack_from(self._data, self._texts_off + text_idx * _TEXT.size)
+        refs = struct.unpack_from(f"<{inst_count}I", self._data, self._inst_refs_off + inst_start * 4)
+        return [self._string(ref) for ref in refs]
+
+    def load(self, domain: str, scores: tuple[int, int, int]) -> TextEntry | None:
+        """Load the entry for a score combination, or None if it was not in the tree.
+
+        The returned ``texts`` and ``instructions`` are lazy views into the
+        pack; nothing is decoded until an item is indexed.
+        """
+        domain_idx = self._domain_index.get(domain)
+        if domain_idx is None or not all(1 <= s <= 5 for s in scores):
+            return None
+
+        present, coherence, text_count, first_text = _SLOT.unpack_from(
+            self._data, _HEADER.size + _slot_index(domain_idx, scores) * _SLOT.size
+        )
+        if not present:
+            return None
+
+        return TextEntry(
+            coherence=None if coherence < 0 else coherence,
+            texts=_PackTexts(self, first_text, text_count),
+            instructions=_PackInstructions(self, first_text, text_count),
+        )
+
+    def load_coherence_index(self, domain: str) -> dict:
+        """Coherence index (level -> list of "s1/s2/s3.json" paths) captured at build time."""
+        return self._coherence_indices.get(domain, {"1": [], "2": [], "3": []})
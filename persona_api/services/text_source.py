@@ -0,0 +1,61 @@
+"""Backends that load pre-computed domain text entries."""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Sequence
+
+DEFAULT_TEXT_DIR = Path(__file__).parent.parent / "data" / "text"
+
+
+@dataclass(frozen=True)
+class TextEntry:
+    """Contents of one <domain>/<s1>/<s2>/<s3> text file.
+
+    ``texts`` and ``instructions`` are parallel sequences: the instructions
+    for ``texts[i]`` are ``instructions[i]``.
+    """
+
+    coherence: int | None
+    texts: Sequence[str]
+    instructions: Sequence[list[str]]
+
+
+class JsonTextSource:
+    """Reads text entries from the JSON tree under persona_api/data/text."""
+
+    def __init__(self, base_dir: Path | None = None):
+        if base_dir is None:
+            base_dir = DEFAULT_TEXT_DIR
+        self._base_dir = base_dir
+
+    @property
+    def base_dir(self) -> Path:
+        return self._base_dir
+
+    def get_file_path(self, domain: str, scores: tuple[int, int, int]) -> Path:
+        """Get file path for a score combination."""
+        return self._base_dir / domain / str(scores[0]) / str(scores[1]) / f"{scores[2]}.json"
+
+    def load(self, domain: str, scores: tuple[int, int, int]) -> TextEntry | None:
+        """Load the entry for a score combination, or None if the file is missing."""
+        file_path = self.get_file_path(domain, scores)
+
+        if not file_path.exists():
+            return None
+
+        content = json.loads(file_path.read_text())
+        texts = content.get("texts", {})
+
+        return TextEntry(
+            coherence=content.get("coherence"),
+            texts=list(texts.keys()),
+            instructions=list(texts.values()),
+        )
+
+    def load_coherence_index(self, domain: str) -> dict:
+        """Load the coherence index (level -> list of "s1/s2/s3.json" paths)."""
+        index_path = self._base_dir / domain / "coherence.json"
+        if index_path.exists():
+            return json.loads(index_path.read_text())
+        return {"1": [], "2": [], "3": []}
@@ -0,0 +1,266 @@
+"""Columnar export of generated training data.
+
+Flattens the nested inputs/output/meta records into typed columns so
+analyses can filter by scores or length with vectorized scans instead of
+parsing JSON per line:
+
+    A, C, E, O, N     uint8
+    length_target     uint16 (npz: int32, -1 = unconstrained)
+    length_actual     uint32
+    seed              string
+    traits            dictionary-encoded string
+    output            string
+
+Two file formats:
+
+    parquet   via the optional pyarrow package; traits is written as an
+              Arrow dictionary column, the other strings use Parquet's own
+              dictionary encoding where it pays off.
+    npz       numpy only. Strings are stored Arrow-style as one UTF-8 blob
+              plus offsets, and traits as codes into a dictionary, so
+              TrainingColumns can load it without decoding any text.
+"""
+
+import json
+from array import array
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+
+SCORE_COLUMNS = ("A", "C", "E", "O", "N")
+STRING_COLUMNS = ("seed", "output")
+COLUMNS = (*SCORE_COLUMNS, "length_target", "length_actual", "seed", "traits", "output")
+FORMATS = ("parquet", "npz")
+
+DEFAULT_ROW_GROUP_ROWS = 100_000
+NO_LENGTH_TARGET = -1
+
+
+def default_format() -> str:
+    """parquet when pyarrow is installed, else npz."""
+    return "parquet" if pyarrow is not None else "npz"
+
+
+class ColumnChunk:
+    """Rows of training records held column by column."""
+
+    def __init__(self):
+        self.scores: dict[str, list[int]] = {column: [] for column in SCORE_COLUMNS}
+        self.length_target: list[int | None] = []
+        self.length_actual: list[int] = []
+        self.seed: list[str] = []
+        self.traits: list[str] = []
+        self.output: list[str] = []
+        self.errors = 0
+
+    def __len__(self) -> int:
+        return len(self.output)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "ColumnChunk":
+        """Parse JSONL lines; unparseable lines are counted in ``errors``."""
+        chunk = cls()
+        for line in lines:
+            try:
+                record = json.loads(line)
+                meta = record["meta"]
+                row = ([meta[column] for column in SCORE_COLUMNS], meta["length_target"], meta["length_actual"], meta["seed"], record["inputs"]["traits"], record["output"])
+            except (json.JSONDecodeError, KeyError, TypeError):
+                chunk.errors += 1
+                continue
+            chunk.append(*row)
+        return chunk
+
+    def append(self, scores: list[int], length_target: int | None, length_actual: int, seed: str, traits: str, output: str):
+        for column, score in zip(SCORE_COLUMNS, scores):
+            self.scores[column].append(score)
+        self.length_target.append(length_target)
+        self.length_actual.append(length_actual)
+        self.seed.append(seed)
+        self.traits.append(traits)
+        self.output.append(output)
+
+    def extend(self, other: "ColumnChunk"):
+        for column in SCORE_COLUMNS:
+            self.scores[column].extend(other.scores[column])
+        self.length_target.extend(other.length_target)
+        self.length_actual.extend(other.length_actual)
+        self.seed.extend(other.seed)
+        self.traits.extend(other.traits)
+        self.output.extend(other.output)
+        self.errors += other.errors
+
+    def to_arrow(self):
+        """This chunk as a pyarrow Table."""
+        columns = {column: pyarrow.array(self.scores[column], pyarrow.uint8()) for column in SCORE_COLUMNS}
+        columns["length_target"] = pyarrow.array(self.length_target, pyarrow.uint16())
+        columns["length_actual"] = pyarrow.array(self.length_actual, pyarrow.uint32())
+        columns["seed"] = pyarrow.array(self.seed, pyarrow.string())
+        columns["traits"] = pyarrow.array(self.traits, pyarrow.string()).dictionary_encode()
+        columns["output"] = pyarrow.array(self.output, pyarrow.string())
+        return pyarrow.table(columns)
+
+
+class ParquetColumnWriter:
+    """Streams chunks into a Parquet file, one row group per ``row_group_rows``."""
+
+    def __init__(self, path: Path, row_group_rows: int = DEFAULT_ROW_GROUP_ROWS, compression: str = "zstd"):
+        if pyarrow is None:
+            raise RuntimeError("Parquet export needs the pyarrow package (pip install pyarrow), or use the npz format")
+        self.path = Path(path)
+        self.row_group_rows = row_group_rows
+        self.compression = compression
+        self.rows = 0
+        self._writer = None
+        self._pending = ColumnChunk()
+
+    def write(self, chunk: ColumnChunk):
+        self._pending.extend(chunk)
+        if len(self._pending) >= self.row_group_rows:
+            self._flush()
+
+    def _flush(self):
+        if not len(self._pending):
+            return
+        table = self._pending.to_arrow()
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self.path, table.schema, compression=self.compression)
+        self._writer.write_table(table, row_group_size=self.row_group_rows)
+        self.rows += table.num_rows
+        self._pending = ColumnChunk()
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+
+class NpzColumnWriter:
+    """Packs chunks into typed buffers as they arrive; writes one npz file on close."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.rows = 0
+        self._numeric = {column: array("B") for column in SCORE_COLUMNS}
+        self._numeric["length_target"] = array("i")
+        self._numeric["length_actual"] = array("I")
+        self._strings = {column: (bytearray(), array("Q", [0])) for column in STRING_COLUMNS}
+        self._traits_codes = array("I")
+        self._traits: dict[str, int] = {}
+
+    def write(self, chunk: ColumnChunk):
+        for column in SCORE_COLUMNS:
+            self._numeric[column].extend(chunk.scores[column])
+        self._numeric["length_target"].extend(NO_LENGTH_TARGET if t is None else t for t in chunk.length_target)
+        self._numeric["length_actual"].extend(chunk.length_actual)
+
+        for column in STRING_COLUMNS:
+            data, offsets = self._strings[column]
+            for value in getattr(chunk, column):
+                data += value.encode("utf-8")
+                offsets.append(len(data))
+
+        self._traits_codes.extend(self._traits.setdefault(t, len(self._traits)) for t in chunk.traits)
+        self.rows += len(chunk)
+
+    def close(self):
+        arrays = {column: np.frombuffer(values, dtype=values.typecode) for column, values in self._numeric.items()}
+        for column, (data, offsets) in self._strings.items():
+            arrays[f"{column}_data"] = np.frombuffer(data, dtype=np.uint8)
+            arrays[f"{column}_offsets"] = np.frombuffer(offsets, dtype=np.uint64)
+        arrays["traits_codes"] = np.frombuffer(self._traits_codes, dtype=np.uint32)
+        arrays["traits_data"], arrays["traits_offsets"] = _pack_strings(list(self._traits))
+
+        with open(self.path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+
+
+def _pack_strings(values: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def create_column_writer(path: Path, fmt: str | None = None, row_group_rows: int = DEFAULT_ROW_GROUP_ROWS):
+    """ParquetColumnWriter or NpzColumnWriter for ``fmt`` (default: default_format())."""
+    fmt = fmt or default_format()
+    if fmt == "parquet":
+        return ParquetColumnWriter(path, row_group_rows=row_group_rows)
+    if fmt == "npz":
+        return NpzColumnWriter(path)
+    raise ValueError(f"Unknown format {fmt!r} (expected one of {FORMATS})")
+
+
+class TrainingColumns:
+    """Reads an npz column export.
+
+    Numeric columns are numpy arrays (``columns.A``, ``columns["length_actual"]``);
+    ``traits`` gives dictionary codes, with the strings in ``traits_dictionary``.
+    String columns are decoded only for the rows asked for.
+
+    Example:
+        rows = columns.select(A=5, N=1, min_length=200)
+        outputs = columns.strings("output", rows)
+    """
+
+    def __init__(self, path: Path):
+        with np.load(path, allow_pickle=False) as data:
+            self._arrays = {name: data[name] for name in data.files}
+        self.traits_dictionary = _unpack_strings(self._arrays["traits_data"], self._arrays["traits_offsets"])
+
+    def __len__(self) -> int:
+        return len(self._arrays["length_actual"])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        if column == "traits":
+            return self._arrays["traits_codes"]
+        if column in STRING_COLUMNS or column not in COLUMNS:
+            raise KeyError(column)
+        return self._arrays[column]
+
+    def __getattr__(self, column: str) -> np.ndarray:
+        if column.startswith("_"):
+            raise AttributeError(column)
+        try:
+            return self[column]
+        except KeyError:
+            raise AttributeError(column) from None
+
+    def select(self, min_length: int | None = None, max_length: int | None = None, length_target: int | None = None, **scores: int) -> np.ndarray:
+        """Row indices matching every given score (A=5, ...) and length bound."""
+        mask = np.ones(len(self), dtype=bool)
+        for column, score in scores.items():
+            if column not in SCORE_COLUMNS:
+                raise ValueError(f"Unknown score column {column!r} (expected one of {SCORE_COLUMNS})")
+            mask &= self._arrays[column] == score
+        if min_length is not None:
+            mask &= self._arrays["length_actual"] >= min_length
+        if max_length is not None:
+            mask &= self._arrays["length_actual"] <= max_length
+        if length_target is not None:
+            mask &= self._arrays["length_target"] == length_target
+        return np.flatnonzero(mask)
+
+    def strings(self, column: str, rows: Iterable[int]) -> list[str]:
+        """Decode ``seed``, ``output`` or ``traits`` for the given rows."""
+        if column == "traits":
+            codes = self._arrays["traits_codes"]
+            return [self.traits_dictionary[codes[row]] for row in rows]
+        if column not in STRING_COLUMNS:
+            raise KeyError(column)
+        data = self._arrays[f"{column}_data"]
+        offsets = self._arrays[f"{column}_offsets"]
+        return [data[offsets[row]:offsets[row + 1]].tobytes().decode("utf-8") for row in rows]
+
+
+def _unpack_strings(data: np.ndarray, offsets: np.ndarray) -> list[str]:
+    blob = data.tobytes()
+    return [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
@@ -0,0 +1,75 @@
+"""Read generated training data in either layout, whole or in parallel units.
+
+generate_training_data.py writes one JSONL file per score combo, or
+compressed shards with a shards.index (see training_shards). corpus_units()
+splits a training data directory into independent units (one per file or
+shard) that worker processes can read with iter_unit_lines(); units are
+small picklable values, so they can be handed to a ProcessPoolExecutor.
+"""
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from persona_api.services.training_shards import ShardReader, is_shard_dir
+
+JSONL_GLOB = "training_data_*.jsonl"
+
+
+@dataclass(frozen=True, slots=True)
+class CorpusUnit:
+    """One JSONL file, or one shard (``shard``) or combo (``key``) of a shard directory."""
+
+    path: Path
+    shard: int | None = None
+    key: str | None = None
+
+    def __str__(self) -> str:
+        if self.key is not None:
+            return f"{self.path} {self.key}"
+        return str(self.path) if self.shard is None else f"{self.path} shard {self.shard}"
+
+
+def corpus_units(training_dir: Path, by_combo: bool = False) -> list[CorpusUnit]:
+    """Split a training data directory into units for parallel readers.
+
+    With ``by_combo`` every unit holds exactly one score combo's samples
+    (JSONL files already do; shard directories are split by index key).
+    """
+    training_dir = Path(training_dir)
+    if is_shard_dir(training_dir):
+        reader = ShardReader(training_dir)
+        if by_combo:
+            return [CorpusUnit(training_dir, key=key) for key in reader.keys()]
+        return [CorpusUnit(training_dir, shard) for shard in reader.shards()]
+    return [CorpusUnit(path) for path in sorted(training_dir.glob(JSONL_GLOB))]
+
+
+def iter_unit_lines(unit: CorpusUnit) -> Iterator[str]:
+    """Non-blank JSONL lines of one unit."""
+    if unit.shard is not None or unit.key is not None:
+        lines = ShardReader(unit.path).iter_lines(unit.key, shard=unit.shard)
+        yield from (line for line in lines if line.strip())
+        return
+
+    with open(unit.path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield line
+
+
+def iter_corpus_lines(training_dir: Path, scores: str | None = None) -> Iterator[str]:
+    """Every line of a training data directory, or only one combo's.
+
+    Shards seek straight to the combo's frames; JSONL files are scanned.
+    """
+    training_dir = Path(training_dir)
+    if scores is not None and is_shard_dir(training_dir):
+        yield from ShardReader(training_dir).iter_lines(scores)
+        return
+
+    marker = None if scores is None else f'"scores": "{scores}"'
+    for unit in corpus_units(training_dir):
+        for line in iter_unit_lines(unit):
+            if marker is None or marker in line:
+                yield line
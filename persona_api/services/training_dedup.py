@@ -0,0 +1,89 @@
+"""Duplicate detection for one score combo's training samples.
+
+Within a combo, a sample is a duplicate when
+  - its traits field exactly matches an earlier kept sample's (hashed), or
+  - its output is a near-duplicate of an earlier kept output (MinHash/LSH,
+    see near_duplicates).
+
+The traits check comes first, and the first sample of each group is kept;
+dropped samples never enter the near-duplicate index, so later samples are
+only compared with kept outputs. Samples of different combos carry
+different score labels and are never duplicates of each other, so every
+combo is an independent unit (see training_corpus) for dedup_unit().
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+
+from persona_api.services.near_duplicates import DEFAULT_BANDS, DEFAULT_NUM_PERM, DEFAULT_THRESHOLD, MinHasher, NearDuplicateIndex
+from persona_api.services.training_corpus import CorpusUnit, iter_unit_lines
+
+
+@dataclass(slots=True)
+class DedupResult:
+    """Duplicates found in one unit, and its kept lines if requested."""
+
+    unit: CorpusUnit
+    samples: int = 0
+    bytes: int = 0
+    duplicate_bytes: int = 0
+    duplicates: list[dict] = field(default_factory=list)
+    kept: list[str] = field(default_factory=list)
+    errors: int = 0
+
+
+def dedup_unit(
+    unit: CorpusUnit,
+    threshold: float = DEFAULT_THRESHOLD,
+    num_perm: int = DEFAULT_NUM_PERM,
+    bands: int = DEFAULT_BANDS,
+    keep_lines: bool = False,
+) -> DedupResult:
+    """Deduplicate one combo's samples.
+
+    Every duplicate is reported as {scores, seed, reason, duplicate_of,
+    similarity}, with ``reason`` "traits" or "output". With ``keep_lines``
+    the kept lines are collected, each ending in a newline.
+    """
+    hasher = MinHasher(num_perm=num_perm)
+    # Keyed by line position, since seeds need not be unique within a unit
+    index = NearDuplicateIndex(threshold=threshold, num_perm=num_perm, bands=bands)
+    seeds: dict[int, str] = {}
+    traits_seen: dict[bytes, str] = {}
+    result = DedupResult(unit)
+
+    for position, line in enumerate(iter_unit_lines(unit)):
+        try:
+            record = json.loads(line)
+            scores = record["inputs"]["scores"]
+            traits = record["inputs"]["traits"]
+            output = record["output"]
+            seed = record["meta"]["seed"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            result.errors += 1
+            continue
+
+        result.samples += 1
+        size = len(line.encode("utf-8"))
+        result.bytes += size
+
+        traits_key = hashlib.blake2b(f"{scores}\0{traits}".encode("utf-8"), digest_size=16).digest()
+        duplicate = None
+        if traits_key in traits_seen:
+            duplicate = {"reason": "traits", "duplicate_of": traits_seen[traits_key], "similarity": 1.0}
+        else:
+            match = index.add(position, hasher.signature(output))
+            if match is not None:
+                duplicate = {"reason": "output", "duplicate_of": seeds[match[0]], "similarity": round(match[1], 3)}
+            else:
+                seeds[position] = seed
+                traits_seen[traits_key] = seed
+
+        if duplicate is not None:
+            result.duplicates.append({"scores": scores, "seed": seed, **duplicate})
+            result.duplicate_bytes += size
+        elif keep_lines:
+            result.kept.append(line if line.endswith("\n") else line + "\n")
+
+    return result
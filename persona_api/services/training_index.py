@@ -0,0 +1,212 @@
+"""Sidecar index of a per-combo JSONL training data directory.
+
+Maps every sample line to (file number, length target, byte offset, byte
+length), so "all samples for A2,C3,E4,O4,N4" or "all samples with
+length_target=128" seek straight to the matching lines instead of scanning
+every file. Stored as ``training.index`` next to the JSONL files:
+
+    header    magic, version
+    records   file number (u16), length target (u16, 0 = unconstrained),
+              offset (u64), length (u32); append-only
+
+generate_training_data.py appends records as it writes lines. refresh()
+indexes whatever the files gained since their last indexed line (all of
+them on the first call), since the files are only ever appended to. A torn
+trailing record is ignored on load and truncated by the next writer.
+
+The generator is the only writer of a directory's index. Readers that may
+run alongside it use refresh(persist=False), which keeps the unindexed
+tails in memory: persisting them would duplicate lines the generator has
+written but not yet indexed, and truncating to a stale snapshot would drop
+records it appended since.
+
+Shard directories have their own combo index (see training_shards).
+"""
+
+import json
+import os
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+
+INDEX_NAME = "training.index"
+INDEX_MAGIC = b"PTTI"
+INDEX_VERSION = 1
+
+HEADER = np.dtype([("magic", "S4"), ("version", "<u2")])
+RECORD = np.dtype([("file", "<u2"), ("length_target", "<u2"), ("offset", "<u8"), ("length", "<u4")])
+
+NO_LENGTH_TARGET = 0
+
+SCORE_DOMAINS = ("A", "C", "E", "O", "N")
+FILE_PATTERN = re.compile(r"training_data_(\d{4})\.jsonl$")
+LENGTH_TARGET_PATTERN = re.compile(rb'"length_target": (\d+|null)')
+
+
+def combo_file_number(scores: str) -> int:
+    """File number of a score combo ("A1,C1,E1,O1,N2" -> 2), in generation order."""
+    parts = scores.split(",")
+    if len(parts) != len(SCORE_DOMAINS) or any(p[:1] != d or p[1:] not in ("1", "2", "3", "4", "5") for p, d in zip(parts, SCORE_DOMAINS)):
+        raise ValueError(f"Invalid score combo {scores!r} (expected e.g. 'A2,C3,E4,O4,N4')")
+    number = 0
+    for part in parts:
+        number = number * 5 + int(part[1:]) - 1
+    return number + 1
+
+
+def combo_file_name(file_number: int) -> str:
+    return f"training_data_{file_number:04d}.jsonl"
+
+
+def _target_code(length_target: int | None) -> int:
+    return NO_LENGTH_TARGET if length_target is None else length_target
+
+
+def _to_records(file_number: int, entries: Iterable[tuple[int | None, int, int]]) -> np.ndarray:
+    return np.array([(file_number, _target_code(target), offset, length) for target, offset, length in entries], dtype=RECORD)
+
+
+class TrainingIndex:
+    """Reads, refreshes and appends to a directory's ``training.index``.
+
+    Args:
+        directory: Directory of training_data_NNNN.jsonl files.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.path = self.directory / INDEX_NAME
+        self._file = None
+        self._records: np.ndarray | None = None
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def records(self) -> np.ndarray:
+        """Every complete record, as a numpy structured array."""
+        if self._records is None:
+            if not self.path.exists():
+                return np.zeros(0, dtype=RECORD)
+            data = self.path.read_bytes()
+            header = np.frombuffer(data, dtype=HEADER, count=1)[0] if len(data) >= HEADER.itemsize else None
+            if header is None or header["magic"] != INDEX_MAGIC:
+                raise ValueError(f"Not a training index: {self.path}")
+            if header["version"] != INDEX_VERSION:
+                raise ValueError(f"Unsupported training index version {header['version']} (expected {INDEX_VERSION}): {self.path}")
+            count = (len(data) - HEADER.itemsize) // RECORD.itemsize
+            self._records = np.frombuffer(data, dtype=RECORD, count=count, offset=HEADER.itemsize)
+        return self._records
+
+    def _open(self):
+        if self._file is not None:
+            return
+        if self.path.exists():
+            usable = HEADER.itemsize + len(self.records()) * RECORD.itemsize
+            with open(self.path, "r+b") as f:
+                f.truncate(usable)
+            self._file = open(self.path, "ab")
+        else:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "wb")
+            self._file.write(np.array([(INDEX_MAGIC, INDEX_VERSION)], dtype=HEADER).tobytes())
+
+    def append(self, file_number: int, entries: Iterable[tuple[int | None, int, int]]):
+        """Index lines of one file: (length_target, offset, length) each."""
+        self._open()
+        self._file.write(_to_records(file_number, entries).tobytes())
+        self._records = None
+
+    def flush(self, fsync: bool = False):
+        if self._file is not None:
+            self._file.flush()
+            if fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def refresh(self, persist: bool = True) -> int:
+        """Index lines added to the files since they were last indexed. Returns lines indexed.
+
+        With ``persist=False`` the new records are only kept in memory and
+        the index file is never written.
+        """
+        records = self.records()
+        indexed_end = np.zeros(2**16, dtype=np.uint64)
+        np.maximum.at(indexed_end, records["file"], records["offset"] + records["length"])
+
+        added = 0
+        tails = []
+        for path in sorted(self.directory.glob("training_data_*.jsonl")):
+            match = FILE_PATTERN.search(path.name)
+            if match is None:
+                continue
+            file_number = int(match.group(1))
+            start = int(indexed_end[file_number])
+            if path.stat().st_size <= start:
+                continue
+
+            entries = []
+            with open(path, "rb") as f:
+                f.seek(start)
+                offset = start
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # partial line still being written
+                    if line.strip():
+                        target = LENGTH_TARGET_PATTERN.search(line)
+                        length_target = int(target.group(1)) if target and target.group(1) != b"null" else None
+                        entries.append((length_target, offset, len(line)))
+                    offset += len(line)
+            if entries:
+                if persist:
+                    self.append(file_number, entries)
+                else:
+                    tails.append(_to_records(file_number, entries))
+                added += len(entries)
+
+        if persist:
+            self.flush()
+        elif tails:
+            self._records = np.concatenate([records, *tails])
+        return added
+
+    def select(self, scores: str | None = None, length_target: int | None = None) -> np.ndarray:
+        """Records matching a score combo and/or length target (0 = unconstrained)."""
+        records = self.records()
+        mask = np.ones(len(records), dtype=bool)
+        if scores is not None:
+            mask &= records["file"] == combo_file_number(scores)
+        if length_target is not None:
+            mask &= records["length_target"] == length_target
+        return records[mask]
+
+    def count(self, scores: str | None = None, length_target: int | None = None) -> int:
+        return len(self.select(scores, length_target))
+
+    def lines(self, scores: str | None = None, length_target: int | None = None) -> Iterator[str]:
+        """Matching JSONL lines, read by seeking to each indexed offset."""
+        selected = np.sort(self.select(scores, length_target), order=["file", "offset"])
+        f = None
+        current = None
+        try:
+            for row in selected:
+                if row["file"] != current:
+                    if f is not None:
+                        f.close()
+                    current = row["file"]
+                    f = open(self.directory / combo_file_name(int(current)), "rb")
+                f.seek(int(row["offset"]))
+                yield f.read(int(row["length"])).decode("utf-8")
+        finally:
+            if f is not None:
+                f.close()
+
+    def query(self, scores: str | None = None, length_target: int | None = None) -> Iterator[dict]:
+        """Matching samples as parsed records."""
+        for line in self.lines(scores, length_target):
+            yield json.loads(line)
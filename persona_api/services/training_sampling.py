@@ -0,0 +1,105 @@
+"""Seeded bottom-k sampling of training samples per score combo.
+
+Every sample line gets a priority from a hash of the line keyed by the
+seed, and a Reservoir keeps the ``k`` lowest priorities it is offered.
+Reservoirs of separate parts of the corpus merge into the reservoir of the
+whole, so sample_corpus() can read units (see training_corpus) in worker
+processes and the picks depend only on the seed, not on the worker count
+or read order. Memory stays at ``k`` samples per combo.
+"""
+
+import hashlib
+import heapq
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from persona_api.services.training_corpus import CorpusUnit, iter_unit_lines
+
+MAX_REPORTED_ERRORS = 10
+
+
+class Reservoir:
+    """Keeps the ``k`` lowest-priority values offered (bottom-k sample)."""
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: list[tuple[int, str]] = []  # (-priority, value): max-heap on priority
+
+    def offer(self, priority: int, value: str):
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, (-priority, value))
+        elif -priority > self._heap[0][0]:
+            heapq.heapreplace(self._heap, (-priority, value))
+
+    def merge(self, other: "Reservoir"):
+        for neg_priority, value in other._heap:
+            self.offer(-neg_priority, value)
+
+    def values(self) -> list[str]:
+        """Sampled values, lowest priority first."""
+        return [value for _neg, value in sorted(self._heap, reverse=True)]
+
+
+def sample_priority(line: str, seed: int) -> int:
+    """Deterministic pseudo-random priority of one sample line."""
+    digest = hashlib.blake2b(line.encode("utf-8"), digest_size=8, key=str(seed).encode("ascii"))
+    return int.from_bytes(digest.digest(), "big")
+
+
+def sample_unit(unit: CorpusUnit, k: int, seed: int) -> tuple[dict[str, Reservoir], int, list[str]]:
+    """Reservoir-sample the outputs of one file or shard. Returns (reservoirs, lines read, errors)."""
+    reservoirs: dict[str, Reservoir] = {}
+    lines = 0
+    errors = []
+
+    for line in iter_unit_lines(unit):
+        lines += 1
+        try:
+            data = json.loads(line)
+            scores = data["inputs"]["scores"]
+            output = data["output"]
+        except (json.JSONDecodeError, KeyError) as e:
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(f"Error parsing line in {unit}: {e}")
+            continue
+
+        reservoir = reservoirs.get(scores)
+        if reservoir is None:
+            reservoir = reservoirs[scores] = Reservoir(k)
+        reservoir.offer(sample_priority(line, seed), output)
+
+    return reservoirs, lines, errors
+
+
+def sample_corpus(
+    units: list[CorpusUnit], k: int = 1, seed: int = 0, workers: int = 1
+) -> tuple[dict[str, list[str]], int, list[str]]:
+    """Sample up to ``k`` outputs per score combo, reading units in parallel.
+
+    Returns (sampled outputs by combo, lines read, parse errors).
+    """
+    merged: dict[str, Reservoir] = {}
+    total_lines = 0
+    all_errors = []
+
+    def merge(result):
+        nonlocal total_lines
+        reservoirs, lines, errors = result
+        total_lines += lines
+        all_errors.extend(errors)
+        for scores, reservoir in reservoirs.items():
+            if scores in merged:
+                merged[scores].merge(reservoir)
+            else:
+                merged[scores] = reservoir
+
+    if workers <= 1:
+        for unit in units:
+            merge(sample_unit(unit, k, seed))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(units) // (workers * 4))
+            for result in executor.map(sample_unit, units, [k] * len(units), [seed] * len(units), chunksize=chunksize):
+                merge(result)
+
+    return {scores: merged[scores].values() for scores in sorted(merged)}, total_lines, all_errors
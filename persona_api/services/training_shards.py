@@ -0,0 +1,312 @@
+"""Compressed, sharded storage for generated training samples.
+
+An alternative to one JSONL file per score combo. A shard directory holds:
+
+    shard-00000.zst ...   append-only shards of independently compressed frames
+    shards.index          header (magic, version, codec), then one record per frame
+
+Each frame holds the JSONL lines of a single key (the score combo string,
+e.g. "A1,C1,E1,O1,N1"), compressed on its own, so a reader can seek
+straight to a combo's frames or stream every frame in write order. A new
+shard is started once the current one reaches ``shard_bytes`` compressed.
+
+Frames are written to the shard before their index record, and a writer
+reopening the directory truncates anything past the last indexed frame, so
+a crash never leaves a frame the index points at half-written.
+
+zstd needs the optional ``zstandard`` package; without it the stdlib zlib
+codec is used. The codec is recorded in the index header.
+"""
+
+import json
+import os
+import struct
+import zlib
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+INDEX_NAME = "shards.index"
+INDEX_MAGIC = b"PTSI"
+INDEX_VERSION = 1
+
+DEFAULT_SHARD_BYTES = 8 * 1024 * 1024
+
+# magic, version, codec name (NUL-padded)
+_HEADER = struct.Struct("<4sH8s")
+# shard, offset, compressed length, raw length, records, key length (key bytes follow)
+_FRAME = struct.Struct("<IQIIIH")
+
+CODECS = ("zstd", "zlib")
+
+
+class _ZstdCodec:
+    name = "zstd"
+    suffix = ".zst"
+
+    def __init__(self, level: int | None = None):
+        if zstandard is None:
+            raise RuntimeError("The zstd codec needs the zstandard package (pip install zstandard)")
+        self._compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class _ZlibCodec:
+    name = "zlib"
+    suffix = ".zz"
+
+    def __init__(self, level: int | None = None):
+        self._level = 6 if level is None else level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self._level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+def default_codec() -> str:
+    """zstd when zstandard is installed, else zlib."""
+    return "zstd" if zstandard is not None else "zlib"
+
+
+def _make_codec(name: str, level: int | None = None):
+    if name == "zstd":
+        return _ZstdCodec(level)
+    if name == "zlib":
+        return _ZlibCodec(level)
+    raise ValueError(f"Unknown codec {name!r} (expected one of {CODECS})")
+
+
+def is_shard_dir(path: Path) -> bool:
+    return (Path(path) / INDEX_NAME).exists()
+
+
+@dataclass(slots=True)
+class FrameRef:
+    """Location of one compressed frame."""
+
+    key: str
+    shard: int
+    offset: int
+    length: int
+    raw_length: int
+    records: int
+
+
+def _shard_name(shard: int, codec) -> str:
+    return f"shard-{shard:05d}{codec.suffix}"
+
+
+def _read_index(path: Path) -> tuple[str, list[FrameRef], int]:
+    """Parse an index file. Returns (codec, frames, bytes of complete records)."""
+    data = path.read_bytes()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"Not a shard index: {path}")
+
+    magic, version, codec = _HEADER.unpack_from(data, 0)
+    if magic != INDEX_MAGIC:
+        raise ValueError(f"Not a shard index: {path}")
+    if version != INDEX_VERSION:
+        raise ValueError(f"Unsupported shard index version {version} (expected {INDEX_VERSION}): {path}")
+
+    frames = []
+    position = _HEADER.size
+    while position + _FRAME.size <= len(data):
+        shard, offset, length, raw_length, records, key_len = _FRAME.unpack_from(data, position)
+        key_end = position + _FRAME.size + key_len
+        if key_end > len(data):
+            break
+        key = data[position + _FRAME.size:key_end].decode("utf-8")
+        frames.append(FrameRef(key, shard, offset, length, raw_length, records))
+        position = key_end
+
+    return codec.rstrip(b"\0").decode("ascii"), frames, position
+
+
+class ShardWriter:
+    """Appends frames of JSONL lines to a shard directory.
+
+    Reopening an existing directory continues it (its codec wins; passing a
+    different one raises ValueError). Call flush() to make written frames
+    durable and visible to readers.
+
+    Args:
+        directory: Shard directory (created if missing).
+        codec: "zstd" or "zlib" (default: default_codec()).
+        shard_bytes: Compressed size at which a new shard is started.
+        level: Compression level (codec default if None).
+    """
+
+    def __init__(self, directory: Path, codec: str | None = None, shard_bytes: int = DEFAULT_SHARD_BYTES, level: int | None = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.shard_bytes = shard_bytes
+
+        index_path = self.directory / INDEX_NAME
+        frames: list[FrameRef] = []
+        if index_path.exists():
+            existing, frames, usable = _read_index(index_path)
+            if codec is not None and codec != existing:
+                raise ValueError(f"{self.directory} uses codec {existing!r}, not {codec!r}")
+            codec = existing
+            with open(index_path, "r+b") as f:
+                f.truncate(usable)
+        else:
+            codec = codec or default_codec()
+            _make_codec(codec)
+            index_path.write_bytes(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, codec.encode("ascii")))
+
+        self.codec = _make_codec(codec, level)
+        self._index = open(index_path, "ab")
+        self._index_records: list[bytes] = []
+
+        # Continue the last shard, dropping any frame written after its last index record
+        self._shard = frames[-1].shard if frames else 0
+        end = max((f.offset + f.length for f in frames if f.shard == self._shard), default=0)
+        shard_path = self.directory / _shard_name(self._shard, self.codec)
+        if shard_path.exists():
+            with open(shard_path, "r+b") as f:
+                f.truncate(end)
+        self._file = open(shard_path, "ab")
+        self._offset = end
+
+    def append(self, key: str, lines: Iterable[str]) -> FrameRef:
+        """Compress ``lines`` (each ending in a newline) as one frame under ``key``."""
+        raw = "".join(lines).encode("utf-8")
+        data = self.codec.compress(raw)
+        if self._offset and self._offset + len(data) > self.shard_bytes:
+            self._next_shard()
+
+        self._file.write(data)
+        frame = FrameRef(key, self._shard, self._offset, len(data), len(raw), raw.count(b"\n"))
+        self._offset += len(data)
+
+        encoded_key = key.encode("utf-8")
+        self._index_records.append(
+            _FRAME.pack(frame.shard, frame.offset, frame.length, frame.raw_length, frame.records, len(encoded_key)) + encoded_key
+        )
+        return frame
+
+    def _next_shard(self):
+        # The finished shard is synced unconditionally: index records for it may follow at any flush
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._shard += 1
+        self._offset = 0
+        # "wb": a shard left by a crash before any of its frames were indexed is garbage
+        self._file = open(self.directory / _shard_name(self._shard, self.codec), "wb")
+
+    def flush(self, fsync: bool = False):
+        """Write out shard data, then the index records pointing at it."""
+        self._file.flush()
+        if fsync:
+            os.fsync(self._file.fileno())
+
+        if self._index_records:
+            self._index.write(b"".join(self._index_records))
+            self._index_records = []
+        self._index.flush()
+        if fsync:
+            os.fsync(self._index.fileno())
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+            self._index.close()
+
+
+class ShardReader:
+    """Reads a shard directory by streaming every frame or seeking by key.
+
+    Args:
+        directory: Shard directory containing ``shards.index``.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        codec, self.frames, _usable = _read_index(self.directory / INDEX_NAME)
+        self.codec = _make_codec(codec)
+        self._by_key: dict[str, list[FrameRef]] = {}
+        for frame in self.frames:
+            self._by_key.setdefault(frame.key, []).append(frame)
+
+    def keys(self) -> list[str]:
+        return list(self._by_key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._by_key
+
+    def count(self, key: str) -> int:
+        """Records stored under a key."""
+        return sum(frame.records for frame in self._by_key.get(key, ()))
+
+    def shards(self) -> list[int]:
+        return sorted({frame.shard for frame in self.frames})
+
+    def shard_paths(self) -> list[Path]:
+        return [self.directory / _shard_name(shard, self.codec) for shard in self.shards()]
+
+    def _decode(self, data: bytes) -> Iterator[str]:
+        for line in self.codec.decompress(data).decode("utf-8").splitlines():
+            if line.strip():
+                yield line
+
+    def iter_lines(self, key: str | None = None, shard: int | None = None) -> Iterator[str]:
+        """JSONL lines of one key (seeking to its frames), or of every frame in write order.
+
+        ``shard`` restricts either to the frames of one shard, so shards can
+        be read by separate workers.
+        """
+        frames = self.frames if key is None else self._by_key.get(key, [])
+        if shard is not None:
+            frames = [frame for frame in frames if frame.shard == shard]
+        return self._read_frames(frames)
+
+    def iter_frame_lines(self, start: int, stop: int | None = None) -> Iterator[str]:
+        """JSONL lines of frames ``start:stop`` in index order (e.g. those added since a previous read)."""
+        return self._read_frames(self.frames[start:stop])
+
+    def _read_frames(self, frames: list[FrameRef]) -> Iterator[str]:
+        handles: dict[int, object] = {}
+        try:
+            for frame in frames:
+                handle = handles.get(frame.shard)
+                if handle is None:
+                    handle = handles[frame.shard] = open(self.directory / _shard_name(frame.shard, self.codec), "rb")
+                handle.seek(frame.offset)
+                yield from self._decode(handle.read(frame.length))
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+    def read(self, key: str | None = None) -> Iterator[dict]:
+        """Parsed records of one key, or of the whole directory."""
+        for line in self.iter_lines(key):
+            yield json.loads(line)
+
+    def stats(self) -> dict:
+        shard_paths = self.shard_paths()
+        return {
+            "codec": self.codec.name,
+            "shards": len(shard_paths),
+            "frames": len(self.frames),
+            "keys": len(self._by_key),
+            "records": sum(frame.records for frame in self.frames),
+            "raw_bytes": sum(frame.raw_length for frame in self.frames),
+            "bytes": sum(frame.length for frame in self.frames),
+        }
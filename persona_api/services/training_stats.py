@@ -0,0 +1,304 @@
+"""Length statistics over the training corpus, mergeable and incremental.
+
+LengthStats accumulates, per (score combo, length tier), a fixed-width
+histogram of ``length_actual``, per tier a histogram of
+``length_actual / length_target``, and per tier the ``outliers`` samples
+that miss their target by the widest margin (the longest outputs for the
+unconstrained tier). Everything is bounded and adds up, so workers can
+collect stats for separate parts of the corpus and the results merge into
+one; percentiles are read off the histograms (to within one bin).
+
+Incremental updates: plan_units() compares the corpus with the watermarks
+saved alongside the stats (bytes read per JSONL file, frames read from a
+shard directory) and returns only the new data as units; collect_unit()
+turns one unit into a LengthStats. If a file shrank, the stats are rebuilt
+from scratch.
+"""
+
+import heapq
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from persona_api.services.training_shards import ShardReader, is_shard_dir
+
+LENGTH_BIN = 16  # chars per length histogram bin
+LENGTH_BINS = 256  # last bin collects everything >= LENGTH_BIN * (LENGTH_BINS - 1)
+RATIO_BIN = 0.05
+RATIO_BINS = 81  # 0.0 .. 4.0, last bin open-ended
+
+NO_LENGTH_TARGET = 0
+DEFAULT_OUTLIERS = 25
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+STATS_VERSION = 1
+
+
+def _length_bin(length: int) -> int:
+    return min(length // LENGTH_BIN, LENGTH_BINS - 1)
+
+
+def _ratio_bin(ratio: float) -> int:
+    return min(int(ratio / RATIO_BIN), RATIO_BINS - 1)
+
+
+def histogram_percentile(histogram: np.ndarray, q: float, bin_width: float) -> float | None:
+    """Approximate q-th percentile (0-100) of histogrammed values, interpolating within the bin."""
+    total = int(histogram.sum())
+    if total == 0:
+        return None
+    rank = q / 100 * total
+    cumulative = np.cumsum(histogram)
+    idx = int(np.searchsorted(cumulative, rank, side="left"))
+    idx = min(idx, len(histogram) - 1)
+    before = int(cumulative[idx - 1]) if idx else 0
+    within = (rank - before) / histogram[idx] if histogram[idx] else 0.0
+    return (idx + within) * bin_width
+
+
+class LengthStats:
+    """Histograms, counts and outliers of output length per combo and tier.
+
+    Args:
+        outliers: Outlier samples kept per tier.
+    """
+
+    def __init__(self, outliers: int = DEFAULT_OUTLIERS):
+        self.outliers = outliers
+        self.samples = 0
+        self.errors = 0
+        self._lengths: dict[tuple[str, int], np.ndarray] = {}
+        self._ratios: dict[int, np.ndarray] = {}
+        self._outliers: dict[int, list[tuple[float, str, str, int]]] = {}
+
+    def add(self, scores: str, length_target: int | None, length_actual: int, seed: str):
+        target = NO_LENGTH_TARGET if length_target is None else length_target
+        key = (scores, target)
+        hist = self._lengths.get(key)
+        if hist is None:
+            hist = self._lengths[key] = np.zeros(LENGTH_BINS, dtype=np.uint32)
+        hist[_length_bin(length_actual)] += 1
+
+        if target:
+            ratio = length_actual / target
+            ratios = self._ratios.get(target)
+            if ratios is None:
+                ratios = self._ratios[target] = np.zeros(RATIO_BINS, dtype=np.uint32)
+            ratios[_ratio_bin(ratio)] += 1
+            score = abs(ratio - 1)
+        else:
+            score = float(length_actual)
+        self._offer_outlier(target, (score, seed, scores, length_actual))
+        self.samples += 1
+
+    def _offer_outlier(self, target: int, entry: tuple[float, str, str, int]):
+        heap = self._outliers.setdefault(target, [])
+        if len(heap) < self.outliers:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    def add_lines(self, lines) -> int:
+        """Add JSONL sample lines; returns the number added (bad lines count as errors)."""
+        added = 0
+        for line in lines:
+            try:
+                record = json.loads(line)
+                meta = record["meta"]
+                self.add(record["inputs"]["scores"], meta["length_target"], meta["length_actual"], meta["seed"])
+            except (json.JSONDecodeError, KeyError, TypeError):
+                self.errors += 1
+                continue
+            added += 1
+        return added
+
+    def merge(self, other: "LengthStats"):
+        self.samples += other.samples
+        self.errors += other.errors
+        for key, hist in other._lengths.items():
+            if key in self._lengths:
+                self._lengths[key] += hist
+            else:
+                self._lengths[key] = hist.copy()
+        for target, hist in other._ratios.items():
+            if target in self._ratios:
+                self._ratios[target] += hist
+            else:
+                self._ratios[target] = hist.copy()
+        for target, heap in other._outliers.items():
+            for entry in heap:
+                self._offer_outlier(target, entry)
+
+    def tiers(self) -> list[int]:
+        """Length targets seen, with 0 (unconstrained) last."""
+        targets = {target for _scores, target in self._lengths}
+        return sorted(targets - {NO_LENGTH_TARGET}) + ([NO_LENGTH_TARGET] if NO_LENGTH_TARGET in targets else [])
+
+    def combos(self) -> list[str]:
+        return sorted({scores for scores, _target in self._lengths})
+
+    def length_histogram(self, target: int, scores: str | None = None) -> np.ndarray:
+        """Histogram of length_actual for a tier, over every combo or one."""
+        if scores is not None:
+            return self._lengths.get((scores, target), np.zeros(LENGTH_BINS, dtype=np.uint32))
+        total = np.zeros(LENGTH_BINS, dtype=np.uint64)
+        for (_scores, key_target), hist in self._lengths.items():
+            if key_target == target:
+                total += hist
+        return total
+
+    def ratio_histogram(self, target: int) -> np.ndarray:
+        return self._ratios.get(target, np.zeros(RATIO_BINS, dtype=np.uint32))
+
+    def _describe(self, hist: np.ndarray, target: int, percentiles) -> dict:
+        summary = {"count": int(hist.sum())}
+        for q in percentiles:
+            value = histogram_percentile(hist, q, LENGTH_BIN)
+            summary[f"p{q}"] = None if value is None else round(value, 1)
+        if target and summary["count"]:
+            ratio = summary.get("p50")
+            summary["p50_ratio"] = None if ratio is None else round(ratio / target, 3)
+        return summary
+
+    def tier_summary(self, percentiles=DEFAULT_PERCENTILES) -> list[dict]:
+        """Per tier: count, length percentiles and how many samples land near the target."""
+        rows = []
+        for target in self.tiers():
+            row = {"length_target": target or None, **self._describe(self.length_histogram(target), target, percentiles)}
+            if target:
+                ratios = self.ratio_histogram(target)
+                total = int(ratios.sum())
+                lo, hi = _ratio_bin(0.75), _ratio_bin(1.25)
+                row["within_25pct"] = round(int(ratios[lo:hi].sum()) / total, 3) if total else None
+                row["over_2x"] = round(int(ratios[_ratio_bin(2.0):].sum()) / total, 3) if total else None
+            rows.append(row)
+        return rows
+
+    def combo_summary(self, percentiles=DEFAULT_PERCENTILES) -> dict[str, dict[str, dict]]:
+        """{scores: {tier: percentiles}} for every combo."""
+        result: dict[str, dict[str, dict]] = {}
+        for (scores, target), hist in sorted(self._lengths.items()):
+            result.setdefault(scores, {})[str(target or "none")] = self._describe(hist, target, percentiles)
+        return result
+
+    def outlier_list(self, target: int) -> list[dict]:
+        """Worst samples of a tier, worst first."""
+        entries = sorted(self._outliers.get(target, []), reverse=True)
+        return [
+            {"seed": seed, "scores": scores, "length_target": target or None, "length_actual": actual, **({"deviation": round(score, 3)} if target else {})}
+            for score, seed, scores, actual in entries
+        ]
+
+    def save(self, path: Path, watermarks: dict):
+        """Write stats and the corpus watermarks they cover to an npz file."""
+        keys = sorted(self._lengths)
+        meta = {
+            "version": STATS_VERSION,
+            "samples": self.samples,
+            "errors": self.errors,
+            "outliers": self.outliers,
+            "length_keys": [[scores, target] for scores, target in keys],
+            "ratio_keys": sorted(self._ratios),
+            "outlier_entries": {str(target): heap for target, heap in self._outliers.items()},
+            "watermarks": watermarks,
+        }
+        arrays = {
+            "meta": np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+            "lengths": np.stack([self._lengths[key] for key in keys]) if keys else np.zeros((0, LENGTH_BINS), dtype=np.uint32),
+            "ratios": np.stack([self._ratios[t] for t in meta["ratio_keys"]]) if self._ratios else np.zeros((0, RATIO_BINS), dtype=np.uint32),
+        }
+        tmp_path = Path(path).with_suffix(".tmp.npz")
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> tuple["LengthStats", dict]:
+        """Read stats saved by save(). Returns (stats, watermarks)."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+            lengths = data["lengths"]
+            ratios = data["ratios"]
+        if meta.get("version") != STATS_VERSION:
+            raise ValueError(f"Unsupported stats version {meta.get('version')} (expected {STATS_VERSION}): {path}")
+
+        stats = cls(outliers=meta["outliers"])
+        stats.samples = meta["samples"]
+        stats.errors = meta["errors"]
+        stats._lengths = {(scores, target): lengths[i].copy() for i, (scores, target) in enumerate(meta["length_keys"])}
+        stats._ratios = {target: ratios[i].copy() for i, target in enumerate(meta["ratio_keys"])}
+        for target, heap in meta["outlier_entries"].items():
+            entries = [tuple(entry) for entry in heap]
+            heapq.heapify(entries)
+            stats._outliers[int(target)] = entries
+        return stats, meta["watermarks"]
+
+
+@dataclass(frozen=True, slots=True)
+class StatsUnit:
+    """New data to read: bytes ``start:stop`` of a JSONL file, or frames ``start:stop`` of a shard directory."""
+
+    path: Path
+    start: int
+    stop: int
+
+
+def plan_units(training_dir: Path, watermarks: dict) -> tuple[list[StatsUnit], dict, bool]:
+    """Units covering data past the watermarks.
+
+    Returns (units, watermarks to advance, rebuild). ``rebuild`` is True when
+    the corpus no longer extends what the watermarks describe; the units
+    then cover everything and existing stats must be discarded. Pass each
+    unit and the end collect_unit() reached to advance_watermarks().
+    """
+    training_dir = Path(training_dir)
+    if is_shard_dir(training_dir):
+        frames = len(ShardReader(training_dir).frames)
+        done = watermarks.get("frames", 0)
+        rebuild = "files" in watermarks or frames < done
+        if rebuild:
+            done = 0
+        # Split the new frames into chunks so several workers can share them
+        step = max(1, (frames - done) // 64)
+        units = [StatsUnit(training_dir, start, min(start + step, frames)) for start in range(done, frames, step)]
+        return units, {"frames": done}, rebuild
+
+    previous = dict(watermarks.get("files", {}))
+    rebuild = "frames" in watermarks
+    sizes = {path.name: path.stat().st_size for path in sorted(training_dir.glob("training_data_*.jsonl"))}
+    if any(sizes.get(name, 0) < size for name, size in previous.items()):
+        rebuild = True
+    if rebuild:
+        previous = {}
+
+    units = [StatsUnit(training_dir / name, previous.get(name, 0), size) for name, size in sizes.items() if size > previous.get(name, 0)]
+    return units, {"files": previous}, rebuild
+
+
+def advance_watermarks(watermarks: dict, unit: StatsUnit, end: int):
+    """Record that ``unit`` was read up to ``end``."""
+    if "frames" in watermarks:
+        watermarks["frames"] = max(watermarks["frames"], end)
+    else:
+        watermarks["files"][unit.path.name] = end
+
+
+def collect_unit(unit: StatsUnit, outliers: int = DEFAULT_OUTLIERS) -> tuple[LengthStats, int]:
+    """Stats for one unit's lines. Returns (stats, end reached).
+
+    For JSONL the end stops after the last complete line, so a line still
+    being written is picked up by the next update.
+    """
+    stats = LengthStats(outliers=outliers)
+    if unit.path.is_dir():
+        stats.add_lines(ShardReader(unit.path).iter_frame_lines(unit.start, unit.stop))
+        return stats, unit.stop
+
+    with open(unit.path, "rb") as f:
+        f.seek(unit.start)
+        data = f.read(unit.stop - unit.start)
+    complete = data.rfind(b"\n") + 1
+    stats.add_lines(line for line in data[:complete].decode("utf-8").splitlines() if line.strip())
+    return stats, unit.start + complete
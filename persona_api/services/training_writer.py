@@ -0,0 +1,187 @@
+"""Buffered, batched writers for generated training samples.
+
+generate_training_data.py hands every finished sample to one writer, which
+buffers the lines and appends them in batches: once ``batch_size`` samples
+are pending, or ``flush_interval`` seconds after the first of them was
+buffered (the caller polls seconds_until_flush() while idle). A flush
+writes each touched output once, then appends the index records and the
+ProgressJournal records for the batch, so a crash before or during the data
+write leaves the samples unjournaled and they are regenerated on resume.
+
+BufferedJsonlWriter appends to one JSONL file per combo through a small LRU
+of open binary handles and records each line's byte offset in the
+training.index sidecar (see training_index). ShardedJsonlWriter stores
+each flush as compressed frames instead (see training_shards).
+
+Samples are identified by their (combo index, tier index, run index) key.
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+from persona_api.services.progress_journal import ProgressJournal
+from persona_api.services.training_index import TrainingIndex
+from persona_api.services.training_shards import ShardWriter
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_FLUSH_INTERVAL = 2.0  # seconds
+MAX_OPEN_FILES = 32
+
+# none: leave durability to the OS; batch: fsync at each flush; always: flush + fsync every sample
+FSYNC_POLICIES = ("none", "batch", "always")
+
+
+class BufferedJsonlWriter:
+    """Buffers sample lines and appends them to their combo files in batches.
+
+    Args:
+        path_for_combo: Maps a combo index to its output file.
+        journal: ProgressJournal receiving (combo, tier, run) after each flush.
+        batch_size: Lines buffered before a flush.
+        flush_interval: Seconds after which pending lines are due.
+        fsync: One of FSYNC_POLICIES.
+        max_open_files: Combo file handles kept open.
+        index: TrainingIndex receiving each line's length tier and offset
+            (optional); combo index i is file number i + 1.
+    """
+
+    def __init__(
+        self,
+        path_for_combo: Callable[[int], Path] | None,
+        journal: ProgressJournal,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        fsync: str = "none",
+        max_open_files: int = MAX_OPEN_FILES,
+        index: TrainingIndex | None = None,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        self.path_for_combo = path_for_combo
+        self.journal = journal
+        self.batch_size = 1 if fsync == "always" else max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_open_files = max_open_files
+        self.index = index
+
+        self._pending: dict[int, list[str]] = {}
+        self._pending_targets: dict[int, list[int | None]] = {}
+        self._pending_keys: list[tuple[int, int, int]] = []
+        self._first_pending = 0.0
+        self._handles: OrderedDict[int, object] = OrderedDict()
+        self.flushes = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending_keys)
+
+    def write(self, key: tuple[int, int, int], sample: dict):
+        """Buffer a sample under its (combo, tier, run) key, flushing if the batch is full or due."""
+        combo_idx = key[0]
+        if not self._pending_keys:
+            self._first_pending = time.monotonic()
+        line = json.dumps(sample, ensure_ascii=False) + "\n"
+        self._pending.setdefault(combo_idx, []).append(line)
+        self._pending_targets.setdefault(combo_idx, []).append(sample["meta"]["length_target"])
+        self._pending_keys.append(key)
+        if len(self._pending_keys) >= self.batch_size or self.seconds_until_flush() == 0:
+            self.flush()
+
+    def seconds_until_flush(self) -> float | None:
+        """Seconds until pending lines are due (None when nothing is pending)."""
+        if not self._pending_keys:
+            return None
+        return max(0.0, self.flush_interval - (time.monotonic() - self._first_pending))
+
+    def flush(self):
+        """Append all pending lines, then journal them."""
+        if not self._pending_keys:
+            return
+
+        self._write_batch(self._pending)
+        self.journal.record(self._pending_keys, fsync=self.fsync != "none")
+        self._pending = {}
+        self._pending_targets = {}
+        self._pending_keys = []
+        self.flushes += 1
+
+    def _write_batch(self, pending: dict[int, list[str]]):
+        indexed = []
+        for combo_idx, lines in pending.items():
+            handle = self._handle(combo_idx)
+            encoded = [line.encode("utf-8") for line in lines]
+            offset = handle.tell()
+            handle.write(b"".join(encoded))
+            handle.flush()
+            if self.fsync != "none":
+                os.fsync(handle.fileno())
+
+            entries = []
+            for data, length_target in zip(encoded, self._pending_targets[combo_idx]):
+                entries.append((length_target, offset, len(data)))
+                offset += len(data)
+            indexed.append((combo_idx, entries))
+
+        if self.index is not None:
+            for combo_idx, entries in indexed:
+                self.index.append(combo_idx + 1, entries)
+            self.index.flush(fsync=self.fsync != "none")
+
+    def _handle(self, combo_idx: int):
+        handle = self._handles.get(combo_idx)
+        if handle is not None:
+            self._handles.move_to_end(combo_idx)
+            return handle
+
+        handle = open(self.path_for_combo(combo_idx), "ab")
+        self._handles[combo_idx] = handle
+        while len(self._handles) > self.max_open_files:
+            _idx, oldest = self._handles.popitem(last=False)
+            oldest.close()
+        return handle
+
+    def close(self):
+        """Flush pending lines and close every handle."""
+        try:
+            self.flush()
+        finally:
+            for handle in self._handles.values():
+                handle.close()
+            self._handles.clear()
+            if self.index is not None:
+                self.index.close()
+
+
+class ShardedJsonlWriter(BufferedJsonlWriter):
+    """BufferedJsonlWriter that stores each flush as compressed shard frames.
+
+    Every flush appends one frame per combo in the batch, keyed by its score
+    string, so the frames of a combo can be found through the shard index.
+
+    Args:
+        shards: ShardWriter for the output directory.
+        key_for_combo: Maps a combo index to its shard key.
+        journal: ProgressJournal receiving (combo, tier, run) after each flush.
+        **kwargs: batch_size, flush_interval and fsync, as for BufferedJsonlWriter.
+    """
+
+    def __init__(self, shards: ShardWriter, key_for_combo: Callable[[int], str], journal: ProgressJournal, **kwargs):
+        super().__init__(None, journal, **kwargs)
+        self.shards = shards
+        self.key_for_combo = key_for_combo
+
+    def _write_batch(self, pending: dict[int, list[str]]):
+        for combo_idx, lines in pending.items():
+            self.shards.append(self.key_for_combo(combo_idx), lines)
+        self.shards.flush(fsync=self.fsync != "none")
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.shards.close()
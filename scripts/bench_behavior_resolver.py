@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Micro-benchmark BehaviorResolver candidate lookup.
+
+Compares the per-call cost of the original candidate scan (walk every path
+in coherence.json, split it and recompute the rounded average) against the
+precomputed (score, coherence) index, and times a full resolve() call.
+
+Usage:
+    poetry run python scripts/bench_behavior_resolver.py
+    poetry run python scripts/bench_behavior_resolver.py --number 50000
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from persona_api.services import BehaviorResolver
+from persona_api.services.behavior_resolver import DOMAINS
+
+
+def scan_matching_files(index: dict, score: int, coherence: int) -> list[str]:
+    """The original per-call scan over coherence.json paths."""
+    candidate_files = []
+    for level in range(1, coherence + 1):
+        candidate_files.extend(index.get(str(level), []))
+
+    matching = []
+    for file_path in candidate_files:
+        parts = file_path.replace(".json", "").split("/")
+        if len(parts) == 3:
+            s1, s2, s3 = int(parts[0]), int(parts[1]), int(parts[2])
+            avg = round((s1 + s2 + s3) / 3)
+            if avg == score:
+                matching.append(file_path)
+    return matching
+
+
+def per_call_us(stmt, number: int) -> float:
+    """Best-of-5 per-call time in microseconds."""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark BehaviorResolver candidate lookup.")
+    parser.add_argument(
+        "--number", "-n",
+        type=int,
+        default=20000,
+        help="Calls per timing run (default: 20000)",
+    )
+    args = parser.parse_args()
+
+    resolver = BehaviorResolver(seed="bench")
+    source = resolver._source
+    coherence_indices = {domain: source.load_coherence_index(domain) for domain in DOMAINS}
+    cases = [(domain, score, coherence) for domain in DOMAINS for score in range(1, 6) for coherence in (1, 2, 3)]
+
+    # Warm the shared index and text cache
+    for domain, score, coherence in cases:
+        resolver.resolve(domain, score, coherence)
+
+    state = {"i": 0}
+
+    def next_case():
+        case = cases[state["i"] % len(cases)]
+        state["i"] += 1
+        return case
+
+    def scan():
+        domain, score, coherence = next_case()
+        scan_matching_files(coherence_indices[domain], score, coherence)
+
+    def indexed():
+        domain, score, coherence = next_case()
+        resolver._get_matching_scores(domain, score, coherence)
+
+    def resolve():
+        domain, score, coherence = next_case()
+        resolver.resolve(domain, score, coherence)
+
+    scan_us = per_call_us(scan, args.number)
+    index_us = per_call_us(indexed, args.number)
+    resolve_us = per_call_us(resolve, args.number)
+
+    print(f"Candidate lookup ({len(cases)} domain/score/coherence cases, {args.number:,} calls x 5)")
+    print(f"  Scan coherence.json:  {scan_us:8.2f} us/call")
+    print(f"  Precomputed index:    {index_us:8.2f} us/call  ({scan_us / index_us:.0f}x faster)")
+    print(f"  Full resolve():       {resolve_us:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
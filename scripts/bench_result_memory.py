@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Compare the memory cost of holding many generated personalities.
+
+Options measured (per personality, via tracemalloc):
+    dataclass          plain nested dataclasses with a per-instance __dict__
+    slots              nested dataclasses with __slots__ (PersonalityResult)
+    slots + frozen     as above, frozen
+    dict               PersonalityResult.to_dict()
+    facet tuples       PersonalityResult.to_facet_scores()
+    batch row          PersonalityBatch arrays (15 int8 facets + 5 scores)
+
+Usage:
+    poetry run python scripts/bench_result_memory.py
+    poetry run python scripts/bench_result_memory.py --count 500000
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from dataclasses import make_dataclass
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from persona_api.services import RandomFacetGenerator
+from persona_api.services.random_facet_generator import RESULT_DOMAINS, RESULT_FACETS
+
+
+def make_variant(**dataclass_kwargs):
+    """Build a nested dataclass family mirroring PersonalityResult."""
+    facet_classes = {
+        domain: make_dataclass(f"{domain}_facets", [(f, int) for f in RESULT_FACETS[domain]], **dataclass_kwargs)
+        for domain in RESULT_DOMAINS
+    }
+    result_classes = {
+        domain: make_dataclass(f"{domain}_result", [("score", int), ("facets", object)], **dataclass_kwargs)
+        for domain in RESULT_DOMAINS
+    }
+    personality_class = make_dataclass(
+        "personality", [(d, object) for d in RESULT_DOMAINS] + [("seed", str)], **dataclass_kwargs
+    )
+
+    def build(facets, scores, seed):
+        domains = {}
+        for i, domain in enumerate(RESULT_DOMAINS):
+            domain_facets = facet_classes[domain](*facets[i])
+            domains[domain] = result_classes[domain](scores[i], domain_facets)
+        return personality_class(**domains, seed=seed)
+
+    return build
+
+
+def measure(label: str, build, count: int) -> tuple[str, float]:
+    """Return (label, bytes per item) for holding ``count`` items."""
+    gc.collect()
+    tracemalloc.start()
+    held = build(count)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return label, current / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory cost of personality result representations.")
+    parser.add_argument(
+        "--count", "-n",
+        type=int,
+        default=100000,
+        help="Personalities to hold per option (default: 100000)",
+    )
+    args = parser.parse_args()
+
+    gen = RandomFacetGenerator(seed="bench")
+    batch = gen.generate_batch(args.count)
+    results = [batch.to_result(i) for i in range(args.count)]
+    facet_rows = batch.facets.tolist()
+    score_rows = batch.scores.tolist()
+    seed = batch.seed
+
+    plain = make_variant()
+    slotted_frozen = make_variant(slots=True, frozen=True)
+
+    rows = [
+        measure("dataclass", lambda n: [plain(facet_rows[i], score_rows[i], seed) for i in range(n)], args.count),
+        measure("slots", lambda n: [batch.to_result(i) for i in range(n)], args.count),
+        measure("slots + frozen", lambda n: [slotted_frozen(facet_rows[i], score_rows[i], seed) for i in range(n)], args.count),
+        measure("dict", lambda n: [r.to_dict() for r in results[:n]], args.count),
+        measure("facet tuples", lambda n: [r.to_facet_scores() for r in results[:n]], args.count),
+        measure("batch row", lambda n: RandomFacetGenerator(seed="bench").generate_batch(n), args.count),
+    ]
+
+    print(f"Holding {args.count:,} personalities")
+    print(f"  {'option':<16} {'bytes/item':>11}")
+    for label, per_item in rows:
+        print(f"  {label:<16} {per_item:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
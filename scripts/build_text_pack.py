@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Compile the domain text tree into a single binary pack.
+
+The JSON files under persona_api/data/text remain the source of truth.
+This script compiles all 625 <domain>/<s1>/<s2>/<s3>.json files (plus each
+domain's coherence.json) into one versioned pack so resolvers can serve
+entries without opening a file per call.
+
+The pack records a SHA-256 checksum of the source tree; --check compares
+it against the current tree to detect a stale pack.
+
+Output:
+    persona_api/data/text.pack
+
+Usage:
+    poetry run python scripts/build_text_pack.py
+    poetry run python scripts/build_text_pack.py --check
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from persona_api.services.text_pack import DEFAULT_PACK_PATH, TextPack, build_text_pack
+from persona_api.services.text_source import DEFAULT_TEXT_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile persona_api/data/text into a single binary pack.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                  Build the pack
+  %(prog)s --check          Exit 1 if the pack is missing or stale
+  %(prog)s -o /tmp/t.pack   Custom output path
+        """,
+    )
+    parser.add_argument(
+        "--source-dir",
+        type=Path,
+        default=DEFAULT_TEXT_DIR,
+        help="Root of the JSON text tree (default: persona_api/data/text)",
+    )
+    parser.add_argument(
+        "--output", "-o",
+        type=Path,
+        default=DEFAULT_PACK_PATH,
+        help="Pack file to write (default: persona_api/data/text.pack)",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only check whether the pack matches the source tree",
+    )
+    args = parser.parse_args()
+
+    if args.check:
+        if not args.output.exists():
+            print(f"Missing: {args.output}")
+            sys.exit(1)
+        if TextPack(args.output).is_stale(args.source_dir):
+            print(f"Stale: {args.output} (rebuild with scripts/build_text_pack.py)")
+            sys.exit(1)
+        print(f"Up to date: {args.output}")
+        return
+
+    stats = build_text_pack(args.source_dir, args.output)
+
+    print(f"Wrote {args.output}")
+    print(f"  Domains:   {stats['domains']}")
+    print(f"  Entries:   {stats['entries']}")
+    print(f"  Texts:     {stats['texts']:,}")
+    print(f"  Strings:   {stats['strings']:,} (de-duplicated)")
+    print(f"  Size:      {stats['bytes']:,} bytes")
+    print(f"  Checksum:  {stats['checksum']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,55 +3,113 @@
 Consolidate training_data/*.jsonl files into a single JSON file
 with one randomly selected instruction per score combination.
 
+Reads either layout written by generate_training_data.py: one JSONL file
+per combo, or compressed shards with a shards.index (--format shards).
+--show seeks straight to one combo.
+
+Streaming: files (or shards) are read in parallel by --workers processes,
+each keeping a bounded reservoir of --per-combo samples per combo; the
+parent merges the reservoirs (bottom-k sampling, see
+persona_api/services/training_sampling.py), so the picks depend only on
+--seed, not on worker count or read order.
+
 Output format:
 {
     "A1,C1,E1,O3,N1": "Your responses MUST reflect...",
     "A2,C3,E4,O1,N5": "You MUST adopt a personality...",
     ...
 }
+With --per-combo K > 1 each value is a list of up to K instructions.
 """
 
+import argparse
 import json
-import random
+import os
+import sys
+import time
 from pathlib import Path
 
-def main():
-    training_dir = Path(__file__).parent.parent / "training_data"
-    output_path = Path(__file__).parent.parent.parent / "persona-ui" / "src" / "lib" / "data" / "system_prompts.json"
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from persona_api.services.training_corpus import corpus_units, iter_corpus_lines
+from persona_api.services.training_sampling import sample_corpus
+
+DEFAULT_INPUT_DIR = Path(__file__).parent.parent / "training_data"
+DEFAULT_OUTPUT_PATH = Path(__file__).parent.parent.parent / "persona-ui" / "src" / "lib" / "data" / "system_prompts.json"
 
-    # Collect all instructions by score combo
-    instructions_by_score: dict[str, list[str]] = {}
+DEFAULT_SEED = 42  # For reproducibility
 
-    jsonl_files = sorted(training_dir.glob("training_data_*.jsonl"))
-    print(f"Found {len(jsonl_files)} JSONL files")
 
-    for jsonl_file in jsonl_files:
-        with open(jsonl_file, 'r') as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                try:
-                    data = json.loads(line)
-                    scores = data["inputs"]["scores"]
-                    output = data["output"]
+def consolidate(training_dir: Path, k: int = 1, seed: int = DEFAULT_SEED, workers: int = 1) -> dict[str, list[str]]:
+    """Sample up to ``k`` instructions per score combo, reading units in parallel."""
+    units = corpus_units(training_dir)
+    print(f"Found {len(units)} {'shards' if units and units[0].shard is not None else 'JSONL files'}")
+
+    sampled, total_lines, errors = sample_corpus(units, k=k, seed=seed, workers=workers)
+    for error in errors:
+        print(error)
+
+    print(f"Read {total_lines:,} samples")
+    return sampled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pick training instructions per score combo.")
+    parser.add_argument(
+        "--input-dir", "-i",
+        type=Path,
+        default=DEFAULT_INPUT_DIR,
+        help="JSONL or shard directory written by generate_training_data.py (default: training_data/)",
+    )
+    parser.add_argument(
+        "--output", "-o",
+        type=Path,
+        default=DEFAULT_OUTPUT_PATH,
+        help="JSON file to write (default: persona-ui/src/lib/data/system_prompts.json)",
+    )
+    parser.add_argument(
+        "--per-combo", "-k",
+        type=int,
+        default=1,
+        metavar="K",
+        help="Instructions kept per combo; K > 1 writes lists (default: 1)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=DEFAULT_SEED,
+        help=f"Sampling seed (default: {DEFAULT_SEED})",
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Reader processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--show",
+        metavar="SCORES",
+        help="Print every instruction for one combo (e.g. A1,C1,E1,O3,N1) and exit",
+    )
+    args = parser.parse_args()
 
-                    if scores not in instructions_by_score:
-                        instructions_by_score[scores] = []
-                    instructions_by_score[scores].append(output)
-                except (json.JSONDecodeError, KeyError) as e:
-                    print(f"Error parsing line in {jsonl_file}: {e}")
-                    continue
+    if args.per_combo < 1:
+        parser.error("--per-combo must be at least 1")
 
-    print(f"Found {len(instructions_by_score)} unique score combinations")
+    if args.show:
+        for line in iter_corpus_lines(args.input_dir, args.show):
+            print(json.loads(line)["output"])
+        return
 
-    # Pick one random instruction per score combo
-    random.seed(42)  # For reproducibility
-    result: dict[str, str] = {}
+    start = time.time()
+    sampled = consolidate(args.input_dir, k=args.per_combo, seed=args.seed, workers=args.workers)
+    print(f"Found {len(sampled)} unique score combinations in {time.time() - start:.1f}s")
 
-    for scores, instructions in instructions_by_score.items():
-        result[scores] = random.choice(instructions)
+    result = {scores: values[0] for scores, values in sampled.items()} if args.per_combo == 1 else sampled
 
     # Write output
+    output_path = args.output
     output_path.parent.mkdir(parents=True, exist_ok=True)
     with open(output_path, 'w') as f:
         json.dump(result, f, indent=2)
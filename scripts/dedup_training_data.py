@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Find (and optionally drop) duplicate training samples.
+
+Within each score combo, a sample is a duplicate when its traits field
+exactly matches an earlier kept sample's, or its output is a near-duplicate of
+an earlier kept output (estimated Jaccard similarity >= --threshold); the
+first sample of each group is kept. See
+persona_api/services/training_dedup.py. Every combo is an independent unit,
+processed in parallel by --workers processes with one combo's signatures in
+memory each.
+
+Reads either layout (per-combo JSONL or shards). Without --output-dir only
+a summary (and --report) is produced; with it, the kept samples are written
+there in the input's layout.
+
+Usage:
+    poetry run python scripts/dedup_training_data.py --report dups.jsonl
+    poetry run python scripts/dedup_training_data.py -o training_data_dedup
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from persona_api.services.near_duplicates import DEFAULT_BANDS, DEFAULT_NUM_PERM, DEFAULT_THRESHOLD
+from persona_api.services.training_corpus import corpus_units
+from persona_api.services.training_dedup import DedupResult, dedup_unit
+from persona_api.services.training_shards import ShardReader, ShardWriter, is_shard_dir
+
+DEFAULT_INPUT_DIR = Path(__file__).parent.parent / "training_data"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report and optionally drop duplicate training samples.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                                  Summary only
+  %(prog)s --report dups.jsonl              List every duplicate and what it duplicates
+  %(prog)s -o training_data_dedup           Write the kept samples
+  %(prog)s --threshold 0.9 -w 8             Stricter similarity, 8 processes
+        """,
+    )
+    parser.add_argument(
+        "--input-dir", "-i",
+        type=Path,
+        default=DEFAULT_INPUT_DIR,
+        help="JSONL or shard directory written by generate_training_data.py (default: training_data/)",
+    )
+    parser.add_argument(
+        "--output-dir", "-o",
+        type=Path,
+        help="Write kept samples here, in the input's layout (default: report only)",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        help="Write one JSON line per duplicate (scores, seed, reason, duplicate_of, similarity)",
+    )
+    parser.add_argument(
+        "--threshold", "-t",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Estimated Jaccard similarity of outputs counted as duplicate (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--num-perm",
+        type=int,
+        default=DEFAULT_NUM_PERM,
+        help=f"MinHash permutations (default: {DEFAULT_NUM_PERM})",
+    )
+    parser.add_argument(
+        "--bands",
+        type=int,
+        default=DEFAULT_BANDS,
+        help=f"LSH bands; must divide --num-perm (default: {DEFAULT_BANDS})",
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes (default: CPU count)",
+    )
+    args = parser.parse_args()
+
+    if args.num_perm % args.bands:
+        parser.error("--bands must divide --num-perm")
+    if args.output_dir is not None and args.output_dir.resolve() == args.input_dir.resolve():
+        parser.error("--output-dir must differ from --input-dir")
+
+    units = corpus_units(args.input_dir, by_combo=True)
+    print(f"Deduplicating {len(units)} combos from {args.input_dir} (threshold {args.threshold}, {args.workers} workers)")
+
+    shards = None
+    if args.output_dir is not None:
+        args.output_dir.mkdir(parents=True, exist_ok=True)
+        if is_shard_dir(args.input_dir):
+            shards = ShardWriter(args.output_dir, codec=ShardReader(args.input_dir).codec.name)
+
+    report = open(args.report, "w", encoding="utf-8") if args.report else None
+    totals = {"samples": 0, "bytes": 0, "duplicate_bytes": 0, "traits": 0, "output": 0, "errors": 0}
+    start = time.time()
+
+    def handle(result: DedupResult):
+        totals["samples"] += result.samples
+        totals["bytes"] += result.bytes
+        totals["duplicate_bytes"] += result.duplicate_bytes
+        totals["errors"] += result.errors
+        for duplicate in result.duplicates:
+            totals[duplicate["reason"]] += 1
+            if report is not None:
+                report.write(json.dumps(duplicate, ensure_ascii=False) + "\n")
+
+        if args.output_dir is None or not result.kept:
+            return
+        if shards is not None:
+            shards.append(result.unit.key, result.kept)
+        else:
+            with open(args.output_dir / result.unit.path.name, "w", encoding="utf-8") as f:
+                f.writelines(result.kept)
+
+    options = (args.threshold, args.num_perm, args.bands, args.output_dir is not None)
+    try:
+        if args.workers <= 1:
+            for unit in units:
+                handle(dedup_unit(unit, *options))
+        else:
+            with ProcessPoolExecutor(max_workers=args.workers) as executor:
+                chunksize = max(1, len(units) // (args.workers * 4))
+                columns = [[option] * len(units) for option in options]
+                for result in executor.map(dedup_unit, units, *columns, chunksize=chunksize):
+                    handle(result)
+    finally:
+        if shards is not None:
+            shards.close()
+        if report is not None:
+            report.close()
+
+    duplicates = totals["traits"] + totals["output"]
+    pct = duplicates / totals["samples"] * 100 if totals["samples"] else 0.0
+    print(f"Scanned {totals['samples']:,} samples in {time.time() - start:.1f}s")
+    print(f"  Duplicates: {duplicates:,} ({pct:.1f}%)")
+    print(f"    same traits:       {totals['traits']:,}")
+    print(f"    near-dup output:   {totals['output']:,}")
+    print(f"  Reclaimable: {totals['duplicate_bytes']:,} of {totals['bytes']:,} bytes")
+    if totals["errors"]:
+        print(f"  Skipped: {totals['errors']:,} unparseable lines")
+    if args.output_dir is not None:
+        print(f"Wrote {totals['samples'] - duplicates:,} samples to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
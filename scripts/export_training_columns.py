@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Export training data to a columnar file with typed score columns.
+
+Reads training_data/ in either layout (per-combo JSONL or shards), parsing
+files in parallel across --workers processes, and writes one row per
+sample with columns A, C, E, O, N, length_target, length_actual, seed,
+traits (dictionary-encoded) and output. See
+persona_api/services/training_columns.py for the formats.
+
+Output:
+    training_data.parquet (needs pyarrow) or training_data.npz (numpy only)
+
+Usage:
+    poetry run python scripts/export_training_columns.py
+    poetry run python scripts/export_training_columns.py --format npz -o /tmp/td.npz
+
+Reading it back:
+    pyarrow.parquet.read_table("training_data.parquet", filters=[("A", "=", 5), ("length_actual", ">", 200)])
+    TrainingColumns("training_data.npz").select(A=5, min_length=200)
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from persona_api.services.training_columns import DEFAULT_ROW_GROUP_ROWS, FORMATS, ColumnChunk, create_column_writer, default_format
+from persona_api.services.training_corpus import CorpusUnit, corpus_units, iter_unit_lines
+
+DEFAULT_INPUT_DIR = Path(__file__).parent.parent / "training_data"
+
+
+def parse_unit(unit: CorpusUnit) -> ColumnChunk:
+    return ColumnChunk.from_lines(iter_unit_lines(unit))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export training data to Parquet or npz columns.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                              Parquet if pyarrow is installed, else npz
+  %(prog)s --format npz -o td.npz       numpy-only export
+  %(prog)s -i ./shards -w 8             Export a shard directory with 8 processes
+        """,
+    )
+    parser.add_argument(
+        "--input-dir", "-i",
+        type=Path,
+        default=DEFAULT_INPUT_DIR,
+        help="JSONL or shard directory written by generate_training_data.py (default: training_data/)",
+    )
+    parser.add_argument(
+        "--output", "-o",
+        type=Path,
+        help="File to write (default: training_data.<format>)",
+    )
+    parser.add_argument(
+        "--format", "-f",
+        choices=FORMATS,
+        default=default_format(),
+        help=f"Output format (default: {default_format()}; parquet needs pyarrow)",
+    )
+    parser.add_argument(
+        "--row-group-rows",
+        type=int,
+        default=DEFAULT_ROW_GROUP_ROWS,
+        help=f"Rows per Parquet row group (default: {DEFAULT_ROW_GROUP_ROWS:,})",
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Parser processes (default: CPU count)",
+    )
+    args = parser.parse_args()
+
+    output = args.output or Path(f"training_data.{args.format}")
+    units = corpus_units(args.input_dir)
+    print(f"Exporting {len(units)} files/shards from {args.input_dir} to {output} ({args.format})")
+
+    start = time.time()
+    writer = create_column_writer(output, args.format, row_group_rows=args.row_group_rows)
+    errors = 0
+    try:
+        if args.workers <= 1:
+            chunks = map(parse_unit, units)
+            for chunk in chunks:
+                writer.write(chunk)
+                errors += chunk.errors
+        else:
+            with ProcessPoolExecutor(max_workers=args.workers) as executor:
+                for chunk in executor.map(parse_unit, units, chunksize=max(1, len(units) // (args.workers * 4))):
+                    writer.write(chunk)
+                    errors += chunk.errors
+    finally:
+        writer.close()
+
+    print(f"Wrote {writer.rows:,} rows in {time.time() - start:.1f}s")
+    print(f"  Size:    {output.stat().st_size:,} bytes")
+    if errors:
+        print(f"  Skipped: {errors:,} unparseable lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,29 +4,51 @@
 Iterates through all 3,125 combinations of BFI-2 domain scores (A,C,E,O,N each 1-5),
 generating 500 samples per combination (100 runs × 5 length tiers).
 
-Output: One JSONL file per combination (training_data_0001.jsonl through training_data_3125.jsonl).
-Resume support: Skips combos where output file already has expected line count.
+Output: One JSONL file per combination (training_data_0001.jsonl through training_data_3125.jsonl),
+or compressed shards with --format shards. Interrupted runs resume exactly where they stopped.
+Storage, index and resume details live in persona_api/services (progress_journal, training_*);
+see --help for options.
 """
 
 import argparse
+import asyncio
 import json
 import random
 import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from itertools import product
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice, product
 from pathlib import Path
-from threading import Lock
 from typing import Iterator
 
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from persona_api.services import DomainTextResolver, ProfileGenerator
+from persona_api.services.host_pool import create_async_host_pool
+from persona_api.services.ollama_transport import AsyncSshTransport
+from persona_api.services.progress_journal import JOURNAL_NAME, ProgressJournal
+from persona_api.services.training_index import INDEX_NAME, TrainingIndex
+from persona_api.services.training_shards import CODECS, DEFAULT_SHARD_BYTES, ShardReader, ShardWriter, default_codec, is_shard_dir
+from persona_api.services.training_writer import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_FLUSH_INTERVAL,
+    FSYNC_POLICIES,
+    BufferedJsonlWriter,
+    ShardedJsonlWriter,
+)
 
 # Hardcoded config (personal script, not runtime)
 OLLAMA_HOST = "sparx"
 OLLAMA_MODEL = "qwen2.5:7b"  # Better quality for training data than llama3.2
+OLLAMA_TIMEOUT = 120  # Seconds per sample
+
+OUTPUT_FORMATS = ("jsonl", "shards")
+
+# Pipeline: queued work items per worker, and the window for the samples/s rate
+QUEUE_DEPTH = 2
+RATE_WINDOW = 60.0
 
 # Domain display order
 DOMAIN_ORDER = ["agreeableness", "conscientiousness", "extraversion", "open_mindedness", "negative_emotionality"]
@@ -78,33 +100,8 @@ def scores_to_emoji(scores: dict[str, int]) -> str:
     return "".join(DOMAIN_EMOJI_GRADIENT[d][scores[d]] for d in DOMAIN_ORDER)
 
 
-def call_ollama(prompt: str, timeout: int = 120) -> str:
-    """Call Ollama API via SSH to sparx."""
-    import json
-    import subprocess
-
-    payload = json.dumps({
-        "model": OLLAMA_MODEL,
-        "prompt": prompt,
-        "stream": False,
-    })
-
-    cmd = ["ssh", OLLAMA_HOST, "curl -s http://localhost:11434/api/generate -d @-"]
-    result = subprocess.run(cmd, input=payload, capture_output=True, text=True, timeout=timeout)
-
-    if result.returncode != 0:
-        raise RuntimeError(f"SSH/Ollama error: {result.stderr}")
-
-    response = json.loads(result.stdout)
-    return response.get("response", "").strip()
-
-
-def generate_sample(
-    scores: dict[str, int],
-    length: int | None,
-    seed: str,
-) -> dict:
-    """Generate a single training sample."""
+def build_traits(scores: dict[str, int], seed: str) -> list[dict]:
+    """Resolve behaviors for a score combo and slice its traits."""
     # Build facet scores (all facets same as domain score)
     facet_scores = {domain: (score, score, score) for domain, score in scores.items()}
 
@@ -119,13 +116,11 @@ def generate_sample(
     if not traits:
         raise ValueError(f"No traits generated for {scores_to_string(scores)}")
 
-    # Generate prompt
-    prompt = profile_gen.generate_prompt(traits, length=length)
+    return traits
 
-    # Call Ollama
-    output = call_ollama(prompt)
 
-    # Build record
+def build_record(scores: dict[str, int], traits: list[dict], output: str, length: int | None, seed: str) -> dict:
+    """Build a training sample record."""
     traits_text = ", ".join(t["trait"] for t in traits)
 
     return {
@@ -148,49 +143,130 @@ def generate_sample(
     }
 
 
+async def generate_sample(
+    scores: dict[str, int],
+    length: int | None,
+    seed: str,
+    transport,
+) -> dict:
+    """Generate a single training sample."""
+    traits = build_traits(scores, seed)
+
+    # Call Ollama
+    gen = ProfileGenerator(seed=seed, async_transport=transport)
+    output = await gen.agenerate_profile(traits, model=OLLAMA_MODEL, length=length, timeout=OLLAMA_TIMEOUT)
+
+    return build_record(scores, traits, output, length, seed)
+
+
+@dataclass(slots=True)
+class WorkItem:
+    combo_idx: int
+    tier_idx: int
+    run_idx: int
+    scores: dict[str, int]
+
+
 class TrainingDataGenerator:
-    """Orchestrates training data generation with one file per combo."""
+    """Orchestrates training data generation with one file per combo.
+
+    Runs as one continuous pipeline across all combos:
+
+        producer -> work queue -> ``workers`` LLM tasks -> result queue -> writer
+
+    Both queues are bounded, so the producer stays only a little ahead of
+    the LLM hosts and the writer is the only stage touching output files.
+    """
 
     def __init__(
         self,
         output_dir: Path,
         workers: int,
+        transport=None,
+        hosts_desc: str = OLLAMA_HOST,
+        max_samples: int | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        fsync: str = "none",
+        output_format: str = "jsonl",
+        codec: str | None = None,
+        shard_bytes: int = DEFAULT_SHARD_BYTES,
     ):
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.workers = workers
+        self.transport = transport if transport is not None else AsyncSshTransport(OLLAMA_HOST)
+        self.hosts_desc = hosts_desc
+        self.max_samples = max_samples
         self.error_path = output_dir / "errors.jsonl"
+        self.output_format = output_format
+        self.combos = list(generate_combinations())
+        self.journal = ProgressJournal(output_dir / JOURNAL_NAME)
+
+        writer_options = {"batch_size": batch_size, "flush_interval": flush_interval, "fsync": fsync}
+        if output_format == "shards":
+            shards = ShardWriter(output_dir, codec=codec, shard_bytes=shard_bytes)
+            self.writer = ShardedJsonlWriter(shards, self._combo_key, self.journal, **writer_options)
+        else:
+            self.index = TrainingIndex(output_dir)
+            self.writer = BufferedJsonlWriter(self._get_combo_file, self.journal, index=self.index, **writer_options)
 
-        self.write_lock = Lock()
         self.error_count = 0
         self.start_time = time.time()
         self.samples_generated = 0
         self.combos_completed = 0
         self.combos_skipped = 0
+        self.samples_skipped = 0
+        self._recent: deque[float] = deque()
 
     def _get_combo_file(self, combo_idx: int) -> Path:
         """Get the output file path for a combo (1-indexed in filename)."""
         return self.output_dir / f"training_data_{combo_idx + 1:04d}.jsonl"
 
-    def _is_combo_complete(self, combo_idx: int) -> bool:
-        """Check if a combo file already exists (skip any existing file)."""
-        combo_file = self._get_combo_file(combo_idx)
-        return combo_file.exists()
+    def _combo_key(self, combo_idx: int) -> str:
+        """Shard key for a combo: its score string."""
+        return scores_to_string(combo_to_scores(self.combos[combo_idx]))
+
+    def _existing_lines(self) -> Iterator[str]:
+        """Every line already written, in either output format."""
+        if is_shard_dir(self.output_dir):
+            yield from ShardReader(self.output_dir).iter_lines()
+
+        for combo_idx in range(TOTAL_COMBINATIONS):
+            combo_file = self._get_combo_file(combo_idx)
+            if combo_file.exists():
+                with open(combo_file, encoding="utf-8") as f:
+                    yield from f
+
+    def _load_journal(self):
+        """Load the progress journal, rebuilding it once from existing output if missing."""
+        if self.journal.exists():
+            self.journal.load()
+        else:
+            found = self.journal.rebuild(self._existing_lines())
+            if found:
+                print(f"Rebuilt {JOURNAL_NAME} from existing output: {found:,} samples")
+
+    def _missing_runs(self, combo_idx: int) -> list[tuple[int, int]]:
+        """(tier_idx, run_idx) pairs of a combo not yet written."""
+        return self.journal.missing(combo_idx, len(LENGTH_TIERS), RUNS_PER_TIER)
 
-    def _write_sample(self, combo_idx: int, sample: dict):
-        """Write a sample to the combo's output file."""
-        combo_file = self._get_combo_file(combo_idx)
-        with self.write_lock:
-            with open(combo_file, "a") as f:
-                f.write(json.dumps(sample, ensure_ascii=False) + "\n")
-            self.samples_generated += 1
+    def _write_sample(self, item: "WorkItem", sample: dict):
+        """Hand a sample to the buffered writer (writer stage only)."""
+        self.writer.write((item.combo_idx, item.tier_idx, item.run_idx), sample)
+        self.samples_generated += 1
 
     def _write_error(self, error_info: dict):
-        """Write an error to the error file."""
-        with self.write_lock:
-            with open(self.error_path, "a") as f:
-                f.write(json.dumps(error_info, ensure_ascii=False) + "\n")
-            self.error_count += 1
+        """Write an error to the error file (writer stage only)."""
+        with open(self.error_path, "a") as f:
+            f.write(json.dumps(error_info, ensure_ascii=False) + "\n")
+        self.error_count += 1
+
+    def _format_desc(self) -> str:
+        if isinstance(self.writer, ShardedJsonlWriter):
+            shards = self.writer.shards
+            return f"{shards.codec.name} shards of {shards.shard_bytes // (1024 * 1024)} MB"
+        return "one JSONL file per combo"
 
     def _format_eta(self, seconds: float) -> str:
         """Format seconds as human-readable duration."""
@@ -202,135 +278,158 @@ class TrainingDataGenerator:
             return f"{hours}h {minutes}m"
         return f"{minutes}m"
 
-    def _print_status(self, combo_idx: int, tier_idx: int, run_idx: int, scores: dict[str, int]):
+    def _recent_rate(self) -> float:
+        """Samples/sec over the last RATE_WINDOW seconds."""
+        now = time.time()
+        self._recent.append(now)
+        while self._recent and now - self._recent[0] > RATE_WINDOW:
+            self._recent.popleft()
+        window = min(RATE_WINDOW, now - self.start_time)
+        return len(self._recent) / window if window > 0 else 0.0
+
+    def _print_status(self, item: WorkItem):
         """Print current progress status."""
-        completed = (self.combos_skipped * SAMPLES_PER_COMBINATION) + self.samples_generated
+        completed = self.samples_skipped + self.samples_generated
         elapsed = time.time() - self.start_time
+        recent = self._recent_rate()
 
         if self.samples_generated > 0:
             rate = self.samples_generated / elapsed
             remaining = TOTAL_SAMPLES - completed
-            eta = remaining / rate if rate > 0 else -1
+            eta = remaining / recent if recent > 0 else -1
         else:
             rate = 0
             eta = -1
 
         pct = (completed / TOTAL_SAMPLES) * 100
-        length_str = str(LENGTH_TIERS[tier_idx]) if LENGTH_TIERS[tier_idx] else "None"
 
         status = (
             f"\r[{pct:5.1f}%] {completed:,}/{TOTAL_SAMPLES:,} | "
-            f"Combo {combo_idx+1}/{TOTAL_COMBINATIONS} {scores_to_string(scores)} | "
-            f"len={length_str} run={run_idx+1}/{RUNS_PER_TIER} | "
-            f"{rate:.1f}/s | ETA: {self._format_eta(eta)} | Errors: {self.error_count}"
+            f"Combo {item.combo_idx+1}/{TOTAL_COMBINATIONS} {scores_to_string(item.scores)} | "
+            f"{recent:.2f} samples/s (avg {rate:.2f}) | ETA: {self._format_eta(eta)} | Errors: {self.error_count}"
         )
 
         # Pad to clear previous line
         print(f"{status:<120}", end="", flush=True)
 
-    def _generate_single(
-        self,
-        combo_idx: int,
-        tier_idx: int,
-        run_idx: int,
-        scores: dict[str, int],
-    ) -> bool:
-        """Generate a single sample. Returns True on success."""
-        length = LENGTH_TIERS[tier_idx]
-        seed = f"{combo_idx}_{tier_idx}_{run_idx}_{random.randint(0, 999999)}"
+    def _pending_work(self, combos: list) -> Iterator[WorkItem]:
+        """Every sample still to generate, combo by combo."""
+        for combo_idx, combo in enumerate(combos):
+            missing = self._missing_runs(combo_idx)
+            if not missing:
+                continue
+
+            scores = combo_to_scores(combo)
+            for tier_idx, run_idx in missing:
+                yield WorkItem(combo_idx, tier_idx, run_idx, scores)
+
+    async def _produce(self, combos: list, work_queue: asyncio.Queue):
+        for item in islice(self._pending_work(combos), self.max_samples):
+            await work_queue.put(item)
+        for _ in range(self.workers):
+            await work_queue.put(None)
+
+    async def _generate(self, work_queue: asyncio.Queue, result_queue: asyncio.Queue):
+        """LLM stage: generate samples until the producer's end marker."""
+        while (item := await work_queue.get()) is not None:
+            length = LENGTH_TIERS[item.tier_idx]
+            seed = f"{item.combo_idx}_{item.tier_idx}_{item.run_idx}_{random.randint(0, 999999)}"
+
+            try:
+                sample = await generate_sample(item.scores, length, seed, self.transport)
+                await result_queue.put((item, sample, None))
+            except Exception as e:
+                await result_queue.put((item, None, {
+                    "combo_idx": item.combo_idx,
+                    "tier_idx": item.tier_idx,
+                    "run_idx": item.run_idx,
+                    "scores": scores_to_string(item.scores),
+                    "length": length,
+                    "seed": seed,
+                    "error": str(e) or type(e).__name__,
+                }))
+
+    async def _generate_all(self, work_queue: asyncio.Queue, result_queue: asyncio.Queue):
+        """Run ``workers`` LLM tasks, then tell the writer no more results are coming."""
+        await asyncio.gather(*(self._generate(work_queue, result_queue) for _ in range(self.workers)))
+        await result_queue.put(None)
+
+    async def _write(self, result_queue: asyncio.Queue):
+        """Writer stage: the only place output files are touched."""
+        while True:
+            try:
+                result = await asyncio.wait_for(result_queue.get(), self.writer.seconds_until_flush())
+            except TimeoutError:
+                self.writer.flush()
+                continue
+            if result is None:
+                break
+
+            item, sample, error = result
+            if error is not None:
+                self._write_error(error)
+            else:
+                self._write_sample(item, sample)
+            self._print_status(item)
+
+    async def _run_pipeline(self, combos: list):
+        work_queue = asyncio.Queue(maxsize=self.workers * QUEUE_DEPTH)
+        result_queue = asyncio.Queue(maxsize=self.workers * QUEUE_DEPTH)
+
+        tasks = [
+            asyncio.create_task(self._produce(combos, work_queue)),
+            asyncio.create_task(self._generate_all(work_queue, result_queue)),
+            asyncio.create_task(self._write(result_queue)),
+        ]
 
         try:
-            sample = generate_sample(scores, length, seed)
-            self._write_sample(combo_idx, sample)
-            return True
-        except Exception as e:
-            self._write_error({
-                "combo_idx": combo_idx,
-                "tier_idx": tier_idx,
-                "run_idx": run_idx,
-                "scores": scores_to_string(scores),
-                "length": length,
-                "seed": seed,
-                "error": str(e),
-            })
-            return False
-
-    def _generate_combo(self, combo_idx: int, scores: dict[str, int]) -> int:
-        """Generate all samples for a single combo. Returns count generated."""
-        count = 0
-        for tier_idx in range(len(LENGTH_TIERS)):
-            for run_idx in range(RUNS_PER_TIER):
-                self._print_status(combo_idx, tier_idx, run_idx, scores)
-                if self._generate_single(combo_idx, tier_idx, run_idx, scores):
-                    count += 1
-        return count
+            # Wait on every stage: if one fails (e.g. a disk error in the writer),
+            # the others are cancelled below instead of blocking on a full queue
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Flush what was buffered so an interrupted run keeps it
+            self.writer.close()
+            self.journal.close()
+            await self.transport.aclose()
 
     def run(self):
         """Run the generation process."""
-        combos = list(generate_combinations())
-
-        # Count already-completed combos
+        combos = self.combos
+
+        # Count already-written samples and complete combos
+        self._load_journal()
+        if self.output_format == "jsonl":
+            indexed = self.index.refresh()
+            if indexed:
+                print(f"Indexed {indexed:,} existing samples in {INDEX_NAME}")
         for combo_idx in range(len(combos)):
-            if self._is_combo_complete(combo_idx):
+            missing = len(self._missing_runs(combo_idx))
+            self.samples_skipped += SAMPLES_PER_COMBINATION - missing
+            if missing == 0:
                 self.combos_skipped += 1
 
         print(f"Generating {TOTAL_SAMPLES:,} training samples")
         print(f"Combinations: {TOTAL_COMBINATIONS:,} | Samples per combo: {SAMPLES_PER_COMBINATION}")
         print(f"Length tiers: {LENGTH_TIERS} | Runs per tier: {RUNS_PER_TIER}")
-        print(f"Workers: {self.workers} | Model: {OLLAMA_MODEL} | Host: {OLLAMA_HOST}")
-        print(f"Output dir: {self.output_dir}")
-        if self.combos_skipped > 0:
-            print(f"Resuming: {self.combos_skipped} combos already complete ({self.combos_skipped * SAMPLES_PER_COMBINATION:,} samples)")
+        print(f"Workers: {self.workers} | Model: {OLLAMA_MODEL} | Host: {self.hosts_desc}")
+        print(f"Output dir: {self.output_dir} ({self._format_desc()})")
+        if self.samples_skipped > 0:
+            print(f"Resuming: {self.samples_skipped:,} samples already written ({self.combos_skipped} combos complete)")
         print()
 
-        if self.workers == 1:
-            self._run_sequential(combos)
-        else:
-            self._run_parallel(combos)
+        self.start_time = time.time()
+        asyncio.run(self._run_pipeline(combos))
 
+        elapsed = time.time() - self.start_time
+        rate = self.samples_generated / elapsed if elapsed > 0 else 0.0
+        self.combos_completed = sum(1 for combo_idx in range(len(combos)) if not self._missing_runs(combo_idx)) - self.combos_skipped
         print()
         print(f"Done! Generated {self.samples_generated:,} new samples with {self.error_count} errors")
+        print(f"Throughput: {rate:.2f} samples/s over {self._format_eta(elapsed)}")
         print(f"Total complete: {self.combos_skipped + self.combos_completed}/{TOTAL_COMBINATIONS} combos")
 
-    def _run_sequential(self, combos: list):
-        """Run generation sequentially, one combo at a time."""
-        for combo_idx, combo in enumerate(combos):
-            if self._is_combo_complete(combo_idx):
-                continue
-
-            scores = combo_to_scores(combo)
-            self._generate_combo(combo_idx, scores)
-            self.combos_completed += 1
-
-    def _run_parallel(self, combos: list):
-        """Run generation with parallel workers within each combo."""
-        for combo_idx, combo in enumerate(combos):
-            if self._is_combo_complete(combo_idx):
-                continue
-
-            scores = combo_to_scores(combo)
-
-            # Build work for this combo
-            work = []
-            for tier_idx in range(len(LENGTH_TIERS)):
-                for run_idx in range(RUNS_PER_TIER):
-                    work.append((combo_idx, tier_idx, run_idx, scores))
-
-            # Run this combo's work in parallel
-            with ThreadPoolExecutor(max_workers=self.workers) as executor:
-                futures = {}
-                for combo_idx, tier_idx, run_idx, scores in work:
-                    future = executor.submit(
-                        self._generate_single, combo_idx, tier_idx, run_idx, scores
-                    )
-                    futures[future] = (combo_idx, tier_idx, run_idx, scores)
-
-                for future in as_completed(futures):
-                    combo_idx, tier_idx, run_idx, scores = futures[future]
-                    self._print_status(combo_idx, tier_idx, run_idx, scores)
-
-            self.combos_completed += 1
-
 
 def main():
     parser = argparse.ArgumentParser(
@@ -343,12 +442,14 @@ Config (hardcoded):
 
 Output:
   One file per combo: training_data_0001.jsonl through training_data_3125.jsonl
-  Resume: automatically skips combos where file has {SAMPLES_PER_COMBINATION} lines
+  --format shards: compressed shards + shards.index (read with consolidate_training_data.py)
+  Resume: {JOURNAL_NAME} records written samples; a restart generates only the missing ones
 
 Examples:
   %(prog)s                              # Run with defaults
   %(prog)s --workers 4                  # Use 4 parallel workers
   %(prog)s --output-dir ./my_data       # Custom output directory
+  %(prog)s --hosts http://sparx:11434=4,http://box2:11434=4 --workers 8
         """,
     )
     parser.add_argument(
@@ -361,20 +462,82 @@ Examples:
         "--workers", "-w",
         type=int,
         default=1,
-        help="Number of parallel workers (default: 1)",
+        help="Ollama requests kept in flight (default: 1)",
+    )
+    parser.add_argument(
+        "--max-samples", "-n",
+        type=int,
+        metavar="N",
+        help="Stop after N samples (e.g. to measure samples/sec)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="jsonl",
+        help="jsonl: one file per combo; shards: compressed shards with an index (default: jsonl)",
+    )
+    parser.add_argument(
+        "--codec",
+        choices=CODECS,
+        help=f"Shard compression (default: {default_codec()}; zstd needs the zstandard package)",
+    )
+    parser.add_argument(
+        "--shard-mb",
+        type=int,
+        default=DEFAULT_SHARD_BYTES // (1024 * 1024),
+        metavar="MB",
+        help=f"Compressed size of each shard (default: {DEFAULT_SHARD_BYTES // (1024 * 1024)})",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Samples buffered before each write (default: {DEFAULT_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=DEFAULT_FLUSH_INTERVAL,
+        metavar="SECONDS",
+        help=f"Write buffered samples at least this often (default: {DEFAULT_FLUSH_INTERVAL})",
+    )
+    parser.add_argument(
+        "--fsync",
+        choices=FSYNC_POLICIES,
+        default="none",
+        help="none: OS decides; batch: fsync after each write; always: write and fsync every sample (default: none)",
+    )
+    parser.add_argument(
+        "--hosts",
+        type=str,
+        metavar="SPEC",
+        help=f"Ollama hosts to load-balance over: target[=max_concurrency],... where target is a URL or SSH host (default: SSH to {OLLAMA_HOST})",
     )
 
     args = parser.parse_args()
 
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    transport = create_async_host_pool(args.hosts) if args.hosts else None
     generator = TrainingDataGenerator(
         output_dir=args.output_dir,
         workers=args.workers,
+        transport=transport,
+        hosts_desc=", ".join(transport.hosts) if transport is not None else OLLAMA_HOST,
+        max_samples=args.max_samples,
+        batch_size=args.batch_size,
+        flush_interval=args.flush_interval,
+        fsync=args.fsync,
+        output_format=args.format,
+        codec=args.codec,
+        shard_bytes=args.shard_mb * 1024 * 1024,
     )
 
     try:
         generator.run()
     except KeyboardInterrupt:
-        print("\n\nInterrupted! Complete combos are preserved in output files.")
+        print("\n\nInterrupted! Written samples are journaled; rerun to resume.")
         sys.exit(1)
 
 
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Load-test a running Persona API server.
+
+Fires GET requests at an endpoint from a pool of threads (one keep-alive
+session per thread) and reports throughput and latency percentiles.
+
+Usage:
+    make run    # in another terminal
+    poetry run python scripts/load_test_api.py
+    poetry run python scripts/load_test_api.py --requests 5000 --concurrency 32
+    poetry run python scripts/load_test_api.py --path "/personality/random?coherence=1"
+"""
+
+import argparse
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test a running Persona API server.")
+    parser.add_argument(
+        "--url",
+        type=str,
+        default="http://localhost:8000",
+        help="Server base URL (default: http://localhost:8000)",
+    )
+    parser.add_argument(
+        "--path",
+        type=str,
+        default="/personality/random",
+        help="Endpoint path and query string (default: /personality/random)",
+    )
+    parser.add_argument(
+        "--requests", "-n",
+        type=int,
+        default=1000,
+        help="Total requests (default: 1000)",
+    )
+    parser.add_argument(
+        "--concurrency", "-c",
+        type=int,
+        default=8,
+        help="Concurrent client threads (default: 8)",
+    )
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/") + args.path
+    local = threading.local()
+
+    def fire(_):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        response = local.session.get(url, timeout=30)
+        return time.perf_counter() - start, response.status_code
+
+    print(f"GET {url}")
+    print(f"Requests: {args.requests:,} | Concurrency: {args.concurrency}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        try:
+            results = list(executor.map(fire, range(args.requests)))
+        except requests.ConnectionError as e:
+            print(f"Error: cannot reach {args.url} ({e})", file=sys.stderr)
+            sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency * 1000 for latency, _status in results)
+    errors = sum(1 for _latency, status in results if status != 200)
+
+    print()
+    print(f"  Throughput:  {len(results) / elapsed:,.1f} req/s ({elapsed:.2f}s total)")
+    print(f"  Errors:      {errors}")
+    print(f"  Latency ms:  mean {statistics.mean(latencies):.2f} | p50 {percentile(latencies, 50):.2f} | "
+          f"p95 {percentile(latencies, 95):.2f} | p99 {percentile(latencies, 99):.2f} | max {latencies[-1]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
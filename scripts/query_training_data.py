@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Extract training samples by score combo and/or length tier.
+
+Uses the training.index sidecar (see persona_api/services/training_index.py)
+to seek straight to matching lines; lines not yet indexed are read in
+memory, so files written without it are picked up. The index itself is
+never written, so querying while generate_training_data.py runs is safe.
+Shard directories are read through their own combo index. Matching JSONL lines go to stdout (or --output).
+
+Usage:
+    poetry run python scripts/query_training_data.py --scores A2,C3,E4,O4,N4 > subset.jsonl
+    poetry run python scripts/query_training_data.py --length-target 128 --count
+    poetry run python scripts/query_training_data.py --length-target 0      # unconstrained tier
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Iterator
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from persona_api.services.training_corpus import iter_corpus_lines
+from persona_api.services.training_index import NO_LENGTH_TARGET, TrainingIndex, combo_file_number
+from persona_api.services.training_shards import is_shard_dir
+
+DEFAULT_INPUT_DIR = Path(__file__).parent.parent / "training_data"
+
+
+def shard_lines(training_dir: Path, scores: str | None, length_target: int | None) -> Iterator[str]:
+    for line in iter_corpus_lines(training_dir, scores):
+        target = json.loads(line)["meta"]["length_target"]
+        if length_target is None or (target or NO_LENGTH_TARGET) == length_target:
+            yield line if line.endswith("\n") else line + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract training samples by score combo and/or length tier.")
+    parser.add_argument(
+        "--input-dir", "-i",
+        type=Path,
+        default=DEFAULT_INPUT_DIR,
+        help="JSONL or shard directory written by generate_training_data.py (default: training_data/)",
+    )
+    parser.add_argument(
+        "--scores", "-s",
+        help="Score combo, e.g. A2,C3,E4,O4,N4",
+    )
+    parser.add_argument(
+        "--length-target", "-l",
+        type=int,
+        help=f"Length tier, e.g. 128 ({NO_LENGTH_TARGET} = unconstrained)",
+    )
+    parser.add_argument(
+        "--count", "-c",
+        action="store_true",
+        help="Print the number of matching samples instead of the samples",
+    )
+    parser.add_argument(
+        "--output", "-o",
+        type=Path,
+        help="Write matching lines here instead of stdout",
+    )
+    args = parser.parse_args()
+
+    if args.scores is not None:
+        try:
+            combo_file_number(args.scores)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if is_shard_dir(args.input_dir):
+        lines = shard_lines(args.input_dir, args.scores, args.length_target)
+    else:
+        index = TrainingIndex(args.input_dir)
+        unindexed = index.refresh(persist=False)
+        if unindexed:
+            print(f"Read {unindexed:,} unindexed samples", file=sys.stderr)
+        if args.count:
+            print(index.count(args.scores, args.length_target))
+            return
+        lines = index.lines(args.scores, args.length_target)
+
+    if args.count:
+        print(sum(1 for _ in lines))
+        return
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        out.writelines(lines)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
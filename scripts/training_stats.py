@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Length statistics for the training corpus: how well outputs hit length_target.
+
+Streams the corpus once across --workers processes and reports, per length
+tier, length percentiles, the share of samples within 25% of the target and
+histograms; per score combo and tier, percentiles; and per tier the worst
+outliers. See persona_api/services/training_stats.py.
+
+Stats are saved to --state (default: <input dir>/training_stats.npz) with
+watermarks of what was read, so a rerun only reads samples added since
+(new files, or lines appended to existing ones). --rebuild starts over.
+
+Usage:
+    poetry run python scripts/training_stats.py
+    poetry run python scripts/training_stats.py --json stats.json --histograms
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from persona_api.services.training_stats import (
+    DEFAULT_OUTLIERS,
+    LENGTH_BIN,
+    RATIO_BIN,
+    LengthStats,
+    advance_watermarks,
+    collect_unit,
+    plan_units,
+)
+
+DEFAULT_INPUT_DIR = Path(__file__).parent.parent / "training_data"
+STATE_NAME = "training_stats.npz"
+HISTOGRAM_WIDTH = 50
+
+
+def print_histogram(hist, bin_width: float, label: str, unit: str = ""):
+    """Text histogram of the non-empty range of ``hist``."""
+    nonzero = [i for i, count in enumerate(hist) if count]
+    if not nonzero:
+        return
+    peak = max(hist)
+    print(f"  {label}")
+    for i in range(nonzero[0], nonzero[-1] + 1):
+        bar = "#" * round(hist[i] / peak * HISTOGRAM_WIDTH)
+        last = "+" if i == len(hist) - 1 else ""
+        print(f"    {i * bin_width:>7.2f}{last}{unit:<2} {int(hist[i]):>9,} {bar}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Length-vs-target statistics for generated training data.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s                              Update stats with new samples and print the summary
+  %(prog)s --histograms                 Include length and ratio histograms per tier
+  %(prog)s --json stats.json            Also write per-combo percentiles and outliers
+  %(prog)s --rebuild -w 8               Recompute from scratch with 8 processes
+        """,
+    )
+    parser.add_argument(
+        "--input-dir", "-i",
+        type=Path,
+        default=DEFAULT_INPUT_DIR,
+        help="JSONL or shard directory written by generate_training_data.py (default: training_data/)",
+    )
+    parser.add_argument(
+        "--state",
+        type=Path,
+        help=f"Saved stats for incremental updates (default: <input dir>/{STATE_NAME})",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Ignore saved stats and read the whole corpus",
+    )
+    parser.add_argument(
+        "--json",
+        type=Path,
+        help="Write tiers, per-combo percentiles and outliers as JSON",
+    )
+    parser.add_argument(
+        "--histograms",
+        action="store_true",
+        help="Print length and length/target histograms per tier",
+    )
+    parser.add_argument(
+        "--outliers",
+        type=int,
+        help=f"Outliers kept per tier (default: the saved stats' value, else {DEFAULT_OUTLIERS}); "
+        "a value different from the saved stats rebuilds them",
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Reader processes (default: CPU count)",
+    )
+    args = parser.parse_args()
+
+    state_path = args.state or args.input_dir / STATE_NAME
+    stats, watermarks = LengthStats(outliers=args.outliers or DEFAULT_OUTLIERS), {}
+    if state_path.exists() and not args.rebuild:
+        saved, saved_watermarks = LengthStats.load(state_path)
+        if args.outliers is not None and args.outliers != saved.outliers:
+            print(f"Saved stats keep {saved.outliers} outliers per tier, not {args.outliers}; rebuilding")
+        else:
+            stats, watermarks = saved, saved_watermarks
+
+    units, watermarks, rebuild = plan_units(args.input_dir, watermarks)
+    if rebuild and stats.samples:
+        print("Corpus changed under the saved stats; rebuilding")
+        stats = LengthStats(outliers=stats.outliers)
+
+    start = time.time()
+    before = stats.samples
+
+    def merge(unit, result):
+        unit_stats, end = result
+        stats.merge(unit_stats)
+        advance_watermarks(watermarks, unit, end)
+
+    if args.workers <= 1:
+        for unit in units:
+            merge(unit, collect_unit(unit, stats.outliers))
+    elif units:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            chunksize = max(1, len(units) // (args.workers * 4))
+            for unit, result in zip(units, executor.map(collect_unit, units, [stats.outliers] * len(units), chunksize=chunksize)):
+                merge(unit, result)
+
+    stats.save(state_path, watermarks)
+    print(f"Read {stats.samples - before:,} new samples from {len(units)} files/chunks in {time.time() - start:.1f}s ({stats.samples:,} total)")
+    if stats.errors:
+        print(f"Skipped {stats.errors:,} unparseable lines")
+    print()
+
+    print(f"{'Target':>8} {'Count':>10} {'p10':>7} {'p50':>7} {'p90':>7} {'p50/tgt':>8} {'±25%':>6} {'>2x':>6}")
+    for row in stats.tier_summary():
+        def fmt(key, spec):
+            value = row.get(key)
+            return "-" if value is None else format(value, spec)
+
+        target = row["length_target"] or "none"
+        print(
+            f"{target:>8} {row['count']:>10,} {fmt('p10', '.0f'):>7} {fmt('p50', '.0f'):>7} {fmt('p90', '.0f'):>7} "
+            f"{fmt('p50_ratio', '.2f'):>8} {fmt('within_25pct', '.0%'):>6} {fmt('over_2x', '.0%'):>6}"
+        )
+
+    if args.histograms:
+        for target in stats.tiers():
+            print()
+            print(f"Tier {target or 'none'}:")
+            print_histogram(stats.length_histogram(target).tolist(), LENGTH_BIN, "length_actual (chars)")
+            if target:
+                print_histogram(stats.ratio_histogram(target).tolist(), RATIO_BIN, "length_actual / length_target", "x")
+
+    for target in stats.tiers():
+        worst = stats.outlier_list(target)[:3]
+        if worst:
+            print()
+            print(f"Worst outliers, tier {target or 'none'}:")
+            for outlier in worst:
+                print(f"  {outlier['scores']} seed {outlier['seed']}: {outlier['length_actual']} chars")
+
+    if args.json:
+        report = {
+            "samples": stats.samples,
+            "tiers": stats.tier_summary(),
+            "combos": stats.combo_summary(),
+            "outliers": {str(target or "none"): stats.outlier_list(target) for target in stats.tiers()},
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print()
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
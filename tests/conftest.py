@@ -0,0 +1,137 @@
+"""Shared fixtures, including a local stand-in for Ollama's /api/generate endpoint."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class OllamaStub:
+    """Serves /api/generate on 127.0.0.1 with HTTP/1.1 keep-alive.
+
+    Records requests, TCP connections and the peak number of requests in
+    flight, can be told to answer the next ``fail_next`` requests with
+    ``fail_status`` (503 by default),
+    and waits ``delay`` seconds before each response. Requests with
+    ``"stream": true`` get the response word by word as chunked NDJSON.
+    """
+
+    def __init__(self, response: str = "A stub profile.", delay: float = 0.0):
+        self.response = response
+        self.delay = delay
+        self.fail_next = 0
+        self.fail_status = 503
+        self.requests: list[dict] = []
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send(200, {"models": [{"name": "llama3.2"}]})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+
+                with stub._lock:
+                    stub.requests.append(payload)
+                    failing = stub.fail_next > 0
+                    if failing:
+                        stub.fail_next -= 1
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+
+                time.sleep(stub.delay)
+                with stub._lock:
+                    stub.in_flight -= 1
+
+                if failing:
+                    self._send(stub.fail_status, {"error": "overloaded" if stub.fail_status >= 500 else "model not found"})
+                elif self.path != "/api/generate":
+                    self._send(404, {"error": "not found"})
+                elif payload.get("stream"):
+                    self._stream(payload)
+                else:
+                    self._send(200, {"model": payload.get("model"), "response": stub.response, "done": True})
+
+            def _send(self, status: int, body: dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, payload: dict):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                words = stub.response.split(" ")
+                pieces = [w if i == 0 else " " + w for i, w in enumerate(words)]
+                for piece in pieces:
+                    self._write_chunk({"model": payload.get("model"), "response": piece, "done": False})
+                self._write_chunk({"model": payload.get("model"), "response": "", "done": True})
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, body: dict):
+                data = json.dumps(body).encode() + b"\n"
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "OllamaStub":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def ollama_stub_factory():
+    """Starts OllamaStub servers on demand and stops them all afterwards."""
+    stubs = []
+
+    def start(**kwargs) -> OllamaStub:
+        stub = OllamaStub(**kwargs).start()
+        stubs.append(stub)
+        return stub
+
+    yield start
+    for stub in stubs:
+        stub.stop()
+
+
+@pytest.fixture
+def ollama_stub(ollama_stub_factory):
+    return ollama_stub_factory()
@@ -0,0 +1,45 @@
+from persona_api.services import BehaviorResolver
+from persona_api.services.behavior_resolver import DOMAINS
+
+
+def scan_matching_scores(coherence_index: dict, score: int, coherence: int) -> list[tuple[int, int, int]]:
+    """Reference implementation: scan coherence.json paths on every call."""
+    matching = []
+    for level in range(1, coherence + 1):
+        for file_path in coherence_index.get(str(level), []):
+            triple = tuple(int(p) for p in file_path.replace(".json", "").split("/"))
+            if round(sum(triple) / 3) == score:
+                matching.append(triple)
+    return matching
+
+
+class TestBehaviorResolver:
+    def test_match_index_equals_scan(self):
+        resolver = BehaviorResolver()
+        for domain in DOMAINS:
+            coherence_index = resolver._source.load_coherence_index(domain)
+            for score in range(1, 6):
+                for coherence in (1, 2, 3):
+                    expected = scan_matching_scores(coherence_index, score, coherence)
+                    assert list(resolver._get_matching_scores(domain, score, coherence)) == expected
+
+    def test_match_index_shared_across_instances(self):
+        first = BehaviorResolver(seed="a")
+        second = BehaviorResolver(seed="b")
+
+        assert first._get_match_index("extraversion") is second._get_match_index("extraversion")
+
+    def test_resolve_returns_matching_facet_scores(self):
+        resolver = BehaviorResolver(seed="abc123")
+        for score in range(1, 6):
+            result = resolver.resolve("agreeableness", score, coherence=3)
+            assert result is not None
+            assert round(sum(result["facet_scores"]) / 3) == score
+            assert result["text"]
+            assert result["instructions"]
+
+    def test_invalid_input_returns_none(self):
+        resolver = BehaviorResolver()
+        assert resolver.resolve("unknown", 3) is None
+        assert resolver.resolve("extraversion", 0) is None
+        assert resolver.resolve("extraversion", 6) is None
@@ -0,0 +1,230 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from persona_api.services.host_pool import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_OPEN,
+    AsyncHostPool,
+    HostPool,
+    NoHealthyHostError,
+    create_host_pool,
+    parse_hosts,
+)
+
+PAYLOAD = {"model": "m", "prompt": "p", "stream": False}
+
+
+class FakeTransport:
+    def __init__(self, name, fail=False, delay=0.0):
+        self.name = name
+        self.fail = fail
+        self.delay = delay
+        self.calls = 0
+        self.healthy = True
+
+    def generate(self, payload):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        return {"response": self.name}
+
+    def health(self):
+        return self.healthy
+
+    def close(self):
+        pass
+
+
+class AsyncFakeTransport(FakeTransport):
+    def __init__(self, name, fail=False, delay=0.0):
+        super().__init__(name, fail, delay)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate(self, payload):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError(f"{self.name} down")
+            return {"response": self.name}
+        finally:
+            self.in_flight -= 1
+
+    async def stream(self, payload):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        yield {"response": self.name, "done": True}
+
+    async def health(self):
+        return self.healthy
+
+    async def aclose(self):
+        pass
+
+
+class TestParseHosts:
+    def test_parses_caps_and_defaults(self):
+        assert parse_hosts("http://a:11434=4, b ,c=2", default_concurrency=3) == [("http://a:11434", 4), ("b", 3), ("c", 2)]
+
+    def test_rejects_bad_cap(self):
+        with pytest.raises(ValueError, match="concurrency"):
+            parse_hosts("a=x")
+
+    def test_rejects_empty(self):
+        with pytest.raises(ValueError):
+            parse_hosts(" , ")
+
+
+class TestHostPool:
+    def test_routes_to_least_outstanding(self):
+        a, b = FakeTransport("a", delay=0.1), FakeTransport("b", delay=0.1)
+        pool = HostPool([("a", a, 2), ("b", b, 2)])
+
+        threads = [threading.Thread(target=pool.generate, args=(PAYLOAD,)) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert a.calls == 2
+        assert b.calls == 2
+
+    def test_per_host_cap_is_respected(self):
+        a = FakeTransport("a", delay=0.05)
+        pool = HostPool([("a", a, 2)])
+        peak = [0]
+
+        def watch():
+            for _ in range(20):
+                peak[0] = max(peak[0], pool.stats()["a"]["outstanding"])
+                time.sleep(0.01)
+
+        watcher = threading.Thread(target=watch)
+        workers = [threading.Thread(target=pool.generate, args=(PAYLOAD,)) for _ in range(6)]
+        watcher.start()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        watcher.join()
+
+        assert a.calls == 6
+        assert peak[0] == 2
+
+    def test_fails_over_to_healthy_host(self):
+        bad, good = FakeTransport("bad", fail=True), FakeTransport("good")
+        pool = HostPool([("bad", bad, 1), ("good", good, 1)])
+
+        results = [pool.generate(PAYLOAD)["response"] for _ in range(4)]
+
+        assert results == ["good"] * 4
+        assert pool.stats()["bad"]["failures"] >= 1
+
+    def test_circuit_opens_and_recovers(self, monkeypatch):
+        import persona_api.services.host_pool as host_pool
+
+        now = [100.0]
+        monkeypatch.setattr(host_pool.time, "monotonic", lambda: now[0])
+        bad, good = FakeTransport("bad", fail=True), FakeTransport("good")
+        pool = HostPool([("bad", bad, 4), ("good", good, 4)], failure_threshold=2, cooldown=10)
+
+        for _ in range(6):
+            pool.generate(PAYLOAD)
+        assert pool.stats()["bad"]["circuit"] == CIRCUIT_OPEN
+        calls_when_opened = bad.calls
+        for _ in range(5):
+            pool.generate(PAYLOAD)
+        assert bad.calls == calls_when_opened
+
+        # After the cooldown one trial request closes the circuit again
+        now[0] += 11
+        bad.fail = False
+        for _ in range(4):
+            pool.generate(PAYLOAD)
+        assert bad.calls > calls_when_opened
+        assert pool.stats()["bad"]["circuit"] == CIRCUIT_CLOSED
+
+    def test_all_hosts_failing_raises(self):
+        pool = HostPool([("a", FakeTransport("a", fail=True), 1), ("b", FakeTransport("b", fail=True), 1)])
+
+        with pytest.raises(NoHealthyHostError, match="All Ollama hosts failed"):
+            pool.generate(PAYLOAD)
+
+    def test_health_check_updates_circuits(self):
+        a, b = FakeTransport("a"), FakeTransport("b")
+        pool = HostPool([("a", a, 1), ("b", b, 1)])
+        a.healthy = False
+
+        assert pool.check_health() == {"a": False, "b": True}
+        assert pool.stats()["a"]["circuit"] == CIRCUIT_OPEN
+        assert pool.generate(PAYLOAD)["response"] == "b"
+
+        a.healthy = True
+        pool.check_health()
+        assert pool.stats()["a"]["circuit"] == CIRCUIT_CLOSED
+
+    def test_http_hosts_share_load(self, ollama_stub_factory):
+        stubs = [ollama_stub_factory() for _ in range(2)]
+        pool = create_host_pool(",".join(f"{stub.base_url}=2" for stub in stubs))
+        for _ in range(6):
+            pool.generate(PAYLOAD)
+        assert [len(stub.requests) for stub in stubs] == [3, 3]
+        assert pool.check_health() == {stub.base_url: True for stub in stubs}
+        pool.close()
+
+
+class TestAsyncHostPool:
+    def test_spreads_load_within_caps(self):
+        a, b = AsyncFakeTransport("a", delay=0.02), AsyncFakeTransport("b", delay=0.02)
+        pool = AsyncHostPool([("a", a, 2), ("b", b, 3)])
+
+        async def run():
+            return await asyncio.gather(*(pool.generate(PAYLOAD) for _ in range(20)))
+
+        results = asyncio.run(run())
+
+        assert len(results) == 20
+        assert a.calls + b.calls == 20
+        assert a.max_in_flight == 2
+        assert b.max_in_flight == 3
+
+    def test_fails_over(self):
+        pool = AsyncHostPool([("bad", AsyncFakeTransport("bad", fail=True), 1), ("good", AsyncFakeTransport("good"), 1)])
+
+        async def run():
+            return [await pool.generate(PAYLOAD) for _ in range(3)]
+
+        assert [r["response"] for r in asyncio.run(run())] == ["good"] * 3
+
+    def test_stream_fails_over_before_first_chunk(self):
+        pool = AsyncHostPool([("bad", AsyncFakeTransport("bad", fail=True), 1), ("good", AsyncFakeTransport("good"), 1)])
+
+        async def run():
+            return [chunk async for chunk in pool.stream(PAYLOAD)]
+
+        assert asyncio.run(run()) == [{"response": "good", "done": True}]
+        assert pool.stats()["bad"]["outstanding"] == 0
+        assert pool.stats()["good"]["outstanding"] == 0
+
+    def test_cancelled_request_releases_slot(self):
+        slow = AsyncFakeTransport("slow", delay=1.0)
+        pool = AsyncHostPool([("slow", slow, 1)])
+
+        async def run():
+            with pytest.raises(TimeoutError):
+                async with asyncio.timeout(0.05):
+                    await pool.generate(PAYLOAD)
+
+        asyncio.run(run())
+
+        stats = pool.stats()["slow"]
+        assert stats["outstanding"] == 0
+        assert stats["failures"] == 0
@@ -0,0 +1,54 @@
+import pytest
+
+from persona_api.services.near_duplicates import MinHasher, NearDuplicateIndex, signature_similarity
+
+BASE = "You MUST adopt a warm, curious persona, asking open questions and responding with enthusiasm to new ideas."
+NEAR = "You MUST adopt a warm, curious persona, asking open questions and responding with real enthusiasm to new ideas."
+OTHER = "Respond tersely. Avoid small talk, never speculate, and keep every answer to a single factual sentence."
+
+
+class TestMinHasher:
+    def test_signature_is_deterministic(self):
+        assert (MinHasher().signature(BASE) == MinHasher().signature(BASE)).all()
+
+    def test_normalizes_case_and_whitespace(self):
+        hasher = MinHasher()
+        assert signature_similarity(hasher.signature(BASE), hasher.signature("  " + BASE.upper().replace(" ", "   "))) == 1.0
+
+    def test_similarity_tracks_jaccard(self):
+        hasher = MinHasher(num_perm=256)
+        a, b = hasher.shingles(BASE), hasher.shingles(NEAR)
+        jaccard = len(a & b) / len(a | b)
+
+        estimate = signature_similarity(hasher.signature(BASE), hasher.signature(NEAR))
+
+        assert abs(estimate - jaccard) < 0.1
+        assert signature_similarity(hasher.signature(BASE), hasher.signature(OTHER)) < 0.2
+
+    def test_short_text(self):
+        assert MinHasher().signature("hi").shape == (64,)
+
+
+class TestNearDuplicateIndex:
+    def test_keeps_first_and_reports_match(self):
+        hasher = MinHasher()
+        index = NearDuplicateIndex(threshold=0.7)
+
+        assert index.add("base", hasher.signature(BASE)) is None
+        assert index.add("other", hasher.signature(OTHER)) is None
+        match = index.add("near", hasher.signature(NEAR))
+
+        assert match is not None and match[0] == "base"
+        assert match[1] >= 0.7
+        assert len(index) == 2
+
+    def test_threshold_excludes_weaker_matches(self):
+        hasher = MinHasher()
+        index = NearDuplicateIndex(threshold=1.0)
+        index.add("base", hasher.signature(BASE))
+
+        assert index.add("near", hasher.signature(NEAR)) is None
+
+    def test_bands_must_divide_num_perm(self):
+        with pytest.raises(ValueError, match="multiple of bands"):
+            NearDuplicateIndex(num_perm=64, bands=10)
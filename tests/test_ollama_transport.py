@@ -0,0 +1,368 @@
+import asyncio
+import socket
+
+import pytest
+
+from persona_api.services import ProfileGenerator
+from persona_api.services.ollama_transport import (
+    AsyncFallbackTransport,
+    AsyncHttpTransport,
+    FallbackTransport,
+    HttpTransport,
+    OllamaUnreachableError,
+    create_transport,
+)
+
+
+def unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class RecordingTransport:
+    def __init__(self):
+        self.payloads = []
+
+    def generate(self, payload):
+        self.payloads.append(payload)
+        return {"response": "  fallback profile  "}
+
+    def close(self):
+        pass
+
+
+class TestHttpTransport:
+    def test_generate_returns_parsed_response(self, ollama_stub):
+        transport = HttpTransport(ollama_stub.base_url)
+        result = transport.generate({"model": "llama3.2", "prompt": "hi", "stream": False})
+
+        assert result["response"] == "A stub profile."
+        assert ollama_stub.requests == [{"model": "llama3.2", "prompt": "hi", "stream": False}]
+        transport.close()
+
+    def test_connection_is_reused(self, ollama_stub):
+        transport = HttpTransport(ollama_stub.base_url)
+        for _ in range(5):
+            transport.generate({"model": "m", "prompt": "p", "stream": False})
+
+        assert len(ollama_stub.requests) == 5
+        assert ollama_stub.connections == 1
+        transport.close()
+
+    def test_retries_on_503(self, ollama_stub):
+        ollama_stub.fail_next = 2
+        transport = HttpTransport(ollama_stub.base_url, retries=3, backoff=0)
+
+        result = transport.generate({"model": "m", "prompt": "p", "stream": False})
+
+        assert result["response"] == "A stub profile."
+        assert len(ollama_stub.requests) == 3
+        transport.close()
+
+    def test_read_timeout_is_not_retried(self, ollama_stub):
+        ollama_stub.delay = 0.5
+        transport = HttpTransport(ollama_stub.base_url, read_timeout=0.1, retries=3, backoff=0)
+
+        with pytest.raises(RuntimeError):
+            transport.generate({"model": "llama3.2", "prompt": "hi", "stream": False})
+        assert len(ollama_stub.requests) == 1
+
+    def test_exhausted_retries_raise_runtime_error(self, ollama_stub):
+        ollama_stub.fail_next = 10
+        transport = HttpTransport(ollama_stub.base_url, retries=1, backoff=0)
+
+        with pytest.raises(RuntimeError, match="HTTP/Ollama error"):
+            transport.generate({"model": "m", "prompt": "p", "stream": False})
+        transport.close()
+
+    def test_connection_refused_raises_runtime_error(self):
+        transport = HttpTransport(f"http://127.0.0.1:{unused_port()}", retries=0)
+
+        with pytest.raises(RuntimeError, match="HTTP/Ollama error"):
+            transport.generate({"model": "m", "prompt": "p", "stream": False})
+        transport.close()
+
+
+class TestFallbackTransport:
+    def test_falls_back_when_primary_unreachable(self):
+        fallback = RecordingTransport()
+        transport = FallbackTransport(HttpTransport(f"http://127.0.0.1:{unused_port()}", retries=0), fallback)
+
+        result = transport.generate({"model": "m", "prompt": "p", "stream": False})
+
+        assert result["response"] == "  fallback profile  "
+        assert len(fallback.payloads) == 1
+
+    def test_unreachable_primary_raises_unreachable_error(self):
+        transport = HttpTransport(f"http://127.0.0.1:{unused_port()}", retries=0)
+
+        with pytest.raises(OllamaUnreachableError):
+            transport.generate({"model": "m", "prompt": "p", "stream": False})
+
+    def test_read_timeout_does_not_fall_back(self, ollama_stub):
+        ollama_stub.delay = 0.5
+        fallback = RecordingTransport()
+        transport = FallbackTransport(HttpTransport(ollama_stub.base_url, read_timeout=0.1, retries=0), fallback)
+
+        with pytest.raises(RuntimeError, match="HTTP/Ollama error"):
+            transport.generate({"model": "m", "prompt": "p", "stream": False})
+        assert len(ollama_stub.requests) == 1
+        assert fallback.payloads == []
+
+    @pytest.mark.parametrize("status", [404, 503])
+    def test_error_response_does_not_fall_back(self, ollama_stub_factory, status):
+        stub = ollama_stub_factory()
+        stub.fail_next, stub.fail_status = 10, status
+        fallback = RecordingTransport()
+        transport = FallbackTransport(HttpTransport(stub.base_url, retries=1, backoff=0), fallback)
+
+        with pytest.raises(RuntimeError, match=str(status)):
+            transport.generate({"model": "m", "prompt": "p", "stream": False})
+        assert fallback.payloads == []
+
+    def test_async_read_timeout_and_error_response_do_not_fall_back(self, ollama_stub_factory):
+        slow = ollama_stub_factory(delay=0.5)
+        missing = ollama_stub_factory()
+        missing.fail_next, missing.fail_status = 10, 404
+
+        class AsyncRecording:
+            calls = 0
+
+            async def generate(self, payload):
+                AsyncRecording.calls += 1
+                return {"response": "fallback"}
+
+            async def stream(self, payload):
+                AsyncRecording.calls += 1
+                yield {"response": "fallback", "done": True}
+
+            async def aclose(self):
+                pass
+
+        async def attempt(stub, stream):
+            transport = AsyncFallbackTransport(AsyncHttpTransport(stub.base_url, read_timeout=0.1, retries=0), AsyncRecording())
+            try:
+                if stream:
+                    return [c async for c in transport.stream({"model": "m", "prompt": "p"})]
+                return await transport.generate({"model": "m", "prompt": "p", "stream": False})
+            finally:
+                await transport.aclose()
+
+        for stub in (slow, missing):
+            for stream in (False, True):
+                with pytest.raises(RuntimeError, match="HTTP/Ollama error"):
+                    asyncio.run(attempt(stub, stream))
+        assert AsyncRecording.calls == 0
+
+    def test_primary_used_when_healthy(self, ollama_stub):
+        fallback = RecordingTransport()
+        transport = FallbackTransport(HttpTransport(ollama_stub.base_url), fallback)
+
+        transport.generate({"model": "m", "prompt": "p", "stream": False})
+
+        assert fallback.payloads == []
+
+    def test_create_transport_without_base_url_is_ssh(self):
+        transport = create_transport("sparx")
+        assert type(transport).__name__ == "SshTransport"
+        assert transport.host == "sparx"
+
+
+class TestProfileGeneratorTransport:
+    TRAITS = [{"trait": "Speaks warmly.", "domain": "agreeableness"}]
+
+    def test_generate_profile_over_http(self, ollama_stub):
+        gen = ProfileGenerator(seed="t", transport=HttpTransport(ollama_stub.base_url))
+        profile = gen.generate_profile(self.TRAITS, model="llama3.2", length=200)
+
+        assert profile == "A stub profile."
+        payload = ollama_stub.requests[0]
+        assert payload["model"] == "llama3.2"
+        assert payload["stream"] is False
+        assert payload["prompt"] == gen.generate_prompt(self.TRAITS, length=200)
+
+    def test_generate_profile_strips_response(self):
+        transport = RecordingTransport()
+        profile = ProfileGenerator(seed="t", transport=transport).generate_profile(self.TRAITS)
+
+        assert profile == "fallback profile"
+        assert transport.payloads[0]["model"] == "llama3.2"
+
+
+class TestAsyncProfileGenerator:
+    TRAITS = [{"trait": "Speaks warmly.", "domain": "agreeableness"}]
+
+    def test_agenerate_profile(self, ollama_stub):
+        async def run():
+            transport = AsyncHttpTransport(ollama_stub.base_url)
+            try:
+                gen = ProfileGenerator(seed="t", async_transport=transport)
+                return await gen.agenerate_profile(self.TRAITS, length=200)
+            finally:
+                await transport.aclose()
+
+        assert asyncio.run(run()) == "A stub profile."
+        assert ollama_stub.requests[0]["prompt"] == ProfileGenerator().generate_prompt(self.TRAITS, length=200)
+
+    def test_agenerate_many_bounds_concurrency(self, ollama_stub):
+        ollama_stub.delay = 0.05
+        trait_sets = [[{"trait": f"Trait {i}.", "domain": "extraversion"}] for i in range(12)]
+
+        async def run():
+            transport = AsyncHttpTransport(ollama_stub.base_url, pool_size=10)
+            try:
+                gen = ProfileGenerator(async_transport=transport)
+                return await gen.agenerate_many(trait_sets, concurrency=4)
+            finally:
+                await transport.aclose()
+
+        profiles = asyncio.run(run())
+
+        assert profiles == ["A stub profile."] * 12
+        assert len(ollama_stub.requests) == 12
+        assert 1 < ollama_stub.max_in_flight <= 4
+
+    def test_agenerate_many_keeps_input_order(self):
+        class EchoTransport:
+            async def generate(self, payload):
+                trait = payload["prompt"].split("- Trait", 1)[1].split("\n", 1)[0]
+                trait = "Trait" + trait
+                await asyncio.sleep(0.01 if trait.endswith("0.") else 0)
+                return {"response": trait}
+
+        trait_sets = [[{"trait": f"Trait {i}.", "domain": "extraversion"}] for i in range(5)]
+        gen = ProfileGenerator(async_transport=EchoTransport())
+
+        profiles = asyncio.run(gen.agenerate_many(trait_sets))
+
+        assert profiles == [f"Trait {i}." for i in range(5)]
+
+    def test_timeout(self, ollama_stub):
+        ollama_stub.delay = 1.0
+
+        async def run():
+            transport = AsyncHttpTransport(ollama_stub.base_url)
+            try:
+                gen = ProfileGenerator(async_transport=transport)
+                return await gen.agenerate_many([self.TRAITS, self.TRAITS], timeout=0.1, return_exceptions=True)
+            finally:
+                await transport.aclose()
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(r, TimeoutError) for r in results)
+
+    def test_async_http_retries_on_503(self, ollama_stub):
+        ollama_stub.fail_next = 2
+
+        async def run():
+            transport = AsyncHttpTransport(ollama_stub.base_url, retries=3, backoff=0)
+            try:
+                return await transport.generate({"model": "m", "prompt": "p", "stream": False})
+            finally:
+                await transport.aclose()
+
+        assert asyncio.run(run())["response"] == "A stub profile."
+        assert len(ollama_stub.requests) == 3
+
+    def test_async_fallback_when_primary_unreachable(self):
+        class AsyncRecording:
+            async def generate(self, payload):
+                return {"response": "fallback"}
+
+            async def aclose(self):
+                pass
+
+        async def run():
+            transport = AsyncFallbackTransport(AsyncHttpTransport(f"http://127.0.0.1:{unused_port()}", retries=0), AsyncRecording())
+            try:
+                return await ProfileGenerator(async_transport=transport).agenerate_profile(self.TRAITS)
+            finally:
+                await transport.aclose()
+
+        assert asyncio.run(run()) == "fallback"
+
+    def test_invalid_concurrency(self):
+        gen = ProfileGenerator(async_transport=object())
+        with pytest.raises(ValueError, match="concurrency"):
+            asyncio.run(gen.agenerate_many([self.TRAITS], concurrency=0))
+
+
+class TestStreamingProfile:
+    TRAITS = [{"trait": "Speaks warmly.", "domain": "agreeableness"}]
+
+    def test_async_http_stream_yields_chunks(self, ollama_stub):
+        async def run():
+            transport = AsyncHttpTransport(ollama_stub.base_url)
+            try:
+                return [chunk async for chunk in transport.stream({"model": "m", "prompt": "p", "stream": False})]
+            finally:
+                await transport.aclose()
+
+        chunks = asyncio.run(run())
+
+        assert ollama_stub.requests[0]["stream"] is True
+        assert [c["response"] for c in chunks] == ["A", " stub", " profile.", ""]
+        assert chunks[-1]["done"] is True
+
+    def test_astream_profile_matches_generate_profile(self, ollama_stub):
+        async def run():
+            transport = AsyncHttpTransport(ollama_stub.base_url)
+            try:
+                gen = ProfileGenerator(seed="t", async_transport=transport)
+                return [text async for text in gen.astream_profile(self.TRAITS, length=200)]
+            finally:
+                await transport.aclose()
+
+        pieces = asyncio.run(run())
+
+        assert pieces == ["A", " stub", " profile."]
+        assert "".join(pieces).strip() == ProfileGenerator(transport=HttpTransport(ollama_stub.base_url)).generate_profile(self.TRAITS)
+
+    def test_stream_error_chunk_raises(self):
+        class ErrorTransport:
+            async def stream(self, payload):
+                yield {"response": "A", "done": False}
+                raise RuntimeError("Ollama error: model not found")
+
+        async def run():
+            gen = ProfileGenerator(async_transport=ErrorTransport())
+            return [text async for text in gen.astream_profile(self.TRAITS)]
+
+        with pytest.raises(RuntimeError, match="model not found"):
+            asyncio.run(run())
+
+    def test_stream_idle_timeout(self):
+        class SlowTransport:
+            async def stream(self, payload):
+                yield {"response": "A", "done": False}
+                await asyncio.sleep(1)
+                yield {"response": "B", "done": True}
+
+        async def run():
+            gen = ProfileGenerator(async_transport=SlowTransport())
+            pieces = []
+            with pytest.raises(TimeoutError):
+                async for text in gen.astream_profile(self.TRAITS, timeout=0.05):
+                    pieces.append(text)
+            return pieces
+
+        assert asyncio.run(run()) == ["A"]
+
+    def test_fallback_stream_when_primary_unreachable(self):
+        class AsyncRecording:
+            async def stream(self, payload):
+                yield {"response": "fallback", "done": True}
+
+            async def aclose(self):
+                pass
+
+        async def run():
+            transport = AsyncFallbackTransport(AsyncHttpTransport(f"http://127.0.0.1:{unused_port()}", retries=0), AsyncRecording())
+            try:
+                return [c async for c in transport.stream({"model": "m", "prompt": "p"})]
+            finally:
+                await transport.aclose()
+
+        assert asyncio.run(run()) == [{"response": "fallback", "done": True}]
@@ -0,0 +1,203 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from persona_api import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+class TestRandomPersonality:
+    def test_returns_scores_traits_and_prompt(self, client):
+        response = client.get("/personality/random", params={"seed": "abc123"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["seed"] == "abc123"
+        assert set(body["scores"]) == {"openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"}
+        assert 1 <= len(body["traits"]) <= 5
+        for trait in body["traits"]:
+            assert trait["trait"] in body["prompt"]
+
+    def test_seed_is_reproducible(self, client):
+        first = client.get("/personality/random", params={"seed": "repeat", "coherence": 2}).json()
+        second = client.get("/personality/random", params={"seed": "repeat", "coherence": 2}).json()
+
+        assert first == second
+
+    def test_matches_generator_scores(self, client):
+        from persona_api.services import RandomFacetGenerator
+
+        body = client.get("/personality/random", params={"seed": "match", "coherence": 1}).json()
+        expected = RandomFacetGenerator(seed="match").generate(coherence=1)
+
+        assert body["scores"]["neuroticism"]["score"] == expected.negative_emotionality.score
+        assert body["scores"]["openness"]["facets"]["creative_imagination"] == expected.open_mindedness.facets.creative_imagination
+
+    def test_invalid_coherence_rejected(self, client):
+        response = client.get("/personality/random", params={"coherence": 4})
+        assert response.status_code == 422
+
+    def test_pipeline_loaded_at_startup(self, client):
+        assert client.app.state.pipeline is not None
+
+
+class TestPersonalityBatch:
+    def test_returns_requested_count(self, client):
+        response = client.post("/personality/batch", json={"count": 25, "seed": "batch"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["seed"] == "batch"
+        assert body["count"] == 25
+        assert len(body["personas"]) == 25
+        assert body["personas"][3]["seed"] == "batch:3"
+
+    def test_same_seed_same_batch(self, client):
+        request = {"count": 10, "seed": "same", "coherence": 1}
+        first = client.post("/personality/batch", json=request).json()
+        second = client.post("/personality/batch", json=request).json()
+
+        assert first == second
+
+    def test_persona_seed_reproduces_persona(self, client):
+        body = client.post("/personality/batch", json={"count": 3, "seed": "abc", "coherence": 2}).json()
+
+        for persona in body["personas"]:
+            single = client.get("/personality/random", params={"seed": persona["seed"], "coherence": 2}).json()
+            assert single == persona
+
+    def test_domain_score_constraints(self, client):
+        request = {"count": 20, "seed": "pinned", "domain_scores": {"neuroticism": 5, "openness": 1}}
+        body = client.post("/personality/batch", json=request).json()
+
+        for persona in body["personas"]:
+            assert persona["scores"]["neuroticism"] == {
+                "score": 5,
+                "facets": {"anxiety": 5, "depression": 5, "emotional_volatility": 5},
+            }
+            assert persona["scores"]["openness"]["score"] == 1
+        assert len({p["scores"]["extraversion"]["score"] for p in body["personas"]}) > 1
+
+    def test_max_batch_size_enforced(self, client):
+        original = client.app.state.max_batch_size
+        client.app.state.max_batch_size = 5
+        try:
+            response = client.post("/personality/batch", json={"count": 6})
+        finally:
+            client.app.state.max_batch_size = original
+
+        assert response.status_code == 422
+
+    def test_invalid_constraint_rejected(self, client):
+        response = client.post("/personality/batch", json={"count": 1, "domain_scores": {"neuroticism": 6}})
+        assert response.status_code == 422
+
+
+class TestPersonalityBatchStream:
+    def test_streams_one_persona_per_line(self, client):
+        with client.stream("POST", "/personality/batch/stream", json={"count": 12, "seed": "nd"}) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            assert response.headers["x-persona-seed"] == "nd"
+            lines = [line for line in response.iter_lines() if line]
+
+        personas = [json.loads(line) for line in lines]
+        assert len(personas) == 12
+        assert [p["seed"] for p in personas] == [f"nd:{i}" for i in range(12)]
+
+    def test_matches_batch_endpoint(self, client):
+        request = {"count": 600, "seed": "same", "coherence": 2, "domain_scores": {"extraversion": 4}}
+        batch = client.post("/personality/batch", json=request).json()
+        streamed = [json.loads(line) for line in client.post("/personality/batch/stream", json=request).text.splitlines()]
+
+        assert streamed == batch["personas"]
+
+    def test_max_stream_size_enforced(self, client):
+        original = client.app.state.max_stream_size
+        client.app.state.max_stream_size = 3
+        try:
+            response = client.post("/personality/batch/stream", json={"count": 4})
+        finally:
+            client.app.state.max_stream_size = original
+
+        assert response.status_code == 422
+
+
+class FakeStreamTransport:
+    def __init__(self, pieces, error=None):
+        self.pieces = pieces
+        self.error = error
+        self.payloads = []
+
+    async def stream(self, payload):
+        self.payloads.append(payload)
+        for piece in self.pieces:
+            yield {"response": piece, "done": False}
+        if self.error:
+            raise RuntimeError(self.error)
+        yield {"response": "", "done": True}
+
+    async def aclose(self):
+        pass
+
+
+def parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def stream_transport(client):
+    original = client.app.state.ollama
+    transport = FakeStreamTransport(["You MUST", " be warm", ". "])
+    client.app.state.ollama = transport
+    client.app.state.profile_cache.clear()
+    yield transport
+    client.app.state.ollama = original
+
+
+class TestRandomProfileStream:
+    def test_streams_persona_tokens_and_done(self, client, stream_transport):
+        response = client.get("/personality/random/stream", params={"seed": "sse", "length": 300})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["x-persona-seed"] == "sse"
+
+        events = parse_sse(response.text)
+        assert events[0][0] == "persona"
+        assert events[0][1] == client.get("/personality/random", params={"seed": "sse", "length": 300}).json()
+        assert [data["text"] for event, data in events if event == "token"] == ["You MUST", " be warm", ". "]
+        assert events[-1] == ("done", {"profile": "You MUST be warm."})
+
+        assert stream_transport.payloads[0]["prompt"] == events[0][1]["prompt"]
+        assert stream_transport.payloads[0]["stream"] is True
+
+    def test_llm_failure_sends_error_event(self, client, stream_transport):
+        stream_transport.error = "Ollama error: model not found"
+
+        events = parse_sse(client.get("/personality/random/stream", params={"seed": "sse"}).text)
+
+        assert events[-1] == ("error", {"detail": "Ollama error: model not found"})
+        assert all(event != "done" for event, _ in events)
+
+    def test_repeat_request_served_from_cache(self, client, stream_transport):
+        client.get("/personality/random/stream", params={"seed": "cached"})
+        events = parse_sse(client.get("/personality/random/stream", params={"seed": "cached"}).text)
+
+        assert len(stream_transport.payloads) == 1
+        assert [data for event, data in events if event == "token"] == [{"text": "You MUST be warm."}]
+        assert events[-1] == ("done", {"profile": "You MUST be warm."})
+
+    def test_ollama_model_is_forwarded(self, client, stream_transport):
+        client.get("/personality/random/stream", params={"ollama_model": "qwen2.5:7b"})
+        assert stream_transport.payloads[0]["model"] == "qwen2.5:7b"
@@ -0,0 +1,186 @@
+import asyncio
+import threading
+
+from persona_api.services import ProfileCache, ProfileGenerator
+from persona_api.services.profile_cache import profile_cache_key
+
+
+class CountingTransport:
+    def __init__(self, response="A cached profile."):
+        self.response = response
+        self.calls = 0
+
+    def generate(self, payload):
+        self.calls += 1
+        return {"response": self.response}
+
+    async def stream(self, payload):
+        self.calls += 1
+        for word in self.response.split(" "):
+            yield {"response": word + " ", "done": False}
+        yield {"response": "", "done": True}
+
+
+TRAITS = [{"trait": "Speaks warmly.", "domain": "agreeableness"}]
+
+
+class TestProfileCacheKey:
+    def test_ignores_stream_flag(self):
+        payload = {"model": "llama3.2", "prompt": "p", "stream": False}
+        assert profile_cache_key(payload) == profile_cache_key({**payload, "stream": True})
+
+    def test_depends_on_model_prompt_and_options(self):
+        base = {"model": "llama3.2", "prompt": "p"}
+        keys = {
+            profile_cache_key(base),
+            profile_cache_key({**base, "model": "qwen2.5:7b"}),
+            profile_cache_key({**base, "prompt": "q"}),
+            profile_cache_key({**base, "options": {"temperature": 0.2}}),
+        }
+        assert len(keys) == 4
+
+
+class TestProfileCache:
+    def test_memory_lru_eviction(self):
+        cache = ProfileCache(max_entries=2)
+        cache.set("a", "A")
+        cache.set("b", "B")
+        cache.get("a")
+        cache.set("c", "C")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "A"
+        assert cache.get("c") == "C"
+
+    def test_disk_tier_survives_new_instance(self, tmp_path):
+        path = tmp_path / "profiles.db"
+        first = ProfileCache(path=path)
+        first.set("k", "profile text")
+        first.close()
+
+        second = ProfileCache(path=path)
+        assert second.get("k") == "profile text"
+        assert second.get("k") == "profile text"
+        stats = second.stats()
+        assert stats["disk_hits"] == 1
+        assert stats["memory_hits"] == 1
+        assert stats["disk_entries"] == 1
+        second.close()
+
+    def test_async_disk_tier_runs_off_the_event_loop(self, tmp_path, monkeypatch):
+        path = tmp_path / "profiles.db"
+        cache = ProfileCache(max_entries=0, path=path)
+        threads = []
+
+        def record_thread(method):
+            def wrapper(*args):
+                threads.append(threading.get_ident())
+                return method(*args)
+            return wrapper
+
+        monkeypatch.setattr(cache, "_get_disk", record_thread(cache._get_disk))
+        monkeypatch.setattr(cache, "_set_disk", record_thread(cache._set_disk))
+
+        async def run():
+            await cache.aset("k", "profile text")
+            return await cache.aget("k"), await cache.aget("missing")
+
+        assert asyncio.run(run()) == ("profile text", None)
+        assert len(threads) == 3
+        assert threading.get_ident() not in threads
+        assert cache.stats()["disk_hits"] == 1
+        assert cache.stats()["misses"] == 1
+        cache.close()
+
+    def test_ttl_expires_entries(self, tmp_path, monkeypatch):
+        import persona_api.services.profile_cache as profile_cache
+
+        now = [1000.0]
+        monkeypatch.setattr(profile_cache.time, "time", lambda: now[0])
+        cache = ProfileCache(path=tmp_path / "profiles.db", ttl=60)
+        cache.set("k", "profile text")
+
+        now[0] += 30
+        assert cache.get("k") == "profile text"
+        now[0] += 60
+        assert cache.get("k") is None
+        assert cache.stats()["disk_entries"] == 0
+
+    def test_purge_expired(self, tmp_path, monkeypatch):
+        import persona_api.services.profile_cache as profile_cache
+
+        now = [1000.0]
+        monkeypatch.setattr(profile_cache.time, "time", lambda: now[0])
+        cache = ProfileCache(path=tmp_path / "profiles.db", ttl=60)
+        cache.set("old", "x")
+        now[0] += 120
+        cache.set("new", "y")
+
+        assert cache.purge_expired() == 1
+        assert cache.stats()["disk_entries"] == 1
+
+
+class TestProfileGeneratorCache:
+    def test_generate_profile_hits_cache(self):
+        transport = CountingTransport()
+        cache = ProfileCache()
+
+        first = ProfileGenerator(seed="a", transport=transport, cache=cache).generate_profile(TRAITS, length=200)
+        second = ProfileGenerator(seed="b", transport=transport, cache=cache).generate_profile(TRAITS, length=200)
+
+        assert first == second == "A cached profile."
+        assert transport.calls == 1
+
+    def test_different_length_misses(self):
+        transport = CountingTransport()
+        cache = ProfileCache()
+        gen = ProfileGenerator(transport=transport, cache=cache)
+
+        gen.generate_profile(TRAITS, length=200)
+        gen.generate_profile(TRAITS, length=300)
+
+        assert transport.calls == 2
+
+    def test_async_and_stream_share_entries(self):
+        transport = CountingTransport()
+        cache = ProfileCache()
+        gen = ProfileGenerator(async_transport=transport, cache=cache)
+
+        async def run():
+            streamed = [text async for text in gen.astream_profile(TRAITS)]
+            generated = await gen.agenerate_profile(TRAITS)
+            restreamed = [text async for text in gen.astream_profile(TRAITS)]
+            return streamed, generated, restreamed
+
+        streamed, generated, restreamed = asyncio.run(run())
+
+        assert "".join(streamed).strip() == generated == "A cached profile."
+        assert restreamed == ["A cached profile."]
+        assert transport.calls == 1
+
+    def test_empty_response_not_cached(self):
+        transport = CountingTransport(response="   ")
+        cache = ProfileCache()
+        gen = ProfileGenerator(transport=transport, cache=cache)
+
+        gen.generate_profile(TRAITS)
+        gen.generate_profile(TRAITS)
+
+        assert transport.calls == 2
+
+    def test_stream_without_done_chunk_not_cached(self):
+        class TruncatedTransport(CountingTransport):
+            async def stream(self, payload):
+                self.calls += 1
+                yield {"response": "Cut ", "done": False}
+
+        transport = TruncatedTransport()
+        cache = ProfileCache()
+        gen = ProfileGenerator(async_transport=transport, cache=cache)
+
+        async def run():
+            return [[text async for text in gen.astream_profile(TRAITS)] for _ in range(2)]
+
+        assert asyncio.run(run()) == [["Cut "], ["Cut "]]
+        assert transport.calls == 2
+        assert cache.stats()["memory_entries"] == 0
@@ -0,0 +1,72 @@
+import json
+
+from persona_api.services.progress_journal import JOURNAL_NAME, ProgressJournal
+
+
+def sample_line(combo_idx: int, tier_idx: int, run_idx: int) -> str:
+    seed = f"{combo_idx}_{tier_idx}_{run_idx}_123456"
+    return json.dumps({"output": "text", "meta": {"seed": seed}}) + "\n"
+
+
+class TestProgressJournal:
+    def test_record_round_trip(self, tmp_path):
+        journal = ProgressJournal(tmp_path / JOURNAL_NAME)
+        journal.record([(0, 0, 0), (3124, 2, 4)])
+        journal.record([(17, 1, 3)])
+        journal.close()
+
+        assert (tmp_path / JOURNAL_NAME).stat().st_size == 3 * ProgressJournal.RECORD.size
+
+        reloaded = ProgressJournal(tmp_path / JOURNAL_NAME)
+        assert reloaded.load() == 3
+        assert reloaded.done == {(0, 0, 0), (3124, 2, 4), (17, 1, 3)}
+        assert reloaded.is_done(3124, 2, 4)
+        assert not reloaded.is_done(3124, 2, 3)
+
+    def test_torn_trailing_record_is_truncated(self, tmp_path):
+        path = tmp_path / JOURNAL_NAME
+        journal = ProgressJournal(path)
+        journal.record([(5, 0, 0), (5, 0, 1)])
+        journal.close()
+        with open(path, "ab") as f:
+            f.write(ProgressJournal.RECORD.pack(5, 0, 2)[:3])
+
+        reloaded = ProgressJournal(path)
+        assert reloaded.load() == 2
+        assert reloaded.done == {(5, 0, 0), (5, 0, 1)}
+        assert path.stat().st_size == 2 * ProgressJournal.RECORD.size
+
+        # Appending after the truncation keeps records aligned
+        reloaded.record([(5, 0, 2)])
+        reloaded.close()
+        assert ProgressJournal(path).load() == 3
+
+    def test_missing_runs_after_partial_combo(self, tmp_path):
+        journal = ProgressJournal(tmp_path / JOURNAL_NAME)
+        journal.record([(7, tier_idx, run_idx) for tier_idx in range(2) for run_idx in range(5)])
+        journal.record([(7, 2, 0), (7, 2, 3)])
+        journal.close()
+
+        reloaded = ProgressJournal(tmp_path / JOURNAL_NAME)
+        reloaded.load()
+        assert reloaded.missing(7, tiers=3, runs=5) == [(2, 1), (2, 2), (2, 4)]
+        assert reloaded.missing(8, tiers=3, runs=5) == [(tier_idx, run_idx) for tier_idx in range(3) for run_idx in range(5)]
+        assert reloaded.missing(7, tiers=2, runs=5) == []
+
+    def test_rebuild_from_output_seeds(self, tmp_path):
+        lines = [sample_line(0, 0, 0), sample_line(0, 2, 4), "not a sample\n", sample_line(0, 2, 4)]
+
+        journal = ProgressJournal(tmp_path / JOURNAL_NAME)
+        assert journal.rebuild(lines) == 2
+        assert journal.missing(0, tiers=3, runs=5)[:2] == [(0, 1), (0, 2)]
+
+        reloaded = ProgressJournal(tmp_path / JOURNAL_NAME)
+        assert reloaded.load() == 2
+        assert reloaded.done == {(0, 0, 0), (0, 2, 4)}
+
+    def test_missing_journal_loads_empty(self, tmp_path):
+        journal = ProgressJournal(tmp_path / JOURNAL_NAME)
+
+        assert not journal.exists()
+        assert journal.load() == 0
+        assert journal.done == set()
@@ -1,4 +1,7 @@
+import pytest
+
 from persona_api.services import RandomFacetGenerator
+from persona_api.services.random_facet_generator import COHERENCE_SETS, derive_item_seed
 
 
 class TestRandomFacetGenerator:
@@ -92,3 +95,167 @@ class TestRandomFacetGenerator:
             result2.open_mindedness.score,
         ]
         assert scores1 != scores2
+
+
+class TestGenerateBatch:
+    def test_batch_shapes(self):
+        batch = RandomFacetGenerator(seed="batch").generate_batch(1000)
+
+        assert len(batch) == 1000
+        assert batch.facets.shape == (1000, 5, 3)
+        assert batch.scores.shape == (1000, 5)
+        assert batch.facets.min() >= 1
+        assert batch.facets.max() <= 5
+
+    def test_scores_are_rounded_facet_average(self):
+        batch = RandomFacetGenerator(seed="batch").generate_batch(1000)
+
+        for facets, scores in zip(batch.facets[:200], batch.scores[:200]):
+            assert [round(sum(int(v) for v in f) / 3) for f in facets] == list(scores)
+
+    def test_seed_produces_reproducible_batches(self):
+        batch1 = RandomFacetGenerator(seed="test123").generate_batch(500)
+        batch2 = RandomFacetGenerator(seed="test123").generate_batch(500)
+        batch3 = RandomFacetGenerator(seed="other").generate_batch(500)
+
+        assert (batch1.facets == batch2.facets).all()
+        assert not (batch1.facets == batch3.facets).all()
+
+    def test_coherence_batches_draw_from_coherence_sets(self):
+        for coherence in (1, 2, 3):
+            allowed = set(COHERENCE_SETS[coherence])
+            batch = RandomFacetGenerator(seed="c").generate_batch(300, coherence=coherence)
+            for row in batch.facets:
+                for triple in row:
+                    assert tuple(int(v) for v in triple) in allowed
+
+    def test_high_n_biases_e_a_c_downward(self):
+        batch = RandomFacetGenerator(seed="bias").generate_batch(5000)
+        n_sum = batch.facets[:, 3].sum(axis=1)
+
+        high_n = batch.facets[n_sum >= 12][:, :3]
+        low_n = batch.facets[n_sum <= 6][:, :3]
+        assert len(high_n) and len(low_n)
+        assert high_n.max() <= 4
+        assert low_n.min() >= 2
+
+    def test_to_result_matches_arrays(self):
+        batch = RandomFacetGenerator(seed="row").generate_batch(3)
+        result = batch.to_result(1)
+
+        assert result.seed == "row"
+        assert result.extraversion.score == batch.scores[1][0]
+        assert result.open_mindedness.facets.creative_imagination == batch.facets[1][4][2]
+
+    def test_invalid_arguments(self):
+        gen = RandomFacetGenerator(seed="x")
+        with pytest.raises(ValueError):
+            gen.generate_batch(-1)
+        with pytest.raises(ValueError):
+            gen.generate_batch(10, coherence=4)
+
+
+class TestIterGenerate:
+    def test_yields_requested_items(self):
+        gen = RandomFacetGenerator(seed="stream")
+        results = list(gen.iter_generate(stop=10))
+
+        assert len(results) == 10
+        assert [r.seed for r in results] == [derive_item_seed("stream", k) for k in range(10)]
+
+    def test_item_can_be_regenerated_independently(self):
+        stream = list(RandomFacetGenerator(seed="stream").iter_generate(stop=20, coherence=2))
+
+        item = RandomFacetGenerator(seed="stream").generate_item(17, coherence=2)
+        assert item == stream[17]
+
+        direct = RandomFacetGenerator(seed=derive_item_seed("stream", 17)).generate(coherence=2)
+        assert direct == stream[17]
+
+    def test_shards_cover_sequential_run(self):
+        gen = RandomFacetGenerator(seed="shard")
+        sequential = list(gen.iter_generate(stop=12))
+
+        shards = [list(gen.iter_generate(start=i, stop=12, step=3)) for i in range(3)]
+        merged = [None] * 12
+        for i, shard in enumerate(shards):
+            merged[i::3] = shard
+
+        assert merged == sequential
+
+    def test_chunks(self):
+        gen = RandomFacetGenerator(seed="chunk")
+        chunks = list(gen.iter_generate(stop=10, chunk_size=4))
+
+        assert [len(c) for c in chunks] == [4, 4, 2]
+        assert [r for c in chunks for r in c] == list(gen.iter_generate(stop=10))
+
+    def test_unbounded_stream_is_lazy(self):
+        stream = RandomFacetGenerator(seed="lazy").iter_generate()
+        first = [next(stream) for _ in range(3)]
+
+        assert first[2].seed == derive_item_seed("lazy", 2)
+
+    def test_invalid_arguments_raise_immediately(self):
+        gen = RandomFacetGenerator(seed="x")
+        with pytest.raises(ValueError):
+            gen.iter_generate(step=0)
+        with pytest.raises(ValueError):
+            gen.iter_generate(chunk_size=0)
+
+
+class TestResultConversion:
+    def test_results_are_slotted(self):
+        result = RandomFacetGenerator(seed="slots").generate()
+
+        assert not hasattr(result, "__dict__")
+        assert not hasattr(result.extraversion, "__dict__")
+        assert not hasattr(result.extraversion.facets, "__dict__")
+
+    def test_to_facet_scores(self):
+        result = RandomFacetGenerator(seed="conv").generate()
+        facet_scores = result.to_facet_scores()
+
+        assert facet_scores["extraversion"] == (
+            result.extraversion.facets.sociability,
+            result.extraversion.facets.assertiveness,
+            result.extraversion.facets.energy_level,
+        )
+        assert facet_scores["open_mindedness"] == (
+            result.open_mindedness.facets.intellectual_curiosity,
+            result.open_mindedness.facets.aesthetic_sensitivity,
+            result.open_mindedness.facets.creative_imagination,
+        )
+
+    def test_to_dict(self):
+        result = RandomFacetGenerator(seed="conv").generate()
+        output = result.to_dict()
+
+        assert list(output) == ["seed", "extraversion", "agreeableness", "conscientiousness", "negative_emotionality", "open_mindedness"]
+        assert output["seed"] == "conv"
+        assert output["agreeableness"] == {
+            "score": result.agreeableness.score,
+            "facets": {
+                "compassion": result.agreeableness.facets.compassion,
+                "respectfulness": result.agreeableness.facets.respectfulness,
+                "trust": result.agreeableness.facets.trust,
+            },
+        }
+
+    def test_fix_domains(self):
+        result = RandomFacetGenerator(seed="pin").generate()
+        result.fix_domains({"negative_emotionality": 5, "open_mindedness": 1})
+
+        assert result.to_facet_scores()["negative_emotionality"] == (5, 5, 5)
+        assert result.negative_emotionality.score == 5
+        assert result.open_mindedness.score == 1
+
+    def test_fix_domains_rejects_bad_pins_without_changes(self):
+        result = RandomFacetGenerator(seed="pin").generate()
+        before = result.to_dict()
+
+        with pytest.raises(ValueError, match="Unknown domain"):
+            result.fix_domains({"extraversion": 1, "charisma": 3})
+        with pytest.raises(ValueError, match="must be 1-5"):
+            result.fix_domains({"extraversion": 6})
+        assert result.to_dict() == before
@@ -0,0 +1,257 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from persona_api.services import ProfileGenerator
+from persona_api.services.single_flight import AsyncCoalescingTransport, CoalescingTransport
+
+PAYLOAD = {"model": "m", "prompt": "p", "stream": False}
+TRAITS = [{"trait": "Speaks warmly.", "domain": "agreeableness"}]
+
+
+class SlowTransport:
+    def __init__(self, delay=0.1, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def generate(self, payload):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("Ollama down")
+        return {"response": f"profile for {payload['prompt'][-20:]}"}
+
+
+class AsyncSlowTransport:
+    def __init__(self, delay=0.05, fail=False, pieces=("You", " MUST", " be", " warm.")):
+        self.delay = delay
+        self.fail = fail
+        self.pieces = pieces
+        self.calls = 0
+        self.streams = 0
+        self.cancelled = 0
+
+    async def generate(self, payload):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise RuntimeError("Ollama down")
+        return {"response": "shared profile"}
+
+    async def stream(self, payload):
+        self.streams += 1
+        for piece in self.pieces:
+            await asyncio.sleep(self.delay)
+            yield {"response": piece, "done": False}
+        if self.fail:
+            raise RuntimeError("Ollama down")
+        yield {"response": "", "done": True}
+
+
+class TestCoalescingTransport:
+    def test_concurrent_identical_payloads_share_one_call(self):
+        inner = SlowTransport()
+        transport = CoalescingTransport(inner)
+        results = []
+
+        def call():
+            results.append(transport.generate(PAYLOAD))
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert inner.calls == 1
+        assert transport.coalesced == 7
+        assert len(results) == 8
+        assert all(r is results[0] for r in results)
+
+    def test_different_payloads_are_not_coalesced(self):
+        inner = SlowTransport(delay=0.05)
+        transport = CoalescingTransport(inner)
+        threads = [threading.Thread(target=transport.generate, args=({**PAYLOAD, "prompt": str(i)},)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert inner.calls == 4
+        assert transport.coalesced == 0
+
+    def test_sequential_calls_are_not_coalesced(self):
+        inner = SlowTransport(delay=0)
+        transport = CoalescingTransport(inner)
+        transport.generate(PAYLOAD)
+        transport.generate(PAYLOAD)
+
+        assert inner.calls == 2
+
+    def test_error_reaches_every_waiter(self):
+        inner = SlowTransport(fail=True)
+        transport = CoalescingTransport(inner)
+        errors = []
+
+        def call():
+            try:
+                transport.generate(PAYLOAD)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert inner.calls == 1
+        assert len(errors) == 4
+
+    def test_profile_generator_through_coalescing(self):
+        inner = SlowTransport()
+        transport = CoalescingTransport(inner)
+        profiles = []
+
+        def call(seed):
+            profiles.append(ProfileGenerator(seed=seed, transport=transport).generate_profile(TRAITS))
+
+        threads = [threading.Thread(target=call, args=(str(i),)) for i in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert inner.calls == 1
+        assert len(set(profiles)) == 1
+
+
+class TestAsyncCoalescingTransport:
+    def test_concurrent_generate_shares_one_call(self):
+        inner = AsyncSlowTransport()
+        transport = AsyncCoalescingTransport(inner)
+
+        async def run():
+            return await ProfileGenerator(async_transport=transport).agenerate_many([TRAITS] * 10)
+
+        assert asyncio.run(run()) == ["shared profile"] * 10
+        assert inner.calls == 1
+        assert transport.coalesced == 9
+
+    def test_one_waiter_cancelled_does_not_cancel_others(self):
+        inner = AsyncSlowTransport(delay=0.1)
+        transport = AsyncCoalescingTransport(inner)
+
+        async def run():
+            first = asyncio.ensure_future(transport.generate(PAYLOAD))
+            second = asyncio.ensure_future(transport.generate(PAYLOAD))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(run()) == {"response": "shared profile"}
+        assert inner.calls == 1
+        assert inner.cancelled == 0
+
+    def test_last_waiter_cancelled_cancels_call(self):
+        inner = AsyncSlowTransport(delay=1.0)
+        transport = AsyncCoalescingTransport(inner)
+
+        async def run():
+            with pytest.raises(TimeoutError):
+                async with asyncio.timeout(0.05):
+                    await transport.generate(PAYLOAD)
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+
+        assert inner.cancelled == 1
+
+    def test_request_after_last_waiter_cancelled_starts_new_call(self):
+        inner = AsyncSlowTransport(delay=0.05)
+        transport = AsyncCoalescingTransport(inner)
+
+        async def run():
+            first = asyncio.ensure_future(transport.generate(PAYLOAD))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            await asyncio.sleep(0)
+            return await transport.generate(PAYLOAD)
+
+        assert asyncio.run(run()) == {"response": "shared profile"}
+        assert inner.calls == 2
+        assert inner.cancelled == 1
+
+    def test_error_reaches_every_waiter(self):
+        transport = AsyncCoalescingTransport(AsyncSlowTransport(fail=True))
+
+        async def run():
+            return await asyncio.gather(*(transport.generate(PAYLOAD) for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_streams_are_shared_with_replay(self):
+        inner = AsyncSlowTransport(delay=0.02)
+        transport = AsyncCoalescingTransport(inner)
+        gen = ProfileGenerator(async_transport=transport)
+
+        async def collect(delay):
+            await asyncio.sleep(delay)
+            return [text async for text in gen.astream_profile(TRAITS)]
+
+        async def run():
+            # The second subscriber joins after the first chunks were produced
+            return await asyncio.gather(collect(0), collect(0.05))
+
+        first, second = asyncio.run(run())
+
+        assert first == second == ["You", " MUST", " be", " warm."]
+        assert inner.streams == 1
+        assert transport.coalesced == 1
+
+    def test_stream_error_reaches_every_subscriber(self):
+        transport = AsyncCoalescingTransport(AsyncSlowTransport(delay=0.01, fail=True))
+
+        async def collect():
+            return [chunk async for chunk in transport.stream(PAYLOAD)]
+
+        async def run():
+            return await asyncio.gather(collect(), collect(), return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_stream_after_last_subscriber_left_starts_new_stream(self):
+        inner = AsyncSlowTransport(delay=0.01)
+        transport = AsyncCoalescingTransport(inner)
+
+        async def run():
+            first = transport.stream(PAYLOAD)
+            await anext(first)
+            await first.aclose()
+            return [chunk["response"] async for chunk in transport.stream(PAYLOAD)]
+
+        assert asyncio.run(run()) == ["You", " MUST", " be", " warm.", ""]
+        assert inner.streams == 2
+
+    def test_cancelled_stream_is_not_reported_complete(self):
+        transport = AsyncCoalescingTransport(AsyncSlowTransport(delay=0.01))
+
+        async def run():
+            chunks = transport.stream(PAYLOAD)
+            await anext(chunks)
+            next(iter(transport._streams.values())).task.cancel()
+            return [chunk async for chunk in chunks]
+
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(run())
@@ -0,0 +1,119 @@
+import threading
+
+from persona_api.services import BehaviorResolver, CachedTextSource, DomainTextResolver, JsonTextSource, get_shared_text_source
+
+
+class CountingSource(JsonTextSource):
+    def __init__(self):
+        super().__init__()
+        self.loads = 0
+
+    def load(self, domain, scores):
+        self.loads += 1
+        return super().load(domain, scores)
+
+
+class TestCachedTextSource:
+    def test_repeated_loads_hit_cache(self):
+        backend = CountingSource()
+        cache = CachedTextSource(backend)
+
+        first = cache.load("extraversion", (3, 3, 3))
+        second = cache.load("extraversion", (3, 3, 3))
+
+        assert first is second
+        assert backend.loads == 1
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+        assert stats["bytes"] > 0
+
+    def test_entries_hold_prebuilt_lists(self):
+        cache = CachedTextSource(JsonTextSource())
+        entry = cache.load("agreeableness", (4, 4, 4))
+
+        assert isinstance(entry.texts, list)
+        assert isinstance(entry.instructions, list)
+        assert len(entry.texts) == len(entry.instructions)
+
+    def test_missing_entries_are_cached(self):
+        backend = CountingSource()
+        cache = CachedTextSource(backend)
+
+        assert cache.load("unknown", (1, 1, 1)) is None
+        assert cache.load("unknown", (1, 1, 1)) is None
+        assert backend.loads == 1
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        probe = CachedTextSource(JsonTextSource())
+        probe.load("extraversion", (1, 1, 1))
+        one_entry = probe.stats()["bytes"]
+
+        backend = CountingSource()
+        cache = CachedTextSource(backend, max_bytes=int(one_entry * 2.5))
+        cache.load("extraversion", (1, 1, 1))
+        cache.load("extraversion", (2, 2, 2))
+        cache.load("extraversion", (1, 1, 1))  # refresh (1, 1, 1)
+        cache.load("extraversion", (5, 5, 5))  # evicts (2, 2, 2)
+
+        stats = cache.stats()
+        assert stats["evictions"] >= 1
+        assert stats["bytes"] <= stats["max_bytes"]
+
+        loads = backend.loads
+        cache.load("extraversion", (1, 1, 1))
+        assert backend.loads == loads
+
+    def test_zero_budget_disables_caching(self):
+        backend = CountingSource()
+        cache = CachedTextSource(backend, max_bytes=0)
+
+        cache.load("extraversion", (3, 3, 3))
+        cache.load("extraversion", (3, 3, 3))
+
+        assert backend.loads == 2
+        assert cache.stats()["entries"] == 0
+
+    def test_concurrent_loads(self):
+        cache = CachedTextSource(JsonTextSource())
+        errors = []
+
+        def worker():
+            try:
+                for s in range(1, 6):
+                    assert cache.load("conscientiousness", (s, s, s)) is not None
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert not errors
+        stats = cache.stats()
+        assert stats["hits"] + stats["misses"] == 40
+        assert stats["entries"] == 5
+
+
+class TestSharedTextSource:
+    def test_resolvers_share_default_cache(self):
+        shared = get_shared_text_source()
+        assert get_shared_text_source() is shared
+
+        shared.clear()
+        DomainTextResolver(seed="a").resolve("extraversion", (4, 4, 4))
+        BehaviorResolver(seed="a").resolve("extraversion", 4)
+        DomainTextResolver(seed="b").resolve("extraversion", (4, 4, 4))
+
+        assert shared.stats()["hits"] >= 1
+
+    def test_returned_instructions_do_not_alias_cache(self):
+        resolver = DomainTextResolver(seed="x")
+        result = resolver.resolve("agreeableness", (2, 2, 2))
+        result["instructions"].clear()
+
+        again = DomainTextResolver(seed="x").resolve("agreeableness", (2, 2, 2))
+        assert again["instructions"]
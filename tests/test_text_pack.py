@@ -0,0 +1,111 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from persona_api.services import BehaviorResolver, DomainTextResolver, JsonTextSource, TextPack
+from persona_api.services.text_pack import build_text_pack
+from persona_api.services.text_source import DEFAULT_TEXT_DIR
+
+
+@pytest.fixture(scope="module")
+def pack_path(tmp_path_factory) -> Path:
+    path = tmp_path_factory.mktemp("pack") / "text.pack"
+    build_text_pack(DEFAULT_TEXT_DIR, path)
+    return path
+
+
+class TestTextPack:
+    def test_entries_match_json_tree(self, pack_path):
+        pack = TextPack(pack_path)
+        json_source = JsonTextSource()
+
+        for domain in pack.domains:
+            for scores in [(1, 1, 1), (3, 2, 4), (5, 5, 5), (1, 5, 1)]:
+                expected = json_source.load(domain, scores)
+                actual = pack.load(domain, scores)
+                assert actual.coherence == expected.coherence
+                assert list(actual.texts) == list(expected.texts)
+                assert list(actual.instructions) == list(expected.instructions)
+
+    def test_coherence_index_matches_json_tree(self, pack_path):
+        pack = TextPack(pack_path)
+        json_source = JsonTextSource()
+
+        for domain in pack.domains:
+            assert pack.load_coherence_index(domain) == json_source.load_coherence_index(domain)
+
+    def test_unknown_domain_returns_none(self, pack_path):
+        pack = TextPack(pack_path)
+        assert pack.load("unknown", (3, 3, 3)) is None
+        assert pack.load("extraversion", (0, 3, 3)) is None
+
+    def test_domain_resolver_same_results_as_json(self, pack_path):
+        pack = TextPack(pack_path)
+        personality = {
+            "extraversion": (5, 4, 3),
+            "agreeableness": (1, 2, 1),
+            "conscientiousness": (3, 3, 3),
+            "negative_emotionality": (2, 5, 1),
+            "open_mindedness": (4, 4, 5),
+        }
+
+        from_json = DomainTextResolver(seed="abc123").resolve_all(personality)
+        from_pack = DomainTextResolver(seed="abc123", source=pack).resolve_all(personality)
+
+        assert from_pack == from_json
+
+    def test_behavior_resolver_same_results_as_json(self, pack_path):
+        pack = TextPack(pack_path)
+        scores = {"extraversion": 4, "agreeableness": 2, "conscientiousness": 5, "negative_emotionality": 1, "open_mindedness": 3}
+
+        from_json = BehaviorResolver(seed="abc123").resolve_all(scores, coherence=2)
+        from_pack = BehaviorResolver(seed="abc123", source=pack).resolve_all(scores, coherence=2)
+
+        assert from_pack == from_json
+
+    def test_mmap_and_in_memory_modes_agree(self, pack_path):
+        with TextPack(pack_path) as mapped:
+            in_memory = TextPack(pack_path, use_mmap=False)
+            assert mapped.is_mmapped
+            assert not in_memory.is_mmapped
+
+            for scores in [(1, 1, 1), (2, 4, 3), (5, 5, 4)]:
+                a = mapped.load("agreeableness", scores)
+                b = in_memory.load("agreeableness", scores)
+                assert list(a.texts) == list(b.texts)
+                assert list(a.instructions) == list(b.instructions)
+
+    def test_entries_are_lazy_views(self, pack_path):
+        pack = TextPack(pack_path)
+        entry = pack.load("extraversion", (4, 4, 4))
+
+        assert not isinstance(entry.texts, list)
+        assert len(entry.texts) == len(entry.instructions)
+        assert entry.texts[-1] == list(entry.texts)[-1]
+        assert entry.instructions[0] == list(entry.instructions)[0]
+        with pytest.raises(IndexError):
+            entry.texts[len(entry.texts)]
+
+    def test_stale_pack_detected(self, tmp_path):
+        source_dir = tmp_path / "text"
+        shutil.copytree(DEFAULT_TEXT_DIR / "extraversion", source_dir / "extraversion")
+        path = tmp_path / "text.pack"
+        build_text_pack(source_dir, path)
+
+        pack = TextPack(path)
+        assert not pack.is_stale(source_dir)
+
+        entry_path = source_dir / "extraversion" / "3" / "3" / "3.json"
+        content = json.loads(entry_path.read_text())
+        content["coherence"] = 2
+        entry_path.write_text(json.dumps(content))
+
+        assert pack.is_stale(source_dir)
+
+    def test_rejects_non_pack_file(self, tmp_path):
+        path = tmp_path / "bogus.pack"
+        path.write_bytes(b"\0" * 128)
+        with pytest.raises(ValueError):
+            TextPack(path)
@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+import pytest
+
+from persona_api.services.training_columns import ColumnChunk, TrainingColumns, create_column_writer
+
+
+def line(a: int, n: int, length_target: int | None, output: str, traits: str = "warm, curious") -> str:
+    record = {
+        "inputs": {"emoji": "", "scores": f"A{a},C3,E3,O3,N{n}", "traits": traits},
+        "output": output,
+        "meta": {"A": a, "C": 3, "E": 3, "O": 3, "N": n, "length_target": length_target, "length_actual": len(output), "seed": f"{a}_{n}_0_1"},
+    }
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+LINES = [
+    line(5, 1, 128, "Short."),
+    line(5, 2, None, "A much longer profile ☀️ text."),
+    line(1, 1, 256, "Another one.", traits="cold, distant"),
+    "not json\n",
+]
+
+
+class TestColumnChunk:
+    def test_from_lines_counts_errors(self):
+        chunk = ColumnChunk.from_lines(LINES)
+
+        assert len(chunk) == 3
+        assert chunk.errors == 1
+        assert chunk.scores["A"] == [5, 5, 1]
+        assert chunk.length_target == [128, None, 256]
+
+
+class TestNpzColumns:
+    @pytest.fixture
+    def columns(self, tmp_path):
+        writer = create_column_writer(tmp_path / "td.npz", "npz")
+        writer.write(ColumnChunk.from_lines(LINES[:2]))
+        writer.write(ColumnChunk.from_lines(LINES[2:]))
+        writer.close()
+        assert writer.rows == 3
+        return TrainingColumns(tmp_path / "td.npz")
+
+    def test_typed_columns(self, columns):
+        assert len(columns) == 3
+        assert columns.A.dtype == np.uint8
+        assert columns.A.tolist() == [5, 5, 1]
+        assert columns["length_target"].tolist() == [128, -1, 256]
+        assert columns.length_actual.tolist() == [6, 30, 12]
+
+    def test_select_and_decode(self, columns):
+        rows = columns.select(A=5, min_length=10)
+
+        assert rows.tolist() == [1]
+        assert columns.strings("output", rows) == ["A much longer profile ☀️ text."]
+        assert columns.strings("seed", rows) == ["5_2_0_1"]
+        assert columns.select(A=5, N=1).tolist() == [0]
+        assert columns.select(length_target=256).tolist() == [2]
+
+    def test_traits_are_dictionary_encoded(self, columns):
+        assert columns.traits_dictionary == ["warm, curious", "cold, distant"]
+        assert columns.traits.tolist() == [0, 0, 1]
+        assert columns.strings("traits", [2]) == ["cold, distant"]
+
+    def test_unknown_score_column(self, columns):
+        with pytest.raises(ValueError, match="Unknown score column"):
+            columns.select(X=1)
+
+
+class TestParquetColumns:
+    def test_round_trip(self, tmp_path):
+        parquet = pytest.importorskip("pyarrow.parquet")
+        writer = create_column_writer(tmp_path / "td.parquet", "parquet", row_group_rows=2)
+        writer.write(ColumnChunk.from_lines(LINES))
+        writer.close()
+
+        table = parquet.read_table(tmp_path / "td.parquet", filters=[("A", "=", 5)])
+
+        assert table.num_rows == 2
+        assert table.column("length_target").to_pylist() == [128, None]
+        assert str(table.schema.field("traits").type).startswith("dictionary")
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown format"):
+            create_column_writer(tmp_path / "td.csv", "csv")
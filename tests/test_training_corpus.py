@@ -0,0 +1,51 @@
+import pickle
+
+from persona_api.services.training_corpus import CorpusUnit, corpus_units, iter_corpus_lines, iter_unit_lines
+from persona_api.services.training_shards import ShardWriter
+
+
+def record(scores: str, i: int) -> str:
+    return f'{{"inputs": {{"scores": "{scores}"}}, "output": "sample {i}"}}\n'
+
+
+class TestCorpusUnits:
+    def test_jsonl_directory(self, tmp_path):
+        (tmp_path / "training_data_0001.jsonl").write_text(record("A1,C1,E1,O1,N1", 0) + "\n" + record("A1,C1,E1,O1,N1", 1))
+        (tmp_path / "training_data_0002.jsonl").write_text(record("A1,C1,E1,O1,N2", 0))
+        (tmp_path / "errors.jsonl").write_text("{}\n")
+
+        units = corpus_units(tmp_path)
+
+        assert [unit.path.name for unit in units] == ["training_data_0001.jsonl", "training_data_0002.jsonl"]
+        assert len(list(iter_unit_lines(units[0]))) == 2
+        assert len(list(iter_corpus_lines(tmp_path))) == 3
+        assert len(list(iter_corpus_lines(tmp_path, "A1,C1,E1,O1,N2"))) == 1
+
+    def test_shard_directory(self, tmp_path):
+        writer = ShardWriter(tmp_path, codec="zlib", shard_bytes=100)
+        for n in range(4):
+            writer.append(f"A1,C1,E1,O1,N{n + 1}", [record(f"A1,C1,E1,O1,N{n + 1}", i) for i in range(3)])
+        writer.close()
+
+        units = corpus_units(tmp_path)
+
+        assert len(units) > 1
+        assert all(unit.shard is not None for unit in units)
+        assert sum(len(list(iter_unit_lines(unit))) for unit in units) == 12
+        assert len(list(iter_corpus_lines(tmp_path, "A1,C1,E1,O1,N3"))) == 3
+
+    def test_units_are_picklable(self, tmp_path):
+        unit = CorpusUnit(tmp_path, 2)
+        assert pickle.loads(pickle.dumps(unit)) == unit
+
+    def test_shard_directory_by_combo(self, tmp_path):
+        writer = ShardWriter(tmp_path, codec="zlib")
+        writer.append("A1,C1,E1,O1,N1", [record("A1,C1,E1,O1,N1", 0)])
+        writer.append("A1,C1,E1,O1,N2", [record("A1,C1,E1,O1,N2", 0)])
+        writer.append("A1,C1,E1,O1,N1", [record("A1,C1,E1,O1,N1", 1)])
+        writer.close()
+
+        units = corpus_units(tmp_path, by_combo=True)
+
+        assert [unit.key for unit in units] == ["A1,C1,E1,O1,N1", "A1,C1,E1,O1,N2"]
+        assert len(list(iter_unit_lines(units[0]))) == 2
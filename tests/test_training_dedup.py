@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from persona_api.services.training_corpus import corpus_units
+from persona_api.services.training_dedup import dedup_unit
+from persona_api.services.training_shards import ShardWriter
+
+SCORES = "A1,C1,E1,O1,N1"
+WORDS = [f"word{i:03d}" for i in range(200)]
+
+# Overlapping word windows: A~B and B~C clear 0.8 estimated similarity, A~C does not
+TEXT_A = " ".join(WORDS[0:60])
+TEXT_B = " ".join(WORDS[8:68])
+TEXT_C = " ".join(WORDS[16:76])
+UNRELATED = " ".join(WORDS[100:160])
+
+
+def line(seed: str, traits: str, output: str) -> str:
+    record = {"inputs": {"scores": SCORES, "traits": traits}, "output": output, "meta": {"seed": seed}}
+    return json.dumps(record) + "\n"
+
+
+def dedup_jsonl(tmp_path, lines: list[str]):
+    (tmp_path / "training_data_0001.jsonl").write_text("".join(lines))
+    [unit] = corpus_units(tmp_path, by_combo=True)
+    return dedup_unit(unit, threshold=0.8, keep_lines=True)
+
+
+def reasons(result) -> list[tuple[str, str, str]]:
+    return [(d["seed"], d["reason"], d["duplicate_of"]) for d in result.duplicates]
+
+
+class TestDedupUnit:
+    def test_keeps_first_of_each_group(self, tmp_path):
+        lines = [line("s1", "t1", TEXT_A), line("s2", "t2", UNRELATED), line("s3", "t3", TEXT_A), line("s4", "t1", "other")]
+
+        result = dedup_jsonl(tmp_path, lines)
+
+        assert reasons(result) == [("s3", "output", "s1"), ("s4", "traits", "s1")]
+        assert result.kept == lines[:2]
+        assert (result.samples, result.bytes) == (4, len("".join(lines).encode()))
+        assert result.duplicate_bytes == len((lines[2] + lines[3]).encode())
+
+    def test_traits_match_takes_precedence(self, tmp_path):
+        result = dedup_jsonl(tmp_path, [line("s1", "t1", TEXT_A), line("s2", "t1", TEXT_A)])
+
+        assert result.duplicates == [{"scores": SCORES, "seed": "s2", "reason": "traits", "duplicate_of": "s1", "similarity": 1.0}]
+
+    def test_outputs_compared_only_with_kept_samples(self, tmp_path):
+        # B duplicates A and is dropped; C only resembles B, so it is kept
+        lines = [line("s1", "t1", TEXT_A), line("s2", "t2", TEXT_B), line("s3", "t3", TEXT_C)]
+
+        result = dedup_jsonl(tmp_path, lines)
+
+        assert reasons(result) == [("s2", "output", "s1")]
+        assert result.kept == [lines[0], lines[2]]
+
+    def test_dropped_sample_traits_are_not_remembered(self, tmp_path):
+        lines = [line("s1", "t1", TEXT_A), line("s2", "t2", TEXT_A), line("s3", "t2", UNRELATED)]
+
+        result = dedup_jsonl(tmp_path, lines)
+
+        assert reasons(result) == [("s2", "output", "s1")]
+        assert result.kept == [lines[0], lines[2]]
+
+    def test_repeated_seeds_keep_separate_signatures(self, tmp_path):
+        lines = [line("s1", "t1", TEXT_A), line("s1", "t2", UNRELATED), line("s3", "t3", TEXT_A), line("s4", "t4", UNRELATED)]
+
+        result = dedup_jsonl(tmp_path, lines)
+
+        assert reasons(result) == [("s3", "output", "s1"), ("s4", "output", "s1")]
+        assert result.kept == lines[:2]
+
+    def test_unparseable_lines_are_counted(self, tmp_path):
+        lines = [line("s1", "t1", TEXT_A), "not json\n", '{"output": "x"}\n']
+
+        result = dedup_jsonl(tmp_path, lines)
+
+        assert (result.samples, result.errors) == (1, 2)
+        assert result.kept == lines[:1]
+
+    def test_kept_lines_only_when_requested(self, tmp_path):
+        (tmp_path / "training_data_0001.jsonl").write_text(line("s1", "t1", TEXT_A))
+        [unit] = corpus_units(tmp_path, by_combo=True)
+
+        assert dedup_unit(unit).kept == []
+
+    @pytest.mark.parametrize("shard_bytes", [200, 1 << 20])
+    def test_shard_directory(self, tmp_path, shard_bytes):
+        lines = [line("s1", "t1", TEXT_A), line("s2", "t2", TEXT_B), line("s3", "t3", TEXT_C), line("s4", "t1", UNRELATED)]
+        writer = ShardWriter(tmp_path, codec="zlib", shard_bytes=shard_bytes)
+        for sample in lines:
+            writer.append(SCORES, [sample])
+        writer.append("A1,C1,E1,O1,N2", [line("s5", "t1", TEXT_A)])
+        writer.close()
+
+        results = {unit.key: dedup_unit(unit, threshold=0.8, keep_lines=True) for unit in corpus_units(tmp_path, by_combo=True)}
+
+        assert reasons(results[SCORES]) == [("s2", "output", "s1"), ("s4", "traits", "s1")]
+        # Shard lines come back without newlines; kept lines always end in one
+        assert results[SCORES].kept == [lines[0], lines[2]]
+        assert results["A1,C1,E1,O1,N2"].duplicates == []
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from persona_api.services.training_index import INDEX_NAME, TrainingIndex, combo_file_name, combo_file_number
+
+
+def write_samples(path, scores: str, targets: list[int | None], mode: str = "a"):
+    with open(path, mode, encoding="utf-8") as f:
+        for i, target in enumerate(targets):
+            record = {"inputs": {"scores": scores}, "output": f"sample {i} ✓", "meta": {"length_target": target}}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class TestComboFileNumber:
+    def test_generation_order(self):
+        assert combo_file_number("A1,C1,E1,O1,N1") == 1
+        assert combo_file_number("A1,C1,E1,O1,N2") == 2
+        assert combo_file_number("A5,C5,E5,O5,N5") == 3125
+        assert combo_file_name(2) == "training_data_0002.jsonl"
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="Invalid score combo"):
+            combo_file_number("A6,C1,E1,O1,N1")
+
+
+class TestTrainingIndex:
+    @pytest.fixture
+    def corpus(self, tmp_path):
+        write_samples(tmp_path / "training_data_0001.jsonl", "A1,C1,E1,O1,N1", [128, 256, None])
+        write_samples(tmp_path / "training_data_0002.jsonl", "A1,C1,E1,O1,N2", [128, 128])
+        return tmp_path
+
+    def test_refresh_builds_then_only_reads_new_lines(self, corpus):
+        index = TrainingIndex(corpus)
+        assert index.refresh() == 5
+        assert index.refresh() == 0
+
+        write_samples(corpus / "training_data_0002.jsonl", "A1,C1,E1,O1,N2", [None])
+        assert index.refresh() == 1
+        index.close()
+
+        assert len(TrainingIndex(corpus).records()) == 6
+
+    def test_query_by_scores_and_length(self, corpus):
+        index = TrainingIndex(corpus)
+        index.refresh()
+
+        assert index.count("A1,C1,E1,O1,N2") == 2
+        assert index.count(length_target=128) == 3
+        assert index.count(length_target=0) == 1
+        assert [r["output"] for r in index.query("A1,C1,E1,O1,N1", 256)] == ["sample 1 ✓"]
+        assert all(r["inputs"]["scores"] == "A1,C1,E1,O1,N2" for r in index.query("A1,C1,E1,O1,N2"))
+
+    def test_append_matches_file_offsets(self, tmp_path):
+        path = tmp_path / "training_data_0003.jsonl"
+        line = json.dumps({"inputs": {"scores": "A1,C1,E1,O1,N3"}, "output": "x", "meta": {"length_target": 64}}) + "\n"
+        path.write_text(line)
+
+        index = TrainingIndex(tmp_path)
+        index.append(3, [(64, 0, len(line.encode()))])
+        index.flush()
+
+        assert index.refresh() == 0
+        assert list(index.lines(length_target=64)) == [line]
+
+    def test_torn_record_is_ignored_and_truncated(self, corpus):
+        index = TrainingIndex(corpus)
+        index.refresh()
+        index.close()
+        with open(corpus / INDEX_NAME, "ab") as f:
+            f.write(b"\x01\x02\x03")
+
+        index = TrainingIndex(corpus)
+        assert len(index.records()) == 5
+        write_samples(corpus / "training_data_0001.jsonl", "A1,C1,E1,O1,N1", [64])
+        assert index.refresh() == 1
+        index.close()
+        assert TrainingIndex(corpus).count(length_target=64) == 1
+
+    def test_not_an_index(self, tmp_path):
+        (tmp_path / INDEX_NAME).write_bytes(b"nope....")
+
+        with pytest.raises(ValueError, match="Not a training index"):
+            TrainingIndex(tmp_path).records()
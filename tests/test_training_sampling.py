@@ -0,0 +1,107 @@
+import json
+import random
+
+import pytest
+
+from persona_api.services.training_corpus import corpus_units
+from persona_api.services.training_sampling import Reservoir, sample_corpus, sample_priority, sample_unit
+from persona_api.services.training_shards import ShardWriter
+
+COMBOS = [f"A1,C1,E1,O1,N{n}" for n in range(1, 5)]
+
+
+def record(scores: str, i: int) -> str:
+    return json.dumps({"inputs": {"scores": scores}, "output": f"{scores} sample {i}"}) + "\n"
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    # Combos spread over several files, so their reservoirs are merged across units
+    for file_idx in range(6):
+        lines = [record(COMBOS[(file_idx + i) % len(COMBOS)], file_idx * 100 + i) for i in range(25)]
+        (tmp_path / f"training_data_{file_idx + 1:04d}.jsonl").write_text("".join(lines))
+    return tmp_path
+
+
+class TestReservoir:
+    def test_merged_reservoirs_equal_single_pass(self):
+        offers = [(sample_priority(f"line {i}", seed=7), f"line {i}") for i in range(500)]
+        single = Reservoir(5)
+        for priority, value in offers:
+            single.offer(priority, value)
+
+        rng = random.Random(0)
+        for _ in range(10):
+            shuffled = offers[:]
+            rng.shuffle(shuffled)
+            cuts = sorted(rng.sample(range(1, len(shuffled)), 4))
+            parts = [shuffled[a:b] for a, b in zip([0, *cuts], [*cuts, len(shuffled)])]
+
+            merged = Reservoir(5)
+            for part in parts:
+                reservoir = Reservoir(5)
+                for priority, value in part:
+                    reservoir.offer(priority, value)
+                merged.merge(reservoir)
+
+            assert merged.values() == single.values()
+
+    def test_keeps_lowest_priorities(self):
+        reservoir = Reservoir(2)
+        for priority, value in [(5, "e"), (1, "a"), (4, "d"), (2, "b")]:
+            reservoir.offer(priority, value)
+
+        assert reservoir.values() == ["a", "b"]
+
+    def test_priority_depends_on_seed(self):
+        assert sample_priority("line", 1) == sample_priority("line", 1)
+        assert sample_priority("line", 1) != sample_priority("line", 2)
+
+
+class TestSampleCorpus:
+    def test_independent_of_unit_order_and_workers(self, corpus):
+        units = corpus_units(corpus)
+        expected, lines, errors = sample_corpus(units, k=3, seed=42)
+
+        assert sorted(expected) == COMBOS
+        assert all(len(values) == 3 for values in expected.values())
+        assert (lines, errors) == (150, [])
+        assert sample_corpus(units[::-1], k=3, seed=42)[0] == expected
+        assert sample_corpus(units, k=3, seed=42, workers=3)[0] == expected
+        assert sample_corpus(units, k=3, seed=43)[0] != expected
+
+    def test_equals_single_reservoir_per_combo(self, corpus):
+        single = {scores: Reservoir(3) for scores in COMBOS}
+        for path in sorted(corpus.glob("*.jsonl")):
+            for line in path.read_text().splitlines(keepends=True):
+                data = json.loads(line)
+                single[data["inputs"]["scores"]].offer(sample_priority(line, 42), data["output"])
+
+        sampled, _lines, _errors = sample_corpus(corpus_units(corpus), k=3, seed=42, workers=2)
+
+        assert sampled == {scores: reservoir.values() for scores, reservoir in single.items()}
+
+    def test_shard_units_independent_of_order_and_workers(self, corpus, tmp_path_factory):
+        shard_dir = tmp_path_factory.mktemp("shards")
+        writer = ShardWriter(shard_dir, codec="zlib", shard_bytes=500)
+        for path in sorted(corpus.glob("*.jsonl")):
+            for line in path.read_text().splitlines(keepends=True):
+                writer.append(json.loads(line)["inputs"]["scores"], [line])
+        writer.close()
+
+        units = corpus_units(shard_dir)
+        expected, lines, _errors = sample_corpus(units, k=3, seed=42)
+
+        assert len(units) > 1
+        assert lines == 150
+        assert sorted(expected) == COMBOS
+        assert sample_corpus(units[::-1], k=3, seed=42, workers=2)[0] == expected
+
+    def test_unparseable_lines_are_reported(self, tmp_path):
+        (tmp_path / "training_data_0001.jsonl").write_text(record(COMBOS[0], 0) + "not json\n" + '{"output": "x"}\n')
+
+        reservoirs, lines, errors = sample_unit(corpus_units(tmp_path)[0], k=1, seed=42)
+
+        assert lines == 3
+        assert list(reservoirs) == [COMBOS[0]]
+        assert len(errors) == 2
@@ -0,0 +1,93 @@
+import pytest
+
+from persona_api.services.training_shards import INDEX_NAME, ShardReader, ShardWriter, is_shard_dir
+
+
+def lines_for(key: str, count: int, start: int = 0) -> list[str]:
+    return [f'{{"inputs": {{"scores": "{key}"}}, "output": "sample {i}"}}\n' for i in range(start, start + count)]
+
+
+class TestShardWriter:
+    def test_round_trip_by_key_and_stream(self, tmp_path):
+        writer = ShardWriter(tmp_path, codec="zlib")
+        writer.append("A1,C1,E1,O1,N1", lines_for("A1,C1,E1,O1,N1", 3))
+        writer.append("A1,C1,E1,O1,N2", lines_for("A1,C1,E1,O1,N2", 2))
+        writer.append("A1,C1,E1,O1,N1", lines_for("A1,C1,E1,O1,N1", 1, start=3))
+        writer.close()
+
+        reader = ShardReader(tmp_path)
+
+        assert is_shard_dir(tmp_path)
+        assert reader.count("A1,C1,E1,O1,N1") == 4
+        assert [r["output"] for r in reader.read("A1,C1,E1,O1,N1")] == [f"sample {i}" for i in range(4)]
+        assert [r["output"] for r in reader.read("A1,C1,E1,O1,N2")] == ["sample 0", "sample 1"]
+        assert len(list(reader.read())) == 6
+        assert list(reader.read("A5,C5,E5,O5,N5")) == []
+
+    def test_rolls_over_to_new_shards(self, tmp_path):
+        writer = ShardWriter(tmp_path, codec="zlib", shard_bytes=200)
+        for n in range(10):
+            writer.append(f"K{n}", lines_for(f"K{n}", 5))
+        writer.close()
+
+        reader = ShardReader(tmp_path)
+
+        assert reader.stats()["shards"] > 1
+        assert all(path.stat().st_size <= 400 for path in reader.shard_paths())
+        assert [reader.count(f"K{n}") for n in range(10)] == [5] * 10
+
+    def test_compresses(self, tmp_path):
+        writer = ShardWriter(tmp_path, codec="zlib")
+        writer.append("A1,C1,E1,O1,N1", lines_for("A1,C1,E1,O1,N1", 200))
+        writer.close()
+
+        stats = ShardReader(tmp_path).stats()
+
+        assert stats["records"] == 200
+        assert stats["bytes"] * 4 < stats["raw_bytes"]
+
+    def test_reopen_appends_and_drops_unindexed_frames(self, tmp_path):
+        writer = ShardWriter(tmp_path, codec="zlib")
+        writer.append("K", lines_for("K", 2))
+        writer.close()
+
+        # A crash after writing shard data but before the index record
+        with open(ShardReader(tmp_path).shard_paths()[0], "ab") as f:
+            f.write(b"garbage")
+        with open(tmp_path / INDEX_NAME, "ab") as f:
+            f.write(b"\x01\x02")
+
+        writer = ShardWriter(tmp_path)
+        writer.append("K", lines_for("K", 2, start=2))
+        writer.close()
+
+        reader = ShardReader(tmp_path)
+        assert [r["output"] for r in reader.read("K")] == [f"sample {i}" for i in range(4)]
+
+    def test_unflushed_frames_are_invisible(self, tmp_path):
+        writer = ShardWriter(tmp_path, codec="zlib")
+        writer.append("K", lines_for("K", 2))
+
+        assert ShardReader(tmp_path).count("K") == 0
+        writer.flush()
+        assert ShardReader(tmp_path).count("K") == 2
+        writer.close()
+
+    def test_codec_mismatch(self, tmp_path):
+        ShardWriter(tmp_path, codec="zlib").close()
+
+        with pytest.raises(ValueError, match="uses codec 'zlib'"):
+            ShardWriter(tmp_path, codec="zstd")
+
+    def test_unknown_codec(self, tmp_path):
+        with pytest.raises(ValueError, match="Unknown codec"):
+            ShardWriter(tmp_path, codec="lz4")
+
+    def test_zstd_round_trip(self, tmp_path):
+        pytest.importorskip("zstandard")
+        writer = ShardWriter(tmp_path, codec="zstd")
+        writer.append("K", lines_for("K", 3))
+        writer.close()
+
+        assert ShardReader(tmp_path).count("K") == 3
+        assert len(list(ShardReader(tmp_path).read("K"))) == 3
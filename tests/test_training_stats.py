@@ -0,0 +1,120 @@
+import json
+
+import numpy as np
+
+from persona_api.services.training_shards import ShardWriter
+from persona_api.services.training_stats import LengthStats, advance_watermarks, collect_unit, histogram_percentile, plan_units
+
+
+def line(scores: str, target: int | None, actual: int, seed: str) -> str:
+    record = {"inputs": {"scores": scores}, "output": "x" * actual, "meta": {"length_target": target, "length_actual": actual, "seed": seed}}
+    return json.dumps(record) + "\n"
+
+
+def update(training_dir, watermarks, stats):
+    units, watermarks, rebuild = plan_units(training_dir, watermarks)
+    if rebuild:
+        stats = LengthStats()
+    for unit in units:
+        unit_stats, end = collect_unit(unit)
+        stats.merge(unit_stats)
+        advance_watermarks(watermarks, unit, end)
+    return stats, watermarks, rebuild
+
+
+class TestHistogramPercentile:
+    def test_interpolates_within_bins(self):
+        hist = np.array([0, 10, 10, 0])
+
+        assert histogram_percentile(hist, 50, 10) == 20.0
+        assert histogram_percentile(hist, 25, 10) == 15.0
+        assert histogram_percentile(np.zeros(4), 50, 10) is None
+
+
+class TestLengthStats:
+    def test_tiers_and_outliers(self):
+        stats = LengthStats(outliers=2)
+        for i, actual in enumerate([128, 130, 120, 400]):
+            stats.add("A1,C1,E1,O1,N1", 128, actual, f"s{i}")
+        stats.add("A1,C1,E1,O1,N1", None, 900, "long")
+        stats.add("A1,C1,E1,O1,N1", None, 300, "short")
+
+        summary = {row["length_target"]: row for row in stats.tier_summary()}
+
+        assert stats.tiers() == [128, 0]
+        assert summary[128]["count"] == 4
+        assert summary[128]["within_25pct"] == 0.75
+        assert summary[None]["count"] == 2
+        assert [o["seed"] for o in stats.outlier_list(128)] == ["s3", "s2"]
+        assert [o["seed"] for o in stats.outlier_list(0)] == ["long", "short"]
+
+    def test_merge_equals_single_pass(self):
+        lines = [line(f"A1,C1,E1,O1,N{i % 3 + 1}", 128 if i % 2 else None, 50 + i * 7, f"s{i}") for i in range(40)]
+        whole = LengthStats()
+        whole.add_lines(lines)
+        left, right = LengthStats(), LengthStats()
+        left.add_lines(lines[:17])
+        right.add_lines(lines[17:])
+        left.merge(right)
+
+        assert left.combo_summary() == whole.combo_summary()
+        assert left.tier_summary() == whole.tier_summary()
+        assert left.outlier_list(128) == whole.outlier_list(128)
+
+    def test_save_and_load(self, tmp_path):
+        stats = LengthStats()
+        stats.add_lines([line("A1,C1,E1,O1,N1", 256, 250, "a"), line("A1,C1,E1,O1,N2", None, 80, "b"), "bad\n"])
+        stats.save(tmp_path / "stats.npz", {"files": {"training_data_0001.jsonl": 10}})
+
+        loaded, watermarks = LengthStats.load(tmp_path / "stats.npz")
+
+        assert watermarks == {"files": {"training_data_0001.jsonl": 10}}
+        assert loaded.samples == 2 and loaded.errors == 1
+        assert loaded.combo_summary() == stats.combo_summary()
+        assert loaded.outlier_list(256) == stats.outlier_list(256)
+
+
+class TestIncrementalUpdates:
+    def test_jsonl_reads_only_new_lines(self, tmp_path):
+        first = tmp_path / "training_data_0001.jsonl"
+        first.write_text(line("A1,C1,E1,O1,N1", 128, 120, "a") + line("A1,C1,E1,O1,N1", 128, 140, "b"))
+
+        stats, watermarks, _ = update(tmp_path, {}, LengthStats())
+        assert stats.samples == 2
+
+        with open(first, "a") as f:
+            f.write(line("A1,C1,E1,O1,N1", 128, 100, "c") + '{"partial": ')
+        (tmp_path / "training_data_0002.jsonl").write_text(line("A1,C1,E1,O1,N2", None, 300, "d"))
+
+        stats, watermarks, rebuild = update(tmp_path, watermarks, stats)
+        assert not rebuild
+        assert stats.samples == 4
+        assert stats.errors == 0
+
+        stats, watermarks, _ = update(tmp_path, watermarks, stats)
+        assert stats.samples == 4
+
+    def test_shrunk_file_rebuilds(self, tmp_path):
+        path = tmp_path / "training_data_0001.jsonl"
+        path.write_text(line("A1,C1,E1,O1,N1", 128, 120, "a") * 3)
+        stats, watermarks, _ = update(tmp_path, {}, LengthStats())
+
+        path.write_text(line("A1,C1,E1,O1,N1", 128, 120, "a"))
+        stats, watermarks, rebuild = update(tmp_path, watermarks, stats)
+
+        assert rebuild
+        assert stats.samples == 1
+
+    def test_shard_frames(self, tmp_path):
+        writer = ShardWriter(tmp_path, codec="zlib")
+        writer.append("A1,C1,E1,O1,N1", [line("A1,C1,E1,O1,N1", 128, 120, "a")])
+        writer.flush()
+        stats, watermarks, _ = update(tmp_path, {}, LengthStats())
+        assert stats.samples == 1
+
+        writer.append("A1,C1,E1,O1,N2", [line("A1,C1,E1,O1,N2", 128, 90, "b"), line("A1,C1,E1,O1,N2", 128, 95, "c")])
+        writer.close()
+        stats, watermarks, _ = update(tmp_path, watermarks, stats)
+
+        assert stats.samples == 3
+        assert watermarks == {"frames": 2}
@@ -0,0 +1,199 @@
+import json
+
+import pytest
+
+import persona_api.services.training_writer as training_writer
+from persona_api.services.progress_journal import JOURNAL_NAME, ProgressJournal
+from persona_api.services.training_index import TrainingIndex, combo_file_name
+from persona_api.services.training_shards import ShardReader, ShardWriter
+from persona_api.services.training_writer import BufferedJsonlWriter, ShardedJsonlWriter
+
+
+def sample(key: tuple[int, int, int], target: int | None = 128) -> dict:
+    return {"output": f"profile {key} – naïve ✓", "meta": {"length_target": target, "seed": "_".join(map(str, key)) + "_1"}}
+
+
+def read_lines(path) -> list[str]:
+    return path.read_text(encoding="utf-8").splitlines(keepends=True) if path.exists() else []
+
+
+class TestBufferedJsonlWriter:
+    @pytest.fixture
+    def make_writer(self, tmp_path):
+        def make(**kwargs) -> BufferedJsonlWriter:
+            journal = ProgressJournal(tmp_path / JOURNAL_NAME)
+            return BufferedJsonlWriter(lambda combo_idx: tmp_path / combo_file_name(combo_idx + 1), journal, **kwargs)
+        return make
+
+    def test_flushes_on_batch_size(self, tmp_path, make_writer):
+        writer = make_writer(batch_size=3, flush_interval=60)
+        path = tmp_path / combo_file_name(1)
+
+        writer.write((0, 0, 0), sample((0, 0, 0)))
+        writer.write((0, 0, 1), sample((0, 0, 1)))
+        assert writer.pending == 2
+        assert read_lines(path) == []
+        assert writer.journal.done == set()
+
+        writer.write((0, 0, 2), sample((0, 0, 2)))
+        assert writer.pending == 0
+        assert writer.flushes == 1
+        assert [json.loads(line)["meta"]["seed"] for line in read_lines(path)] == ["0_0_0_1", "0_0_1_1", "0_0_2_1"]
+        assert writer.journal.done == {(0, 0, 0), (0, 0, 1), (0, 0, 2)}
+        writer.close()
+
+    def test_flushes_after_flush_interval(self, tmp_path, make_writer, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(training_writer.time, "monotonic", lambda: now[0])
+        writer = make_writer(batch_size=100, flush_interval=2.0)
+
+        assert writer.seconds_until_flush() is None
+        writer.write((0, 0, 0), sample((0, 0, 0)))
+        assert writer.seconds_until_flush() == 2.0
+
+        now[0] += 1.5
+        writer.write((1, 0, 0), sample((1, 0, 0)))
+        assert writer.pending == 2
+        assert writer.seconds_until_flush() == pytest.approx(0.5)
+
+        now[0] += 0.5
+        assert writer.seconds_until_flush() == 0
+        writer.write((1, 0, 1), sample((1, 0, 1)))
+        assert writer.pending == 0
+        assert len(read_lines(tmp_path / combo_file_name(1))) == 1
+        assert len(read_lines(tmp_path / combo_file_name(2))) == 2
+
+        # The interval runs from the first pending line, not the last flush
+        now[0] += 10
+        writer.write((2, 0, 0), sample((2, 0, 0)))
+        assert writer.pending == 1
+        writer.close()
+
+    def test_index_offsets_in_binary_append_mode(self, tmp_path, make_writer):
+        existing = tmp_path / combo_file_name(1)
+        existing.write_text(json.dumps({"output": "é" * 10, "meta": {"length_target": None}}, ensure_ascii=False) + "\n", encoding="utf-8")
+        index = TrainingIndex(tmp_path)
+        assert index.refresh() == 1
+
+        # One open handle, so interleaved combos are reopened between batches
+        writer = make_writer(batch_size=2, max_open_files=1, index=index)
+        for run_idx in range(3):
+            for combo_idx in range(2):
+                writer.write((combo_idx, 1, run_idx), sample((combo_idx, 1, run_idx), target=256))
+        writer.write((0, 2, 0), sample((0, 2, 0), target=None))
+        writer.close()
+
+        index = TrainingIndex(tmp_path)
+        records = index.records()
+        assert len(records) == 8
+        for record in records:
+            with open(tmp_path / combo_file_name(int(record["file"])), "rb") as f:
+                f.seek(int(record["offset"]))
+                assert f.read(int(record["length"])).endswith(b"\n")
+        assert list(index.lines()) == read_lines(tmp_path / combo_file_name(1)) + read_lines(tmp_path / combo_file_name(2))
+        assert index.count(length_target=256) == 6
+        assert index.count("A1,C1,E1,O1,N1", length_target=0) == 2
+        assert index.refresh() == 0
+
+    def test_journal_and_index_appended_after_data(self, tmp_path, make_writer):
+        index = TrainingIndex(tmp_path)
+        writer = make_writer(batch_size=2, index=index)
+        path = tmp_path / combo_file_name(1)
+        seen = []
+
+        def record(keys, fsync=False):
+            # Data and index are already written when the journal records the batch
+            seen.append((len(read_lines(path)), len(TrainingIndex(tmp_path).records()), list(keys)))
+            ProgressJournal.record(writer.journal, keys, fsync)
+
+        writer.journal.record = record
+        writer.write((0, 0, 0), sample((0, 0, 0)))
+        writer.write((0, 0, 1), sample((0, 0, 1)))
+        writer.close()
+
+        assert seen == [(2, 2, [(0, 0, 0), (0, 0, 1)])]
+
+    def test_reader_refresh_during_flush_leaves_index_alone(self, tmp_path, make_writer):
+        index = TrainingIndex(tmp_path)
+        writer = make_writer(batch_size=2, index=index)
+        reader = TrainingIndex(tmp_path)
+        seen = []
+
+        def append(file_number, entries):
+            # Lines are on disk but not yet indexed; a reader refreshes in between
+            seen.append((reader.refresh(persist=False), reader.count()))
+            TrainingIndex.append(index, file_number, entries)
+
+        index.append = append
+        writer.write((0, 0, 0), sample((0, 0, 0)))
+        writer.write((0, 0, 1), sample((0, 0, 1)))
+        assert seen == [(2, 2)]
+
+        # The reader's snapshot is now stale; refreshing it must not truncate the writer's records
+        stale = TrainingIndex(tmp_path)
+        assert len(stale.records()) == 2
+        writer.write((0, 0, 2), sample((0, 0, 2)))
+        writer.write((0, 0, 3), sample((0, 0, 3)))
+        assert stale.refresh(persist=False) == 2
+        assert stale.count() == 4
+        writer.close()
+
+        records = TrainingIndex(tmp_path).records()
+        assert len(records) == 4
+        assert len(set(records["offset"].tolist())) == 4
+        assert TrainingIndex(tmp_path).refresh(persist=False) == 0
+
+    def test_failed_data_write_is_not_journaled(self, tmp_path, make_writer):
+        (tmp_path / combo_file_name(2)).mkdir()
+        index = TrainingIndex(tmp_path)
+        writer = make_writer(batch_size=1, index=index)
+
+        with pytest.raises(IsADirectoryError):
+            writer.write((1, 0, 0), sample((1, 0, 0)))
+
+        assert writer.journal.done == set()
+        assert not (tmp_path / JOURNAL_NAME).exists()
+        assert len(TrainingIndex(tmp_path).records()) == 0
+
+    def test_fsync_policies(self, make_writer, monkeypatch):
+        synced = []
+        monkeypatch.setattr(training_writer.os, "fsync", synced.append)
+
+        writer = make_writer(batch_size=10, fsync="none")
+        writer.write((0, 0, 0), sample((0, 0, 0)))
+        writer.close()
+        assert synced == []
+
+        writer = make_writer(batch_size=2, fsync="batch")
+        writer.write((0, 0, 1), sample((0, 0, 1)))
+        writer.write((1, 0, 1), sample((1, 0, 1)))
+        assert writer.flushes == 1
+        writer.close()
+        # Both combo files, then the journal
+        assert len(synced) == 3
+
+        writer = make_writer(batch_size=64, fsync="always")
+        assert writer.batch_size == 1
+        writer.close()
+
+        with pytest.raises(ValueError, match="fsync must be one of"):
+            make_writer(fsync="sometimes")
+
+
+class TestShardedJsonlWriter:
+    def test_flush_appends_frames_then_journal(self, tmp_path):
+        journal = ProgressJournal(tmp_path / JOURNAL_NAME)
+        shards = ShardWriter(tmp_path, codec="zlib")
+        writer = ShardedJsonlWriter(shards, lambda combo_idx: f"combo-{combo_idx}", journal, batch_size=3)
+
+        writer.write((0, 0, 0), sample((0, 0, 0)))
+        writer.write((1, 0, 0), sample((1, 0, 0)))
+        writer.write((0, 0, 1), sample((0, 0, 1)))
+        writer.write((1, 0, 1), sample((1, 0, 1)))
+        assert journal.done == {(0, 0, 0), (1, 0, 0), (0, 0, 1)}
+        writer.close()
+
+        reader = ShardReader(tmp_path)
+        assert [len(reader.frames), reader.count("combo-0"), reader.count("combo-1")] == [3, 2, 2]
+        assert [json.loads(line)["meta"]["seed"] for line in reader.iter_lines("combo-1")] == ["1_0_0_1", "1_0_1_1"]
+        assert ProgressJournal(tmp_path / JOURNAL_NAME).load() == 4